@@ -1,7 +1,10 @@
-from typing import List
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
 
-from config import load_config
-from utils import log, read_json
+from config import load_config, render_options
+from utils import drain_ffmpeg_runs, log, read_json
+from utils.scratch import scratch_root, sweep_scratch
 from db import (
     get_conn,
     init_db,
@@ -11,16 +14,23 @@ from db import (
     insert_script,
     insert_video,
     video_has_queue_entry,
+    insert_ffmpeg_runs,
+    label_ffmpeg_runs,
 )
+from embeddings import warmup_embedding_model
 from hook_miner import discover_topics, mine_hooks
 from relevance_filter import rank_hooks_for_topic
 from hooks_bank import should_wake_llm, mutate_hooks
 from scripts import finalize_micro_script
 from shorts_generator import generate_short
-from schedule_manager import propose_schedule, schedule_video
+from shorts_generator.bg_bank import BackgroundBank
+from shorts_generator.encode_profiles import EncodeProfileSelector
+from shorts_generator.music import MusicIndex
+from schedule_manager import next_unfilled_slot, propose_schedule, schedule_video
 from uploader_service import attempt_uploads
 from analytics_puller import pull_and_record
 from learner import update_topic_weights
+from lifecycle_manager import apply_lifecycle
 
 
 def _select_topic(conn, fallback: List[str]) -> str:
@@ -31,6 +41,62 @@ def _select_topic(conn, fallback: List[str]) -> str:
     return fallback[0]
 
 
+def _render_threads(workers: int) -> int:
+    # Split cores between concurrent renders so N x264 encoders don't oversubscribe
+    if workers <= 1:
+        return 0
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _record_render(conn, gen: Dict, script_id: int, target_inventory: int, profiles: Optional[EncodeProfileSelector] = None) -> None:
+    # Runs on the main thread only: the sqlite connection is not shared with workers
+    insert_ffmpeg_runs(conn, drain_ffmpeg_runs())
+    if gen.get('render_key'):
+        label_ffmpeg_runs(conn, gen['render_key'], gen.get('bg_source'))
+    if not gen.get('ok'):
+        log(f"Generation failed: {gen}")
+        return
+    if profiles and not gen.get('cached'):
+        profiles.record(gen.get('encode_profile'), gen['duration_sec'], gen.get('render_sec'))
+    if gen.get('draft'):
+        # Drafts wait for review (tools/drafts_cli.py) instead of being scheduled
+        video_id = insert_video(conn, script_id, gen['video_path'], gen['thumb_path'], gen['duration_sec'], status='draft')
+        log(f"Draft video {video_id}: {gen['video_path']}")
+        return
+
+    video_id = insert_video(conn, script_id, gen['video_path'], gen['thumb_path'], gen['duration_sec'], status='ready')
+    if video_has_queue_entry(conn, video_id):
+        log(f"Video {video_id} already queued; skipping schedule.")
+        return
+    log(f"Generated video: {gen['video_path']}")
+
+    slots = propose_schedule(target_inventory)
+    slot_index = get_queue_size(conn) % max(1, len(slots))
+    slot_time = slots[slot_index]
+    schedule_video(conn, video_id, slot_time)
+    log(f"Scheduled video {video_id} at {slot_time}")
+
+
+def _collect_renders(
+    conn,
+    pending: Dict[Future, int],
+    target_inventory: int,
+    *,
+    block: bool,
+    profiles: Optional[EncodeProfileSelector] = None,
+) -> None:
+    if not pending:
+        return
+    done, _ = wait(list(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+    for fut in done:
+        script_id = pending.pop(fut)
+        try:
+            gen = fut.result()
+        except Exception as exc:
+            gen = {'ok': False, 'error': f'render_exception: {exc}'}
+        _record_render(conn, gen, script_id, target_inventory, profiles)
+
+
 def main() -> None:
     cfg = load_config()
     log("Loaded config and ensured directories.")
@@ -38,18 +104,54 @@ def main() -> None:
     init_db(conn)
     log("DB initialized.")
 
+    # Analyze new/changed music once up front; renders only read the index
+    music_index = MusicIndex(os.path.join(cfg.data_dir, 'music_index.json'))
+    music_index.refresh(cfg.ffmpeg_bin, cfg.music_dir, cfg.bg_music_glob, cfg.bg_music_vol_db)
+
+    # Load the shared embedding model (ONNX session + tokenizer) once, before the loop
+    warm = warmup_embedding_model(
+        backend=cfg.embeddings_backend,
+        model_path=cfg.embeddings_model_path,
+        tokenizer_path=cfg.embeddings_tokenizer_path,
+        model_dir=cfg.emb_model_dir,
+        device=cfg.embeddings_device,
+        cache_dir=os.path.join(cfg.data_dir, 'cache', 'embeddings'),
+        cache_mb=cfg.emb_cache_mb,
+        cache_dtype=cfg.emb_cache_dtype,
+    )
+    log(f"Embedding model warm: {warm['backend']} (load {warm['load_sec']}s, first batch {warm['warmup_sec']}s)")
+
     topics = discover_topics(cfg.data_dir, max_topics=5)['topics']
     topic_ids = {t: upsert_topic(conn, t) for t in topics}
     log(f"Discovered topics: {len(topics)}")
 
     target_inventory = max(cfg.daily_target_min, cfg.daily_target_max)
+    # DRAFT_CANDIDATES > 0: render that many review drafts instead of filling the queue
+    drafts = max(0, cfg.draft_candidates)
+    submitted = 0
     attempts = 0
-    max_attempts = target_inventory * 3
+    max_attempts = (drafts or target_inventory) * 3
     refresh_budget = 3
     hooks: List[dict] = []
 
-    while get_queue_size(conn) < target_inventory and attempts < max_attempts:
+    workers = max(1, cfg.render_workers)
+    encoder = {'threads': _render_threads(workers)}
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render')
+    pending: Dict[Future, int] = {}
+    log(f"Render pool: {workers} worker(s), x264 threads per job: {encoder['threads'] or 'auto'}")
+    scratch = scratch_root(cfg.scratch_dir, cfg.scratch_min_free_mb)
+    sweep_scratch(scratch)
+    log(f"Render scratch: {scratch}")
+    profiles = EncodeProfileSelector(os.path.join(cfg.data_dir, 'encode_profiles.json'), cfg.encode_profile)
+
+    def need_more() -> bool:
+        if drafts:
+            return submitted < drafts
+        return get_queue_size(conn) + len(pending) < target_inventory
+
+    while need_more() and attempts < max_attempts:
         attempts += 1
+        _collect_renders(conn, pending, target_inventory, block=False, profiles=profiles)
 
         if not hooks or refresh_budget >= 0:
             mined = mine_hooks(
@@ -80,6 +182,9 @@ def main() -> None:
             embeddings_model_path=cfg.embeddings_model_path,
             embeddings_tokenizer_path=cfg.embeddings_tokenizer_path,
             emb_model_dir=cfg.emb_model_dir,
+            embeddings_device=cfg.embeddings_device,
+            emb_cache_mb=cfg.emb_cache_mb,
+            emb_cache_dtype=cfg.emb_cache_dtype,
             sim_threshold=cfg.sim_threshold,
         )
         top_hooks = ranked['top_hooks']
@@ -107,7 +212,19 @@ def main() -> None:
             meta['emotion'] = mut['mutated'][0].get('emotion')
         script_id = insert_script(conn, topic_ids[current_topic], fin['script_text'], fin['words'], fin['duration_sec'], meta)
 
-        gen = generate_short(
+        if drafts:
+            # Drafts always use DRAFT_ENCODER
+            job_encoder = encoder
+        else:
+            # Faster presets when the next unfilled slot is close, compact ones when there is slack
+            deficit = target_inventory - get_queue_size(conn) - len(pending)
+            slot = next_unfilled_slot(conn, target_inventory)
+            profile = profiles.choose(deficit, slot[1] if slot else None, workers, fin['duration_sec'])
+            log(f"Encode profile: {profile['profile']} (preset={profile['preset']}, crf={profile['crf']}; {profile['reason']})")
+            job_encoder = {**encoder, 'preset': profile['preset'], 'crf': profile['crf'], 'profile': profile['profile']}
+
+        fut = pool.submit(
+            generate_short,
             cfg.ffmpeg_bin,
             cfg.piper_bin or '',
             cfg.piper_voice or '',
@@ -116,39 +233,40 @@ def main() -> None:
             fin['duration_sec'],
             topic=current_topic,
             segments=fin.get('segments'),
-            tts_cmd=cfg.tts_cmd,
-            music_dir=cfg.music_dir,
-            music_glob=cfg.bg_music_glob,
-            music_vol_db=cfg.bg_music_vol_db,
-            sd_bg_cmd=cfg.sd_bg_cmd,
-            sd_thumb_cmd=cfg.sd_thumb_cmd,
-            footage_dir=cfg.footage_dir,
-            footage_glob=cfg.footage_glob,
-            footage_index=cfg.footage_index,
-            fallback_tts_voice=cfg.fallback_tts_voice,
+            encoder=job_encoder,
+            draft=bool(drafts),
+            **render_options(cfg, scratch),
         )
-        if not gen.get('ok'):
-            log(f"Generation failed: {gen}")
-            continue
-
-        video_id = insert_video(conn, script_id, gen['video_path'], gen['thumb_path'], gen['duration_sec'], status='ready')
-        if video_has_queue_entry(conn, video_id):
-            log(f"Video {video_id} already queued; skipping schedule.")
-            continue
-        log(f"Generated video: {gen['video_path']}")
-
-        slots = propose_schedule(target_inventory)
-        slot_index = get_queue_size(conn) % max(1, len(slots))
-        slot_time = slots[slot_index]
-        schedule_video(conn, video_id, slot_time)
-        log(f"Scheduled video {video_id} at {slot_time}")
+        pending[fut] = script_id
+        submitted += 1
 
         used_texts = {h['raw_text'] for h in top_hooks}
         hooks = [h for h in hooks if h.get('raw_text') not in used_texts]
 
+        # Keep at most `workers` renders in flight; results are written here, on the main thread
+        if len(pending) >= workers:
+            _collect_renders(conn, pending, target_inventory, block=True, profiles=profiles)
+
+    while pending:
+        _collect_renders(conn, pending, target_inventory, block=True, profiles=profiles)
+    pool.shutdown(wait=True)
+
+    # Idle: inventory is at target, so spend the spare cycles topping up the background bank
+    if cfg.bg_bank_per_bucket > 0 and get_queue_size(conn) >= target_inventory:
+        bank = BackgroundBank(os.path.join(cfg.data_dir, 'bg_bank'), cfg.bg_bank_per_bucket, cfg.bg_bank_max_uses)
+        log(f"Background bank refill: {bank.refill(cfg.ffmpeg_bin)}")
+        insert_ffmpeg_runs(conn, drain_ffmpeg_runs())
+
     up = attempt_uploads(conn, cfg.uploader_cmd, privacy_status=cfg.privacy_status, category_id=cfg.category_id)
     log(f"Uploader attempted: {up}")
 
+    lifecycle = apply_lifecycle(
+        conn, cfg.data_dir, cfg.ffmpeg_bin,
+        retain_uploaded_days=cfg.retain_uploaded_days, quota_mb=cfg.media_quota_mb,
+    )
+    insert_ffmpeg_runs(conn, drain_ffmpeg_runs())
+    log(f"Lifecycle: {len(lifecycle['actions'])} action(s), {lifecycle['freed_bytes'] / 1048576:.1f} MB freed, {lifecycle.get('failed', 0)} failed")
+
     analytics = pull_and_record(conn, cfg.analytics_cmd)
     learner = update_topic_weights(conn)
     log(f"Analytics recorded: {analytics['recorded']}, Learner updates: {learner['updated']}")
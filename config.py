@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 @dataclass
@@ -35,6 +35,8 @@ class Config:
     embeddings_tokenizer_path: Optional[str]
     embeddings_batch: int
     embeddings_device: str
+    emb_cache_mb: int
+    emb_cache_dtype: str
     topk_hooks: int
     sim_threshold: float
 
@@ -49,6 +51,22 @@ class Config:
     footage_glob: Optional[str]
     footage_index: Optional[str]
     fallback_tts_voice: Optional[str]
+    render_mode: str
+    broll_cache_mb: int
+    render_workers: int
+    caption_engine: str
+    segment_cache_mb: int
+    bg_bank_per_bucket: int
+    bg_bank_max_uses: int
+    tts_cache_mb: int
+    thumb_engine: str
+    thumb_format: str
+    scratch_dir: str
+    scratch_min_free_mb: int
+    retain_uploaded_days: int
+    media_quota_mb: int
+    encode_profile: str
+    draft_candidates: int
 
     def ensure_dirs(self) -> None:
         for d in [
@@ -100,6 +118,8 @@ def load_config() -> Config:
         embeddings_tokenizer_path=(os.getenv('EMBEDDINGS_TOKENIZER_PATH') or '').strip() or None,
         embeddings_batch=getenv_int('EMB_BATCH', 32),
         embeddings_device=os.getenv('EMB_DEVICE', 'auto').strip(),
+        emb_cache_mb=getenv_int('EMB_CACHE_MB', 256),
+        emb_cache_dtype=(os.getenv('EMB_CACHE_DTYPE') or 'float16').strip().lower(),
         topk_hooks=getenv_int('TOPK_HOOKS', 30),
         sim_threshold=float(os.getenv('SIM_THRESHOLD', '0.35')),
         music_dir=(os.getenv('MUSIC_DIR') or '').strip() or None,
@@ -113,6 +133,47 @@ def load_config() -> Config:
         footage_glob=(os.getenv('FOOTAGE_GLOB') or '').strip() or None,
         footage_index=(os.getenv('FOOTAGE_INDEX_PATH') or '').strip() or None,
         fallback_tts_voice=(os.getenv('FALLBACK_TTS_VOICE') or 'slt').strip() or None,
+        render_mode=(os.getenv('RENDER_MODE') or 'multipass').strip().lower(),
+        broll_cache_mb=getenv_int('BROLL_CACHE_MB', 2048),
+        render_workers=getenv_int('RENDER_WORKERS', 1),
+        caption_engine=(os.getenv('CAPTION_ENGINE') or 'drawtext').strip().lower(),
+        segment_cache_mb=getenv_int('SEGMENT_CACHE_MB', 1024),
+        bg_bank_per_bucket=getenv_int('BG_BANK_PER_BUCKET', 3),
+        bg_bank_max_uses=getenv_int('BG_BANK_MAX_USES', 20),
+        tts_cache_mb=getenv_int('TTS_CACHE_MB', 256),
+        thumb_engine=(os.getenv('THUMB_ENGINE') or 'composite').strip().lower(),
+        thumb_format=(os.getenv('THUMB_FORMAT') or 'jpeg').strip().lower(),
+        scratch_dir=(os.getenv('SCRATCH_DIR') or 'auto').strip(),
+        scratch_min_free_mb=getenv_int('SCRATCH_MIN_FREE_MB', 2048),
+        retain_uploaded_days=getenv_int('RETAIN_UPLOADED_DAYS', 7),
+        media_quota_mb=getenv_int('MEDIA_QUOTA_MB', 0),
+        encode_profile=(os.getenv('ENCODE_PROFILE') or 'auto').strip().lower(),
+        draft_candidates=getenv_int('DRAFT_CANDIDATES', 0),
     )
     cfg.ensure_dirs()
     return cfg
+
+
+def render_options(cfg: Config, scratch: str) -> Dict[str, Any]:
+    """generate_short keyword arguments that come straight from the config."""
+    return dict(
+        tts_cmd=cfg.tts_cmd,
+        music_dir=cfg.music_dir,
+        music_glob=cfg.bg_music_glob,
+        music_vol_db=cfg.bg_music_vol_db,
+        sd_bg_cmd=cfg.sd_bg_cmd,
+        sd_thumb_cmd=cfg.sd_thumb_cmd,
+        footage_dir=cfg.footage_dir,
+        footage_glob=cfg.footage_glob,
+        footage_index=cfg.footage_index,
+        fallback_tts_voice=cfg.fallback_tts_voice,
+        render_mode=cfg.render_mode,
+        broll_cache_mb=cfg.broll_cache_mb,
+        caption_engine=cfg.caption_engine,
+        segment_cache_mb=cfg.segment_cache_mb,
+        bg_bank_per_bucket=cfg.bg_bank_per_bucket,
+        tts_cache_mb=cfg.tts_cache_mb,
+        thumb_engine=cfg.thumb_engine,
+        thumb_format=cfg.thumb_format,
+        scratch_dir=scratch,
+    )
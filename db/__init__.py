@@ -10,4 +10,6 @@ from .helpers import (
     record_analytics,
     recent_analytics_age_hours,
     video_has_queue_entry,
+    insert_ffmpeg_runs,
+    label_ffmpeg_runs,
 )
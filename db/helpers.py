@@ -103,3 +103,26 @@ def recent_analytics_age_hours(conn: sqlite3.Connection) -> Optional[float]:
 def video_has_queue_entry(conn: sqlite3.Connection, video_id: int) -> bool:
     cur = conn.execute("SELECT 1 FROM queue WHERE video_id=? AND status IN ('pending','ready','scheduled','uploading')", (video_id,))
     return cur.fetchone() is not None
+
+
+FFMPEG_RUN_COLUMNS = (
+    'stage', 'render_key', 'bg_mode', 'rc', 'wall_sec', 'user_sec', 'sys_sec',
+    'max_rss_kb', 'fps', 'speed', 'out_time_sec', 'created_at',
+)
+
+
+def insert_ffmpeg_runs(conn: sqlite3.Connection, rows: List[Dict[str, Any]]) -> int:
+    if not rows:
+        return 0
+    conn.executemany(
+        f"INSERT INTO ffmpeg_runs({', '.join(FFMPEG_RUN_COLUMNS)}) VALUES({','.join('?' * len(FFMPEG_RUN_COLUMNS))})",
+        [tuple(r.get(c) for c in FFMPEG_RUN_COLUMNS) for r in rows],
+    )
+    conn.commit()
+    return len(rows)
+
+
+def label_ffmpeg_runs(conn: sqlite3.Connection, render_key: str, bg_mode: Optional[str]) -> None:
+    # Rows persisted while their render was still in flight have no bg mode yet
+    conn.execute("UPDATE ffmpeg_runs SET bg_mode=? WHERE render_key=? AND bg_mode IS NULL", (bg_mode, render_key))
+    conn.commit()
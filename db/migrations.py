@@ -30,5 +30,6 @@ def run_migrations(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_scripts_hash ON scripts(script_hash)")
     conn.execute("CREATE INDEX IF NOT EXISTS ix_videos_script ON videos(script_id)")
     conn.execute("CREATE INDEX IF NOT EXISTS ix_queue_status_time ON queue(status, scheduled_for)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_ffmpeg_runs_render ON ffmpeg_runs(render_key)")
     conn.commit()
 
@@ -41,7 +41,7 @@ CREATE TABLE IF NOT EXISTS videos (
   video_hash TEXT,
   platform_video_id TEXT,
   uploaded_at TIMESTAMP,
-  status TEXT NOT NULL DEFAULT 'ready', -- ready, scheduled, uploaded, failed
+  status TEXT NOT NULL DEFAULT 'ready', -- draft, promoted, rejected, ready, scheduled, uploaded, failed
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   FOREIGN KEY(script_id) REFERENCES scripts(id)
 );
@@ -67,4 +67,20 @@ CREATE TABLE IF NOT EXISTS analytics (
   pulled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   FOREIGN KEY(video_id) REFERENCES videos(id)
 );
+
+CREATE TABLE IF NOT EXISTS ffmpeg_runs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  stage TEXT NOT NULL, -- bg, broll_prep, concat, burn, mux, thumb, ...
+  render_key TEXT,
+  bg_mode TEXT,
+  rc INTEGER NOT NULL,
+  wall_sec REAL NOT NULL,
+  user_sec REAL,
+  sys_sec REAL,
+  max_rss_kb INTEGER,
+  fps REAL,
+  speed REAL,
+  out_time_sec REAL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 """
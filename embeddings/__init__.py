@@ -1,2 +1,3 @@
 from .model import EmbeddingModel, cosine_sim
-
+from .registry import clear_embedding_models, get_embedding_model, warmup_embedding_model
+from .store import EmbeddingStore
@@ -5,6 +5,8 @@ from typing import List, Optional, Dict
 
 import numpy as np
 
+from .store import EmbeddingStore, normalize_text
+
 
 def _hash_embed(text: str, dim: int = 256) -> List[float]:
     # Simple hashed bag-of-words embedding, deterministic and fast
@@ -52,6 +54,7 @@ class EmbeddingModel:
         self._sess = None
         self._tokenizer = None
         self._vocab_vectors = None
+        self.cache: Optional[EmbeddingStore] = None
 
         if backend == 'onnx' and model_path and os.path.exists(model_path):
             try:
@@ -73,7 +76,41 @@ class EmbeddingModel:
         if self.backend != 'onnx':
             self._load_basic_tokenizer()
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def cache_id(self) -> Optional[str]:
+        """Identity of the vectors this model produces, or None when they are not stable across runs.
+
+        Hash embeddings and the fallback word tokenizer go through Python's
+        per-process salted hash(), so only ONNX with a real tokenizer is cached.
+        """
+        if self.backend != 'onnx' or not self._sess or not (Tokenizer and isinstance(self._tokenizer, Tokenizer)):
+            return None
+        sigs = []
+        for path in (self.model_path, self.tokenizer_path):
+            st = os.stat(path)
+            sigs.append(f'{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}')
+        return '|'.join(['onnx', *sigs, str(self.max_length)])
+
+    def attach_cache(self, root: str, max_mb: int, dtype: str = 'float16') -> bool:
+        model_id = self.cache_id() if max_mb > 0 else None
+        if model_id:
+            self.cache = EmbeddingStore(root, model_id, max_mb, dtype)
+        return self.cache is not None
+
+    def embed(self, texts: List[str], use_cache: bool = True) -> List[List[float]]:
+        """Embed ``texts``; with a cache attached only texts missing from it are computed."""
+        if self.cache is None or not use_cache or not texts:
+            return self._embed(texts)
+        cached = self.cache.get_many(texts)
+        missing = [i for i, v in enumerate(cached) if v is None]
+        if missing:
+            # Misses are computed on the normalized text the cache is keyed by
+            fresh = self._embed([normalize_text(texts[i]) for i in missing])
+            self.cache.put_many([texts[i] for i in missing], fresh)
+            for i, vec in zip(missing, fresh):
+                cached[i] = vec
+        return [v.tolist() if isinstance(v, np.ndarray) else v for v in cached]
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
         if self.backend != 'onnx' or not self._sess:
             return [_hash_embed(t) for t in texts]
         if not self._tokenizer:
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from utils import log
+from .model import EmbeddingModel
+
+WARMUP_TEXTS = ['warmup', 'a short warmup sentence for the embedding model']
+
+_lock = threading.Lock()
+_models: Dict[Tuple, EmbeddingModel] = {}
+
+
+def _key(backend: str, model_path: Optional[str], tokenizer_path: Optional[str], model_dir: Optional[str], device: str, max_length: int) -> Tuple:
+    def norm(p: Optional[str]) -> Optional[str]:
+        return os.path.abspath(p) if p else None
+
+    return (backend or 'hash', norm(model_path), norm(tokenizer_path), norm(model_dir), (device or 'auto').lower(), int(max_length))
+
+
+def get_embedding_model(
+    backend: str = 'hash',
+    model_path: Optional[str] = None,
+    tokenizer_path: Optional[str] = None,
+    model_dir: Optional[str] = None,
+    device: str = 'auto',
+    max_length: int = 128,
+    cache_dir: Optional[str] = None,
+    cache_mb: int = 0,
+    cache_dtype: str = 'float16',
+) -> EmbeddingModel:
+    """Process-wide EmbeddingModel for this backend/model/tokenizer/device.
+
+    The ONNX session and tokenizer are loaded once per key; every caller
+    (relevance filter, matcher) shares the instance afterwards. The first
+    caller passing ``cache_dir``/``cache_mb`` attaches the on-disk vector
+    cache (EmbeddingStore) to it.
+    """
+    key = _key(backend, model_path, tokenizer_path, model_dir, device, max_length)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = EmbeddingModel(
+                backend=backend,
+                model_path=model_path,
+                tokenizer_path=tokenizer_path,
+                model_dir=model_dir,
+                max_length=max_length,
+                device=device,
+            )
+            _models[key] = model
+        if cache_dir and cache_mb > 0 and model.cache is None and model.attach_cache(cache_dir, cache_mb, cache_dtype):
+            log(f"Embedding cache: {cache_dir} ({cache_mb} MB, {cache_dtype})")
+    return model
+
+
+def warmup_embedding_model(**kwargs) -> Dict:
+    """Load the shared model and run a dummy batch so the first real call pays no setup cost."""
+    start = time.monotonic()
+    model = get_embedding_model(**kwargs)
+    loaded = time.monotonic()
+    # Bypass the vector cache so the dummy batch really runs inference
+    model.embed(WARMUP_TEXTS, use_cache=False)
+    return {
+        'backend': model.backend,
+        'load_sec': round(loaded - start, 3),
+        'warmup_sec': round(time.monotonic() - loaded, 3),
+    }
+
+
+def clear_embedding_models() -> None:
+    with _lock:
+        _models.clear()
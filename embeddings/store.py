@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils import ensure_dir
+
+# The vector file grows in steps of this many slots (up to the size budget)
+GROW_SLOTS = 1024
+# Stay below SQLite's default host-parameter limit
+QUERY_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize('NFC', ' '.join((text or '').split()))
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """Embedding vectors on disk, keyed by (model id, normalized text hash).
+
+    Each model gets one memory-mapped file of fixed-size slots
+    (``<tag>.f16``/``.f32``); ``index.sqlite`` maps text hashes to slots and
+    records when each was last used. Once the file reaches ``max_mb`` the
+    least recently used slots are overwritten.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, root: str, model_id: str, max_mb: int = 256, dtype: str = 'float16'):
+        ensure_dir(root)
+        self.dtype = np.dtype(dtype)
+        self.tag = hashlib.sha256(f'{model_id}|{self.dtype.name}'.encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(root, f"{self.tag}.{'f16' if self.dtype == np.float16 else 'f32'}")
+        self.max_bytes = max(0, int(max_mb)) * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), timeout=30, check_same_thread=False)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS models (
+              tag TEXT PRIMARY KEY,
+              model_id TEXT NOT NULL,
+              dim INTEGER NOT NULL,
+              slots INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS vectors (
+              tag TEXT NOT NULL,
+              text_hash TEXT NOT NULL,
+              slot INTEGER NOT NULL,
+              last_used REAL NOT NULL,
+              PRIMARY KEY(tag, text_hash)
+            );
+            CREATE INDEX IF NOT EXISTS ix_vectors_lru ON vectors(tag, last_used);
+            """
+        )
+        self.model_id = model_id
+        row = self.conn.execute("SELECT dim, slots FROM models WHERE tag=?", (self.tag,)).fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+        self.slots = int(row[1]) if row else 0
+        self._mm: Optional[np.memmap] = None
+
+    def capacity(self) -> int:
+        if not self.dim:
+            return 0
+        return self.max_bytes // (self.dim * self.dtype.itemsize)
+
+    def _reset(self, dim: int) -> None:
+        # First vectors for this tag, or the model changed shape: start over
+        self.conn.execute("DELETE FROM vectors WHERE tag=?", (self.tag,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO models(tag, model_id, dim, slots) VALUES(?,?,?,0)",
+            (self.tag, self.model_id, dim),
+        )
+        self.conn.commit()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.dim, self.slots, self._mm = dim, 0, None
+
+    def _map(self, slots: int) -> np.memmap:
+        row_bytes = self.dim * self.dtype.itemsize
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size < slots * row_bytes:
+            grown = min(max(slots, size // row_bytes + GROW_SLOTS), max(slots, self.capacity()))
+            with open(self.path, 'ab') as fh:
+                fh.truncate(grown * row_bytes)
+            self._mm = None
+        if self._mm is None:
+            rows = os.path.getsize(self.path) // row_bytes
+            self._mm = np.memmap(self.path, dtype=self.dtype, mode='r+', shape=(rows, self.dim))
+        return self._mm
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        out: List[Optional[np.ndarray]] = [None] * len(texts)
+        if not texts or not self.dim or not self.slots:
+            self.misses += len(texts)
+            return out
+        keys = [text_key(t) for t in texts]
+        with self._lock:
+            found: Dict[str, int] = {}
+            unique = sorted(set(keys))
+            for i in range(0, len(unique), QUERY_CHUNK):
+                chunk = unique[i:i + QUERY_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, slot FROM vectors WHERE tag=? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [self.tag, *chunk],
+                ).fetchall()
+                found.update((h, int(s)) for h, s in rows)
+            if found:
+                mm = self._map(self.slots)
+                for idx, key in enumerate(keys):
+                    slot = found.get(key)
+                    if slot is not None:
+                        out[idx] = np.asarray(mm[slot], dtype=np.float32)
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE vectors SET last_used=? WHERE tag=? AND text_hash=?",
+                    [(now, self.tag, h) for h in found],
+                )
+                self.conn.commit()
+        hits = sum(1 for v in out if v is not None)
+        self.hits += hits
+        self.misses += len(texts) - hits
+        return out
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> int:
+        """Store vectors for ``texts``; returns how many were written."""
+        fresh = {text_key(t): v for t, v in zip(texts, vectors)}
+        if not fresh or not self.max_bytes:
+            return 0
+        dim = len(next(iter(fresh.values())))
+        with self._lock:
+            if self.dim != dim:
+                self._reset(dim)
+            cap = self.capacity()
+            if cap <= 0:
+                return 0
+            existing = set()
+            keys = list(fresh)
+            for i in range(0, len(keys), QUERY_CHUNK):
+                chunk = keys[i:i + QUERY_CHUNK]
+                existing.update(h for (h,) in self.conn.execute(
+                    f"SELECT text_hash FROM vectors WHERE tag=? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [self.tag, *chunk],
+                ).fetchall())
+            new = [k for k in keys if k not in existing][:cap]
+            if not new:
+                return 0
+
+            slots: List[int] = []
+            while len(slots) < len(new) and self.slots < cap:
+                slots.append(self.slots)
+                self.slots += 1
+            evict = len(new) - len(slots)
+            if evict:
+                victims = self.conn.execute(
+                    "SELECT text_hash, slot FROM vectors WHERE tag=? ORDER BY last_used ASC LIMIT ?",
+                    (self.tag, evict),
+                ).fetchall()
+                self.conn.executemany(
+                    "DELETE FROM vectors WHERE tag=? AND text_hash=?", [(self.tag, h) for h, _ in victims],
+                )
+                slots += [int(s) for _, s in victims]
+
+            mm = self._map(self.slots)
+            for key, slot in zip(new, slots):
+                mm[slot] = np.asarray(fresh[key], dtype=self.dtype)
+            # Vectors hit the file before the index points at them
+            mm.flush()
+            now = time.time()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO vectors(tag, text_hash, slot, last_used) VALUES(?,?,?,?)",
+                [(self.tag, key, slot, now) for key, slot in zip(new, slots)],
+            )
+            self.conn.execute("UPDATE models SET slots=? WHERE tag=?", (self.slots, self.tag))
+            self.conn.commit()
+        return len(slots)
@@ -0,0 +1 @@
+from .lifecycle import apply_lifecycle, plan_lifecycle
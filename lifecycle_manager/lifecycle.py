@@ -0,0 +1,213 @@
+import os
+import re
+import threading
+import time
+import wave
+from typing import Dict, List, Optional
+
+from utils import run_ffmpeg, warn
+
+MEDIA_DIRS = ('video', 'audio', 'thumbs')
+# Queue states in which the video file is still needed for an upload
+ACTIVE_QUEUE = ('pending', 'ready', 'scheduled', 'uploading')
+# Reviewed drafts: the full-quality render (if any) is a separate video row
+DISCARDED_DRAFTS = ('promoted', 'rejected')
+# Leftovers of multi-step renders written under data/ before scratch dirs
+INTERMEDIATE_RE = re.compile(
+    r'(_(bg|txt|broll_\d+|broll_concat|segments|captions|frame)\.(mp4|txt|png|ass)'
+    r'|_seg\d+\.wav|\.part(\.\w+)?)$'
+)
+OPUS_BITRATE_KBPS = 32
+
+
+def _media_files(data_dir: str) -> Dict[str, Dict]:
+    files: Dict[str, Dict] = {}
+    for sub in MEDIA_DIRS:
+        root = os.path.join(data_dir, sub)
+        if not os.path.isdir(root):
+            continue
+        for de in os.scandir(root):
+            if de.is_file(follow_symlinks=False):
+                st = de.stat(follow_symlinks=False)
+                files[os.path.abspath(de.path)] = {'path': de.path, 'size': st.st_size, 'mtime': st.st_mtime}
+    return files
+
+
+def _video_rows(conn) -> List[Dict]:
+    placeholders = ','.join('?' * len(ACTIVE_QUEUE))
+    cur = conn.execute(
+        f"""
+        SELECT v.id, v.video_path, v.thumb_path, v.status,
+               (julianday('now') - julianday(v.uploaded_at)) AS uploaded_days,
+               EXISTS(SELECT 1 FROM queue q WHERE q.video_id = v.id AND q.status IN ({placeholders})) AS queued
+        FROM videos v
+        """,
+        ACTIVE_QUEUE,
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
+def _audio_for(data_dir: str, video_path: str) -> str:
+    # Voiceovers share the render key basename with the MP4
+    base = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.abspath(os.path.join(data_dir, 'audio', f'{base}.wav'))
+
+
+def _opus_estimate(wav_path: str, bitrate_kbps: int) -> int:
+    try:
+        with wave.open(wav_path, 'rb') as src:
+            seconds = src.getnframes() / float(src.getframerate() or 1)
+    except (wave.Error, EOFError, OSError):
+        return 0
+    return int(seconds * bitrate_kbps * 1000 / 8)
+
+
+def plan_lifecycle(
+    conn,
+    data_dir: str,
+    *,
+    retain_uploaded_days: float = 7.0,
+    quota_mb: int = 0,
+    min_age_sec: int = 3600,
+    opus_bitrate_kbps: int = OPUS_BITRATE_KBPS,
+    now: Optional[float] = None,
+) -> Dict:
+    """Decide what to delete/compress under data/{video,audio,thumbs}.
+
+    Files of videos that are not uploaded yet (or still queued), including
+    a pending draft's SD background, are never touched; those of
+    promoted/rejected drafts are deleted. Uploaded videos get their WAV
+    compressed to Opus and their MP4 dropped ``retain_uploaded_days`` after upload; stale render intermediates
+    are deleted; then, if the media dirs still exceed ``quota_mb``, the
+    oldest unprotected files are evicted first.
+    """
+    now = now or time.time()
+    files = _media_files(data_dir)
+    total = sum(f['size'] for f in files.values())
+
+    protected = set()
+    uploaded: List[Dict] = []
+    discarded: List[str] = []
+    for row in _video_rows(conn):
+        paths = [p for p in (row['video_path'], row['thumb_path']) if p]
+        if row['video_path']:
+            paths.append(_audio_for(data_dir, row['video_path']))
+        paths = [os.path.abspath(p) for p in paths]
+        # SD background a draft's plan points at; promote reuses it
+        base = os.path.splitext(os.path.basename(row['video_path'] or ''))[0]
+        sd_png = os.path.abspath(os.path.join(data_dir, 'thumbs', f'{base}_sd.png'))
+        if row['status'] == 'uploaded' and not row['queued']:
+            uploaded.append({**row, 'paths': paths})
+        elif row['status'] in DISCARDED_DRAFTS and not row['queued']:
+            discarded += paths + [sd_png]
+        elif row['status'] == 'draft':
+            protected.update(paths + [sd_png])
+        else:
+            protected.update(paths)
+
+    actions: Dict[str, Dict] = {}
+
+    def add(path: str, action: str, reason: str, freed: int) -> None:
+        actions[path] = {'path': files[path]['path'], 'action': action, 'reason': reason,
+                         'bytes': files[path]['size'], 'freed': freed}
+
+    for path, info in files.items():
+        if path not in protected and INTERMEDIATE_RE.search(path) and now - info['mtime'] >= min_age_sec:
+            add(path, 'delete', 'intermediate', info['size'])
+
+    for path in discarded:
+        if path in files and path not in protected:
+            add(path, 'delete', 'reviewed_draft', files[path]['size'])
+
+    for row in uploaded:
+        video, wav = os.path.abspath(row['video_path']), _audio_for(data_dir, row['video_path'])
+        if wav in files and wav not in actions:
+            est = _opus_estimate(wav, opus_bitrate_kbps)
+            add(wav, 'compress', 'uploaded_audio', max(0, files[wav]['size'] - est))
+        days = row['uploaded_days']
+        if video in files and days is not None and days >= retain_uploaded_days:
+            add(video, 'delete', f'uploaded_{retain_uploaded_days:g}d', files[video]['size'])
+
+    quota_bytes = max(0, int(quota_mb)) * 1024 * 1024
+    remaining = total - sum(a['freed'] for a in actions.values())
+    if quota_bytes and remaining > quota_bytes:
+        candidates = sorted(
+            # Fresh files may belong to a render that is not in the DB yet
+            (p for p in files if p not in protected and now - files[p]['mtime'] >= min_age_sec
+             and actions.get(p, {}).get('action') != 'delete'),
+            key=lambda p: files[p]['mtime'],
+        )
+        for path in candidates:
+            if remaining <= quota_bytes:
+                break
+            # A WAV evicted for quota is deleted outright instead of compressed
+            remaining -= files[path]['size'] - actions.get(path, {}).get('freed', 0)
+            add(path, 'delete', 'quota', files[path]['size'])
+
+    ordered = sorted(actions.values(), key=lambda a: (a['reason'] != 'intermediate', a['path']))
+    freed = sum(a['freed'] for a in ordered)
+    return {
+        'total_bytes': total,
+        'freed_bytes': freed,
+        'after_bytes': total - freed,
+        'quota_bytes': quota_bytes,
+        'over_quota': bool(quota_bytes) and total - freed > quota_bytes,
+        'protected_files': len(protected & set(files)),
+        'actions': ordered,
+    }
+
+
+def _compress_audio(ffmpeg_bin: str, wav_path: str, bitrate_kbps: int) -> Optional[str]:
+    out = f'{os.path.splitext(wav_path)[0]}.opus'
+    tmp = f'{out}.{os.getpid()}-{threading.get_ident()}.part.opus'
+    rc = run_ffmpeg(ffmpeg_bin, [
+        '-i', wav_path, '-c:a', 'libopus', '-b:a', f'{bitrate_kbps}k', '-vbr', 'on', tmp,
+    ], stage='archive_audio')
+    if rc != 0 or not os.path.exists(tmp):
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        return None
+    os.replace(tmp, out)
+    os.unlink(wav_path)
+    return out
+
+
+def apply_lifecycle(
+    conn,
+    data_dir: str,
+    ffmpeg_bin: str,
+    *,
+    dry_run: bool = False,
+    retain_uploaded_days: float = 7.0,
+    quota_mb: int = 0,
+    opus_bitrate_kbps: int = OPUS_BITRATE_KBPS,
+) -> Dict:
+    plan = plan_lifecycle(
+        conn, data_dir,
+        retain_uploaded_days=retain_uploaded_days, quota_mb=quota_mb, opus_bitrate_kbps=opus_bitrate_kbps,
+    )
+    if dry_run:
+        return {'ok': True, 'dry_run': True, **plan}
+
+    freed = 0
+    failed = 0
+    for act in plan['actions']:
+        path = act['path']
+        try:
+            if act['action'] == 'compress':
+                out = _compress_audio(ffmpeg_bin, path, opus_bitrate_kbps)
+                if not out:
+                    failed += 1
+                    continue
+                freed += act['bytes'] - os.path.getsize(out)
+            else:
+                os.unlink(path)
+                freed += act['bytes']
+        except FileNotFoundError:
+            continue
+        except OSError as exc:
+            warn(f"Lifecycle {act['action']} failed for {path}: {exc}")
+            failed += 1
+    if plan['over_quota']:
+        warn("Lifecycle: media dirs still over quota; remaining files belong to queued/unuploaded videos.")
+    return {'ok': failed == 0, 'dry_run': False, **plan, 'freed_bytes': freed, 'failed': failed}
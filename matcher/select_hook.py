@@ -1,27 +1,47 @@
-from typing import Dict, List
+import os
+from typing import Dict, List, Optional
 
 import numpy as np
 
+from embeddings import get_embedding_model
 
-def cosine(a, b):
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-9))
+# Cosine needed to call a trend/hook pair a match, per loaded backend. The hash
+# backend is a bag of words (score ~ shared-word fraction); e5-style ONNX models
+# score even loosely related sentences high. Override with MATCH_SIM_THRESHOLD.
+DEFAULT_THRESHOLDS = {"hash": 0.2, "onnx": 0.78}
 
 
-def fake_embed(s: str):
-    rng = np.random.default_rng(abs(hash(s)) % (2**32))
-    return rng.standard_normal(768)
+def _embedding_model():
+    # Same process-wide model as the relevance filter (EMBEDDINGS_BACKEND / EMB_MODEL_DIR / EMB_DEVICE)
+    return get_embedding_model(
+        backend=(os.getenv("EMBEDDINGS_BACKEND") or "hash").strip(),
+        model_path=(os.getenv("EMBEDDINGS_MODEL_PATH") or "").strip() or None,
+        tokenizer_path=(os.getenv("EMBEDDINGS_TOKENIZER_PATH") or "").strip() or None,
+        model_dir=(os.getenv("EMB_MODEL_DIR") or "").strip() or None,
+        device=os.getenv("EMB_DEVICE", "auto").strip(),
+        cache_dir=os.path.join(os.getenv("DATA_DIR", "data").strip(), "cache", "embeddings"),
+        cache_mb=int(os.getenv("EMB_CACHE_MB") or 256),
+        cache_dtype=(os.getenv("EMB_CACHE_DTYPE") or "float16").strip().lower(),
+    )
 
 
-def pick_hook(trends: List[Dict], hooks: List[Dict], k_tr=30, k_hk=120, threshold=0.78):
-    scores = []
-    for tr in trends[:k_tr]:
-        e_tr = fake_embed(tr["title"])
-        for hk in hooks[:k_hk]:
-            e_hk = fake_embed(hk["text"])
-            sc = cosine(e_tr, e_hk)
-            scores.append((sc, tr, hk))
-    scores.sort(key=lambda x: x[0], reverse=True)
-    for sc, tr, hk in scores:
-        if sc >= threshold:
-            return {"score": sc, "trend": tr, "hook": hk}
-    return scores[0] if scores else None
+def pick_hook(trends: List[Dict], hooks: List[Dict], k_tr=30, k_hk=120, threshold: Optional[float] = None):
+    """Best trend/hook pair by embedding cosine.
+
+    ``threshold`` defaults to DEFAULT_THRESHOLDS for the backend that actually
+    loaded (ONNX falls back to hash without its assets). When no pair reaches
+    it, the best-scoring pair is returned with ``below_threshold`` set.
+    """
+    trends, hooks = trends[:k_tr], hooks[:k_hk]
+    if not trends or not hooks:
+        return None
+    em = _embedding_model()
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS.get(em.backend, DEFAULT_THRESHOLDS["onnx"])
+    # One batch per side; vectors come back L2-normalized, so the dot product is the cosine
+    e_tr = np.asarray(em.embed([tr.get("title") or "" for tr in trends]), dtype=np.float32)
+    e_hk = np.asarray(em.embed([hk.get("text") or "" for hk in hooks]), dtype=np.float32)
+    sims = e_tr @ e_hk.T
+    i, j = np.unravel_index(int(np.argmax(sims)), sims.shape)
+    sc = float(sims[i, j])
+    return {"score": sc, "trend": trends[i], "hook": hooks[j], **({"below_threshold": True} if sc < threshold else {})}
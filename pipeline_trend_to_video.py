@@ -4,13 +4,16 @@ from pathlib import Path
 from trend_fetchers import REGISTRY as TF
 from hook_providers.http_bank import HttpBank
 from matcher.select_hook import pick_hook
+from config import load_config
+from db import get_conn, init_db, insert_ffmpeg_runs
+from utils import drain_ffmpeg_runs
 from video_gen.pipeline import generate_hook_clip
 
 REGIONS=[r.strip() for r in os.getenv("TREND_REGIONS","US").split(",") if r.strip()]
 SOURCES=[s.strip() for s in os.getenv("TREND_SOURCES","google_trends").split(",") if s.strip()]
 BANK_URLS=[u.strip() for u in os.getenv("HOOK_PROVIDER_URLS","" ).split(",") if u.strip()]
 
-outdir = Path("data/video"); outdir.mkdir(parents=True, exist_ok=True)
+cfg = load_config()
 
 # 1) collect trends
 trends=[]
@@ -38,17 +41,23 @@ if not hooks:
 sel = pick_hook(trends, hooks,
                 k_tr=int(os.getenv("MATCH_TOPK_TRENDS","30")),
                 k_hk=int(os.getenv("MATCH_TOPK_HOOKS","120")),
-                threshold=float(os.getenv("MATCH_SIM_THRESHOLD","0.78")))
+                # Unset: per-backend default (matcher.select_hook.DEFAULT_THRESHOLDS)
+                threshold=float(os.getenv("MATCH_SIM_THRESHOLD")) if (os.getenv("MATCH_SIM_THRESHOLD") or "").strip() else None)
 print("SELECTED:", json.dumps(sel, ensure_ascii=False))
+if sel.get("below_threshold"):
+    print(f"No trend/hook pair reached the match threshold; using the best one (score {sel['score']:.3f}).")
 
 # 3) video generate
-prompt = sel[2]["text"] if isinstance(sel, tuple) else sel["hook"]["text"]
-vid = outdir/"trend_hook_001.mp4"
-clip = generate_hook_clip(prompt, vid)
+prompt = sel["hook"]["text"]
+# Output is named per prompt (stockfx: by render key), so runs never overwrite earlier clips
+clip = generate_hook_clip(prompt)
 print("VIDEO:", clip)
+conn = get_conn(cfg.db_path)
+init_db(conn)
+insert_ffmpeg_runs(conn, drain_ffmpeg_runs())
 
 # 4) title/tags stub (wire to your llm_runner next)
-title = f"{sel[2]['text']} — {sel[1]['title']}" if isinstance(sel, tuple) else f"{sel['hook']['text']} — {sel['trend']['title']}"
+title = f"{sel['hook']['text']} — {sel['trend']['title']}"
 (Path("data/scripts")).mkdir(parents=True, exist_ok=True)
-(Path("data/scripts/title.txt")).write_text(title)
+(Path("data/scripts")/f"{Path(clip).stem}.title.txt").write_text(title)
 print("TITLE:", title)
@@ -2,7 +2,7 @@ import math
 import os
 from typing import Dict, List, Tuple, Optional
 from utils import ensure_dir, write_json, slugify, read_json
-from embeddings import EmbeddingModel, cosine_sim
+from embeddings import cosine_sim, get_embedding_model
 
 
 def _tokenize(text: str) -> List[str]:
@@ -44,6 +44,9 @@ def rank_hooks_for_topic(
     embeddings_model_path: Optional[str] = None,
     embeddings_tokenizer_path: Optional[str] = None,
     emb_model_dir: Optional[str] = None,
+    embeddings_device: str = 'auto',
+    emb_cache_mb: int = 0,
+    emb_cache_dtype: str = 'float16',
     sim_threshold: float = 0.0,
 ) -> Dict:
     # Embedding-based relevance with bias
@@ -59,11 +62,17 @@ def rank_hooks_for_topic(
     if not normalized_hooks:
         return {'ok': True, 'topic': topic, 'top_hooks': [], 'count': 0}
 
-    em = EmbeddingModel(
+    # Shared per process: the ONNX session/tokenizer load once, not per call, and
+    # vectors of previously seen texts come from data/cache/embeddings
+    em = get_embedding_model(
         backend=embeddings_backend,
         model_path=embeddings_model_path,
         tokenizer_path=embeddings_tokenizer_path,
         model_dir=emb_model_dir,
+        device=embeddings_device,
+        cache_dir=os.path.join(data_dir, 'cache', 'embeddings') if data_dir else None,
+        cache_mb=emb_cache_mb,
+        cache_dtype=emb_cache_dtype,
     )
     topic_vec = em.embed([topic])[0]
     texts = [h['raw_text'] for h in hooks]
@@ -97,7 +106,15 @@ def rank_hooks_for_topic(
     return {'ok': True, 'topic': topic, 'top_hooks': top, 'count': len(top)}
 
 
-def select(topic: str, hooks: List[Dict], k: int = 20, *, embeddings_backend: str = 'hash', model_dir: Optional[str] = None) -> List[Dict]:
+def select(
+    topic: str,
+    hooks: List[Dict],
+    k: int = 20,
+    *,
+    embeddings_backend: str = 'hash',
+    model_dir: Optional[str] = None,
+    device: str = 'auto',
+) -> List[Dict]:
     """Convenience wrapper returning a compact list of top hooks for quick scripts."""
     enriched = [{'raw_text': h.get('text') or h.get('raw_text', ''), **h} for h in hooks]
     res = rank_hooks_for_topic(
@@ -109,6 +126,7 @@ def select(topic: str, hooks: List[Dict], k: int = 20, *, embeddings_backend: st
         embeddings_model_path=None,
         embeddings_tokenizer_path=None,
         emb_model_dir=model_dir,
+        embeddings_device=device,
         sim_threshold=0.0,
     )
     out = []
@@ -1,2 +1,2 @@
-from .scheduler import propose_schedule, schedule_video
+from .scheduler import propose_schedule, schedule_video, next_unfilled_slot
 
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 
@@ -44,3 +44,16 @@ def schedule_video(conn, video_id: int, when_iso: str) -> Dict:
     )
     conn.commit()
     return {'ok': True, 'queue_id': int(cur.lastrowid), 'video_id': video_id, 'scheduled_for': when_iso}
+
+
+def next_unfilled_slot(conn, count: int) -> Optional[Tuple[str, float]]:
+    """First proposed slot with no active queue entry, and the seconds until it."""
+    taken = {r[0] for r in conn.execute(
+        "SELECT scheduled_for FROM queue WHERE status IN ('pending','scheduled','ready','uploading')"
+    ).fetchall()}
+    now = _now_cairo()
+    for slot in propose_schedule(count + len(taken)):
+        if slot not in taken:
+            when = datetime.strptime(slot, '%Y-%m-%d %H:%M:%S').replace(tzinfo=now.tzinfo)
+            return slot, max(0.0, (when - now).total_seconds())
+    return None
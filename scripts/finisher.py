@@ -62,9 +62,17 @@ def finalize_micro_script(topic: str, mutated_hooks: List[Dict], max_words: int
     base_dur = estimate_duration_sec(text, wpm=160)
     total = max(7.0, min(15.0, base_dur))
 
-    seg_words = [word_count(base_hook), word_count(curiosity), word_count(payoff), word_count(cta)]
-    seg_sum = sum(max(1, w) for w in seg_words)
-    seg_durs = [total * (max(1, w) / seg_sum) for w in seg_words]
+    # Template lines keep their own spoken length (rounded to 10ms) and the hook
+    # takes the rest, so hook variants share the CURIOSITY/PAYOFF/CTA timings
+    # (and their cached segment chunks). Scripts clamped down to 15s are scaled.
+    tail_durs = [round(estimate_duration_sec(s, wpm=160), 2) for s in (curiosity, payoff, cta)]
+    hook_dur = total - sum(tail_durs)
+    if hook_dur >= estimate_duration_sec(base_hook, wpm=160) - 1e-6:
+        seg_durs = [hook_dur] + tail_durs
+    else:
+        seg_words = [word_count(base_hook), word_count(curiosity), word_count(payoff), word_count(cta)]
+        seg_sum = sum(max(1, w) for w in seg_words)
+        seg_durs = [total * (max(1, w) / seg_sum) for w in seg_words]
 
     segments = []
     t = 0.0
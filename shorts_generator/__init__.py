@@ -1,2 +1 @@
-from .generate import generate_short
-
+from .generate import generate_short, generate_shorts_batch
@@ -0,0 +1,124 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from utils import ensure_dir, log, read_json, run_ffmpeg, write_json
+from .render_graph import FRACTAL_VF, random_color_source, random_fractal_source, x264_args
+
+BANK_MODES = ('fractal', 'color')
+# Shorts are clamped to 7–15s; each loop covers the longest short in its bucket
+BUCKETS = (10, 15)
+
+
+def bucket_for(duration: float) -> Optional[int]:
+    for b in BUCKETS:
+        if duration <= b:
+            return b
+    return None
+
+
+class BackgroundBank:
+    """Pre-rendered 1080x1920@30 synthetic background loops under ``data/bg_bank``.
+
+    Loops are stored per mode and duration bucket. ``take`` hands out the
+    least used loop that covers the requested duration and bumps its usage
+    count; loops are retired after ``max_uses`` so visuals keep rotating,
+    and ``refill`` tops every bucket back up to ``per_bucket`` loops.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, base_dir: str, per_bucket: int = 3, max_uses: int = 20):
+        self.base_dir = base_dir
+        self.per_bucket = max(0, int(per_bucket))
+        self.max_uses = max(1, int(max_uses))
+        self.usage_path = os.path.join(base_dir, 'usage.json')
+        ensure_dir(base_dir)
+
+    def _dir(self, mode: str, bucket: int) -> str:
+        return os.path.join(self.base_dir, mode, f'{bucket}s')
+
+    def clips(self, mode: str, bucket: int) -> List[str]:
+        d = self._dir(mode, bucket)
+        if not os.path.isdir(d):
+            return []
+        return sorted(
+            os.path.join(d, fn) for fn in os.listdir(d)
+            if fn.endswith('.mp4') and not fn.endswith('.part.mp4')
+        )
+
+    def take(self, mode: str, duration: float, rng: Optional[random.Random] = None) -> Optional[str]:
+        """Return the least used banked loop covering ``duration``, or None on a miss."""
+        bucket = bucket_for(duration)
+        if bucket is None:
+            return None
+        with self._lock:
+            clips = self.clips(mode, bucket)
+            if not clips:
+                return None
+            usage = read_json(self.usage_path, default={}) or {}
+            fewest = min(usage.get(p, 0) for p in clips)
+            pick = (rng or random).choice([p for p in clips if usage.get(p, 0) == fewest])
+            usage[pick] = usage.get(pick, 0) + 1
+            write_json(self.usage_path, usage)
+        return pick
+
+    def _render(self, ffmpeg_bin: str, mode: str, bucket: int, out_path: str, encoder: Optional[Dict]) -> int:
+        if mode == 'fractal':
+            src = ['-f', 'lavfi', '-i', random_fractal_source(), '-vf', FRACTAL_VF]
+        else:
+            source, vf = random_color_source(bucket)
+            src = ['-f', 'lavfi', '-i', source, '-vf', vf]
+        return run_ffmpeg(ffmpeg_bin, src + [
+            '-t', f'{bucket:.2f}',
+            '-an',
+            *x264_args(encoder),
+            '-pix_fmt', 'yuv420p',
+            '-r', '30',
+            out_path,
+        ], stage='bank')
+
+    def retire_worn(self) -> int:
+        removed = 0
+        with self._lock:
+            usage = read_json(self.usage_path, default={}) or {}
+            for path, count in list(usage.items()):
+                if count < self.max_uses:
+                    continue
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                usage.pop(path, None)
+                removed += 1
+            if removed:
+                write_json(self.usage_path, usage)
+        return removed
+
+    def refill(self, ffmpeg_bin: str, encoder: Optional[Dict] = None, max_renders: Optional[int] = None) -> Dict:
+        """Retire worn loops and render missing ones; meant for idle time."""
+        retired = self.retire_worn()
+        rendered = 0
+        failed = 0
+        for mode in BANK_MODES:
+            for bucket in BUCKETS:
+                d = self._dir(mode, bucket)
+                ensure_dir(d)
+                while len(self.clips(mode, bucket)) < self.per_bucket:
+                    if max_renders is not None and rendered + failed >= max_renders:
+                        return {'rendered': rendered, 'retired': retired, 'failed': failed}
+                    name = f"{time.strftime('%Y%m%d%H%M%S')}_{random.getrandbits(32):08x}"
+                    tmp = os.path.join(d, f'{name}.part.mp4')
+                    rc = self._render(ffmpeg_bin, mode, bucket, tmp, encoder)
+                    if rc != 0 or not os.path.exists(tmp):
+                        if os.path.exists(tmp):
+                            os.unlink(tmp)
+                        failed += 1
+                        break
+                    os.replace(tmp, os.path.join(d, f'{name}.mp4'))
+                    rendered += 1
+        if rendered or retired:
+            log(f"Background bank: rendered {rendered}, retired {retired} loop(s).")
+        return {'rendered': rendered, 'retired': retired, 'failed': failed}
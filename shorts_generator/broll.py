@@ -2,10 +2,25 @@ import glob
 import os
 import random
 import re
-from typing import Dict, List, Optional
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
 
 from utils import read_json
 
+try:  # optional dependency for vectorized scoring
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+VIDEO_EXTS = ('.mp4', '.mov', '.mkv', '.webm', '.m4v')
+# Probed clips shorter than this flash by too fast to read as a shot
+MIN_CLIP_SEC = 1.0
+# Clips used by the last N rendered shorts are pushed down the ranking; the
+# penalty outweighs any tag score, so they only fill in once fresh clips run out
+RECENT_SHORTS = 3
+RECENT_PENALTY = 1000.0
+
 
 def _infer_tags_from_name(path: str) -> List[str]:
     stem = os.path.splitext(os.path.basename(path))[0]
@@ -21,7 +36,7 @@ def _normalize_path(path: str, base_dir: Optional[str]) -> str:
     return os.path.abspath(path)
 
 
-def _load_index(index_path: str, base_dir: Optional[str]) -> List[Dict]:
+def _load_index(index_path: str, base_dir: Optional[str], check_exists: bool = True) -> List[Dict]:
     data = read_json(index_path, default=None)
     if not data:
         return []
@@ -35,7 +50,7 @@ def _load_index(index_path: str, base_dir: Optional[str]) -> List[Dict]:
         if not raw_path:
             return
         full = _normalize_path(str(raw_path), base_dir)
-        if not os.path.exists(full):
+        if check_exists and not os.path.exists(full):
             return
         tags = []
         if inherited_tags:
@@ -85,7 +100,7 @@ def load_broll_library(
     if footage_dir and os.path.isdir(footage_dir):
         for root, _dirs, files in os.walk(footage_dir):
             for fn in files:
-                if fn.lower().endswith(('.mp4', '.mov', '.mkv', '.webm', '.m4v')):
+                if fn.lower().endswith(VIDEO_EXTS):
                     discovered.append(os.path.join(root, fn))
 
     known_paths = {clip['path'] for clip in clips}
@@ -103,19 +118,110 @@ def load_broll_library(
     return {'clips': clips}
 
 
+def _long_enough(clip: Dict) -> bool:
+    # Unprobed clips (duration unknown) are kept
+    return clip.get('duration') is None or clip['duration'] >= MIN_CLIP_SEC
+
+
 def _keywords_from_text(text: str) -> List[str]:
     parts = re.findall(r"[A-Za-z0-9']+", text.lower())
     return [p for p in parts if len(p) >= 4]
 
 
+class TagIndex:
+    """Tag -> clip posting lists over a b-roll library.
+
+    Scoring only touches clips that share a tag with the script keywords,
+    so the cost grows with matched postings rather than library size
+    (NumPy when available, plain dicts otherwise). With ``avoid_recent``,
+    clips of the last rendered shorts (``note_used``) rank behind fresh
+    ones so consecutive shorts don't reuse the same footage.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, clips: List[Dict], recent_shorts: int = RECENT_SHORTS):
+        self.clips = [clip for clip in clips if _long_enough(clip)]
+        postings: Dict[str, List[int]] = {}
+        for cid, clip in enumerate(self.clips):
+            for tag in {t.lower() for t in (clip.get('tags') or [])}:
+                postings.setdefault(tag, []).append(cid)
+        weights = [float(clip.get('weight', 1.0) or 1.0) for clip in self.clips]
+        # Unmatched fallback order (0.15 * weight), computed once
+        self.by_weight = sorted(range(len(self.clips)), key=lambda cid: -weights[cid])
+        if np is not None:
+            self.postings = {tag: np.asarray(ids, dtype=np.int32) for tag, ids in postings.items()}
+            self.weights = np.asarray(weights, dtype=np.float32)
+        else:
+            self.postings = postings
+            self.weights = weights
+        self.recent: Deque[Set[str]] = deque(maxlen=max(0, recent_shorts))
+
+    def _matched(self, keywords: Set[str]) -> Tuple[List[int], List[float]]:
+        lists = [self.postings[k] for k in keywords if k in self.postings]
+        if not lists:
+            return [], []
+        if np is not None:
+            ids, counts = np.unique(np.concatenate(lists), return_counts=True)
+            scores = counts * 2.0 + self.weights[ids] * 0.25
+            return ids.tolist(), scores.tolist()
+        counts: Dict[int, int] = {}
+        for ids in lists:
+            for cid in ids:
+                counts[cid] = counts.get(cid, 0) + 1
+        return list(counts), [n * 2.0 + self.weights[cid] * 0.25 for cid, n in counts.items()]
+
+    def top(self, keywords: Set[str], k: int, rng: Optional[random.Random] = None, avoid_recent: bool = False) -> List[int]:
+        r = rng or random
+        ids, scores = self._matched(keywords)
+        recent: Set[str] = set()
+        if avoid_recent:
+            with self._lock:
+                recent = set().union(*self.recent) if self.recent else set()
+
+        def is_recent(cid: int) -> bool:
+            return self.clips[cid]['path'] in recent
+
+        # Pad with the best-weighted unmatched clips so short scripts still fill
+        # every segment (and recently used matches have fresh stand-ins)
+        fresh = sum(1 for cid in ids if not is_recent(cid))
+        if fresh < k:
+            seen = set(ids)
+            for cid in self.by_weight:
+                if fresh >= k:
+                    break
+                if cid not in seen:
+                    ids.append(cid)
+                    scores.append(0.15 * float(self.weights[cid]))
+                    fresh += not is_recent(cid)
+        scored = [
+            score + r.random() * 0.05 - (RECENT_PENALTY if is_recent(cid) else 0.0)
+            for cid, score in zip(ids, scores)
+        ]
+        if np is not None and len(scored) > k:
+            arr = np.asarray(scored, dtype=np.float64)
+            part = np.argpartition(-arr, k - 1)[:k]
+            order = part[np.argsort(-arr[part], kind='stable')]
+            return [ids[i] for i in order.tolist()]
+        order = sorted(range(len(scored)), key=lambda i: -scored[i])[:k]
+        return [ids[i] for i in order]
+
+    def note_used(self, paths: List[str]) -> None:
+        with self._lock:
+            self.recent.append(set(paths))
+
+
 def pick_broll_sequence(
     library: Dict,
     topic: Optional[str],
     script_text: str,
     segments: List[Dict],
+    rng: Optional[random.Random] = None,
+    avoid_recent: bool = False,
 ) -> List[Dict]:
-    clips: List[Dict] = library.get('clips') or []
-    if not clips:
+    # Persistent libraries carry a prebuilt index; ad-hoc ones get a throwaway one
+    index: TagIndex = library.get('tag_index') or TagIndex(library.get('clips') or [])
+    if not index.clips:
         return []
 
     keywords = set(_keywords_from_text(script_text or ''))
@@ -124,33 +230,37 @@ def pick_broll_sequence(
     if not keywords:
         keywords.update({'story', 'people', 'scene'})
 
-    scored: List[Dict] = []
-    for clip in clips:
-        tags = {t.lower() for t in (clip.get('tags') or [])}
-        matches = len(keywords & tags)
-        bonus = clip.get('weight', 1.0) or 1.0
-        score = matches * 2.0 + bonus * 0.25
-        if matches == 0:
-            score = 0.15 * bonus
-        scored.append({'clip': clip, 'score': score + random.random() * 0.05})
-
-    if not scored:
+    segs = segments or [{'start': 0.0, 'end': 4.0}]
+    ordered = index.top(keywords, len(segs), rng, avoid_recent)
+    if not ordered:
         return []
 
-    scored.sort(key=lambda item: item['score'], reverse=True)
-    ordered = [item['clip'] for item in scored]
-
-    segs = segments or [{'start': 0.0, 'end': 4.0}]
     selections: List[Dict] = []
     for idx, seg in enumerate(segs):
         duration = float(seg.get('end', 0.0) - seg.get('start', 0.0))
         if not duration or duration <= 0:
             duration = 3.0
-        clip = ordered[idx % len(ordered)]
+        clip = index.clips[ordered[idx % len(ordered)]]
         selections.append({
             'path': clip['path'],
             'tags': clip.get('tags') or [],
             'duration': max(1.5, duration),
+            # Probed length (library index only); lets renders trim instead of looping
+            'source_duration': clip.get('duration'),
         })
 
     return selections
+
+
+def footage_pool(library: Dict) -> List[str]:
+    """Sorted paths eligible as the looped fallback background (same duration floor as TagIndex)."""
+    index: Optional[TagIndex] = library.get('tag_index')
+    clips = index.clips if index is not None else [c for c in library.get('clips') or [] if _long_enough(c)]
+    return sorted(clip['path'] for clip in clips)
+
+
+def note_broll_used(library: Dict, selections: List[Dict]) -> None:
+    """Record the clips of a rendered short so the next picks with ``avoid_recent`` rotate away from them."""
+    index: Optional[TagIndex] = library.get('tag_index')
+    if index is not None and selections:
+        index.note_used([sel['path'] for sel in selections])
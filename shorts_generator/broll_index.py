@@ -0,0 +1,209 @@
+import glob
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils import log, read_json, warn, write_json
+from .broll import VIDEO_EXTS, TagIndex, _infer_tags_from_name, _load_index, _normalize_path
+
+INDEX_VERSION = 1
+# Seconds of packets read to estimate the keyframe interval
+KEYINT_PROBE_SEC = 10
+
+_process_cache: Dict[Tuple, Dict] = {}
+_process_lock = threading.Lock()
+
+
+def ffprobe_for(ffmpeg_bin: str) -> str:
+    # ffprobe ships next to ffmpeg; fall back to PATH lookup
+    head, tail = os.path.split(ffmpeg_bin)
+    return os.path.join(head, tail.replace('ffmpeg', 'ffprobe')) if 'ffmpeg' in tail else 'ffprobe'
+
+
+def _fraction(value: Optional[str]) -> Optional[float]:
+    try:
+        num, _, den = (value or '').partition('/')
+        return round(float(num) / float(den or 1), 3) if float(den or 1) else None
+    except ValueError:
+        return None
+
+
+def probe_clip(ffprobe_bin: str, path: str) -> Optional[Dict]:
+    """ffprobe duration, dimensions, fps, codec and mean keyframe interval (seconds)."""
+    try:
+        proc = subprocess.run([
+            ffprobe_bin, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=codec_name,width,height,avg_frame_rate,duration:format=duration',
+            '-of', 'json', path,
+        ], capture_output=True, text=True, check=False)
+        info = json.loads(proc.stdout or '{}') if proc.returncode == 0 else {}
+    except (OSError, ValueError) as exc:
+        warn(f"ffprobe failed for {path}: {exc}")
+        return None
+    streams = info.get('streams') or []
+    if not streams:
+        return None
+    st = streams[0]
+    duration = st.get('duration') or (info.get('format') or {}).get('duration')
+
+    keyint: Optional[float] = None
+    try:
+        pk = subprocess.run([
+            ffprobe_bin, '-v', 'error', '-select_streams', 'v:0',
+            '-read_intervals', f'%+{KEYINT_PROBE_SEC}',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path,
+        ], capture_output=True, text=True, check=False)
+        keys = []
+        for line in (pk.stdout or '').splitlines():
+            pts, _, flags = line.partition(',')
+            if 'K' in flags and pts not in ('', 'N/A'):
+                keys.append(float(pts))
+        if len(keys) >= 2:
+            keyint = round((keys[-1] - keys[0]) / (len(keys) - 1), 3)
+    except (OSError, ValueError):
+        pass
+
+    return {
+        'duration': round(float(duration), 3) if duration not in (None, 'N/A') else None,
+        'width': st.get('width'),
+        'height': st.get('height'),
+        'fps': _fraction(st.get('avg_frame_rate')),
+        'codec': st.get('codec_name'),
+        'keyint': keyint,
+    }
+
+
+class BrollLibraryIndex:
+    """Persistent b-roll library in ``data/broll_library.json``.
+
+    Directories under FOOTAGE_DIR are re-listed only when their mtime
+    changes, index.json is re-parsed only when it changes, and each clip
+    is probed once per (mtime, size). ``library()`` returns the same
+    ``{'clips': [...]}`` shape as ``load_broll_library`` with probe
+    metadata merged into every clip.
+    """
+
+    def __init__(self, path: str, ffprobe_bin: str = 'ffprobe'):
+        self.path = path
+        self.ffprobe_bin = ffprobe_bin
+        data = read_json(path, default=None) or {}
+        if data.get('version') != INDEX_VERSION:
+            data = {}
+        self.dirs: Dict[str, Dict] = data.get('dirs') or {}
+        self.index_file: Dict = data.get('index_file') or {}
+        self.clips: Dict[str, Dict] = data.get('clips') or {}
+
+    def _scan_dir(self, root: str, seen: Dict[str, Dict], found: List[str], visited: Optional[Set[str]] = None) -> None:
+        # Symlinked folders are followed, so skip real paths already walked (symlink loops)
+        visited = set() if visited is None else visited
+        real = os.path.realpath(root)
+        if real in visited:
+            return
+        visited.add(real)
+        try:
+            mtime_ns = os.stat(root).st_mtime_ns
+        except OSError:
+            return
+        entry = self.dirs.get(root)
+        if not entry or entry.get('mtime_ns') != mtime_ns:
+            files: List[str] = []
+            subdirs: List[str] = []
+            with os.scandir(root) as it:
+                for de in it:
+                    if de.is_dir(follow_symlinks=True):
+                        subdirs.append(de.path)
+                    elif de.name.lower().endswith(VIDEO_EXTS):
+                        files.append(de.path)
+            entry = {'mtime_ns': mtime_ns, 'files': sorted(files), 'subdirs': sorted(subdirs)}
+        seen[root] = entry
+        found.extend(entry['files'])
+        for sub in entry['subdirs']:
+            self._scan_dir(sub, seen, found, visited)
+
+    def _curated(self, index_path: Optional[str], base_dir: Optional[str]) -> List[Dict]:
+        if not index_path or not os.path.exists(index_path):
+            self.index_file = {}
+            return []
+        st = os.stat(index_path)
+        sig = [os.path.abspath(index_path), st.st_mtime_ns, st.st_size, base_dir]
+        if self.index_file.get('sig') != sig:
+            # Existence is checked below against the probed clip set instead
+            self.index_file = {'sig': sig, 'entries': _load_index(index_path, base_dir, check_exists=False)}
+        return self.index_file['entries']
+
+    def update(self, footage_dir: Optional[str], footage_glob: Optional[str], index_path: Optional[str]) -> Dict:
+        base_dir = footage_dir or (os.path.dirname(index_path) if index_path else None)
+        curated = self._curated(index_path, base_dir)
+
+        discovered: List[str] = []
+        seen_dirs: Dict[str, Dict] = {}
+        if footage_dir and os.path.isdir(footage_dir):
+            self._scan_dir(os.path.abspath(footage_dir), seen_dirs, discovered)
+        if footage_glob:
+            discovered.extend(glob.glob(os.path.expandvars(footage_glob), recursive=True))
+        self.dirs = seen_dirs
+
+        wanted: Dict[str, Dict] = {}
+        for item in curated:
+            full = os.path.abspath(item['path'])
+            wanted.setdefault(full, {**item, 'path': full})
+        for path in discovered:
+            full = _normalize_path(path, None)
+            wanted.setdefault(full, {'path': full, 'tags': _infer_tags_from_name(full), 'weight': 1.0})
+
+        clips: Dict[str, Dict] = {}
+        to_probe: List[Tuple[str, Dict, int, int]] = []
+        for path, item in wanted.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            prev = self.clips.get(path)
+            # Failed probes are retried (e.g. ffprobe was installed since the last run)
+            if prev and prev.get('probed') and prev.get('mtime_ns') == st.st_mtime_ns and prev.get('size') == st.st_size:
+                clips[path] = {**prev, 'tags': item['tags'], 'weight': item['weight']}
+            else:
+                to_probe.append((path, item, st.st_mtime_ns, st.st_size))
+
+        if to_probe:
+            with ThreadPoolExecutor(max_workers=min(8, len(to_probe)), thread_name_prefix='probe') as pool:
+                probes = list(pool.map(lambda job: probe_clip(self.ffprobe_bin, job[0]), to_probe))
+            for (path, item, mtime_ns, size), meta in zip(to_probe, probes):
+                clips[path] = {**item, **(meta or {}), 'mtime_ns': mtime_ns, 'size': size, 'probed': bool(meta)}
+
+        dropped = len(set(self.clips) - set(clips))
+        self.clips = clips
+        write_json(self.path, {
+            'version': INDEX_VERSION,
+            'dirs': self.dirs,
+            'index_file': self.index_file,
+            'clips': clips,
+        })
+        if to_probe or dropped:
+            log(f"B-roll library index: {len(clips)} clip(s), {len(to_probe)} probed, {dropped} dropped.")
+        return {'clips': len(clips), 'probed': len(to_probe), 'dropped': dropped}
+
+    def library(self) -> Dict:
+        clips = [self.clips[p] for p in sorted(self.clips)]
+        return {'clips': clips, 'tag_index': TagIndex(clips)}
+
+
+def load_library_index(
+    data_dir: str,
+    ffmpeg_bin: str,
+    footage_dir: Optional[str],
+    footage_glob: Optional[str],
+    index_path: Optional[str],
+) -> Dict:
+    """Update the persistent index once per process and return the library."""
+    key = (os.path.abspath(data_dir), footage_dir, footage_glob, index_path)
+    with _process_lock:
+        cached = _process_cache.get(key)
+        if cached is None:
+            idx = BrollLibraryIndex(os.path.join(data_dir, 'broll_library.json'), ffprobe_for(ffmpeg_bin))
+            idx.update(footage_dir, footage_glob, index_path)
+            cached = _process_cache[key] = idx.library()
+    return cached
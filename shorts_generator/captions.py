@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils import ensure_dir, log
+
+try:  # optional dependency for pre-rasterized captions
+    from PIL import Image, ImageDraw, ImageFont  # type: ignore
+except Exception:  # pragma: no cover
+    Image = None  # type: ignore
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+FONT_SIZE = 58
+SAFE_TOP = 200
+LINE_STEP = 110
+BOX_BORDER = 20
+CAPTION_STYLE = {'color': 'white', 'box': 'black@0.3', 'box_border': BOX_BORDER, 'shadow': 2, 'line_step': LINE_STEP}
+
+
+def escape_text(text: str) -> str:
+    return text.replace(':', '\\:').replace("'", "\\'").replace(',', '\\,').replace('\n', '\\n')
+
+
+def line_breaks(text: str, max_chars: int = 28, max_lines: int = 3) -> str:
+    words = text.split()
+    lines: List[str] = []
+    cur = ''
+    for w in words:
+        if len(cur) + len(w) + 1 > max_chars:
+            lines.append(cur.strip())
+            cur = w
+            if len(lines) >= max_lines:
+                break
+        else:
+            cur = (cur + ' ' + w).strip()
+    if cur and len(lines) < max_lines:
+        lines.append(cur)
+    return '\n'.join(lines)
+
+
+def segment_text_filters(segments: List[Dict], safe_top: int = SAFE_TOP) -> str:
+    # Draw each segment in safe area with enable between times; render up to 3 lines separately
+    filters: List[str] = []
+    for seg in segments:
+        lines = line_breaks(seg['text']).split('\n')
+        enable = f"between(t\\,{seg['start']:.2f}\\,{seg['end']:.2f})"
+        for idx, line in enumerate(lines[:3]):
+            esc = escape_text(line)
+            y = safe_top + idx * LINE_STEP
+            filters.append(
+                f"drawtext=fontfile={FONT_PATH}:text='{esc}':fontcolor=white:fontsize={FONT_SIZE}:x=(w-text_w)/2:y={y}:"
+                f"box=1:boxcolor=black@0.3:boxborderw={BOX_BORDER}:shadowcolor=black:shadowx=2:shadowy=2:enable='{enable}'"
+            )
+    return ','.join(filters)
+
+
+class CaptionEngine:
+    """Turns timed segments into ffmpeg inputs plus filter chains.
+
+    ``build`` returns (extra input args, filter chains) that read the
+    ``src`` label and write the ``dst`` label; extra inputs are numbered
+    from ``first_input``.
+    """
+
+    name = 'base'
+
+    def build(self, segments: List[Dict], src: str, dst: str, first_input: int) -> Tuple[List[str], List[str]]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+
+class DrawtextCaptions(CaptionEngine):
+    name = 'drawtext'
+
+    def build(self, segments: List[Dict], src: str, dst: str, first_input: int) -> Tuple[List[str], List[str]]:
+        vf = segment_text_filters(segments) or 'null'
+        return [], [f"[{src}]{vf}[{dst}]"]
+
+
+class OverlayCaptions(CaptionEngine):
+    """Pre-rasterized captions: one transparent PNG per segment, composited with overlay.
+
+    PNGs are cached by (lines, font, size, style), so template sentences such as
+    the CTA bank and emotion templates are drawn once and reused across shorts.
+    """
+
+    name = 'overlay'
+    _lock = threading.Lock()
+    _fonts: Dict[Tuple[str, int], object] = {}
+
+    def __init__(self, cache_dir: str, font_path: str = FONT_PATH, font_size: int = FONT_SIZE):
+        self.cache_dir = cache_dir
+        self.font_path = font_path
+        self.font_size = font_size
+        ensure_dir(cache_dir)
+
+    def _font(self):
+        key = (self.font_path, self.font_size)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is None:
+                try:
+                    font = ImageFont.truetype(self.font_path, self.font_size)
+                except OSError:
+                    font = ImageFont.load_default()
+                self._fonts[key] = font
+        return font
+
+    def png_for(self, lines: List[str]) -> str:
+        raw = json.dumps([lines, self.font_path, self.font_size, CAPTION_STYLE], sort_keys=True)
+        key = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:24]
+        out = os.path.join(self.cache_dir, f'{key}.png')
+        if os.path.exists(out):
+            return out
+
+        font = self._font()
+        height = BOX_BORDER * 2 + LINE_STEP * max(1, len(lines))
+        img = Image.new('RGBA', (1080, height), (0, 0, 0, 0))
+        box_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
+        box_draw = ImageDraw.Draw(box_layer)
+        text_draw = ImageDraw.Draw(img)
+        placed = []
+        for idx, line in enumerate(lines):
+            left, top, right, bottom = text_draw.textbbox((0, 0), line, font=font)
+            w = right - left
+            x = (1080 - w) // 2
+            y = BOX_BORDER + idx * LINE_STEP
+            box_draw.rectangle(
+                (x - BOX_BORDER, y - BOX_BORDER, x + w + BOX_BORDER, y + (bottom - top) + BOX_BORDER),
+                fill=(0, 0, 0, 77),
+            )
+            placed.append((x - left, y - top, line))
+        img = Image.alpha_composite(box_layer, img)
+        text_draw = ImageDraw.Draw(img)
+        for x, y, line in placed:
+            text_draw.text((x + 2, y + 2), line, font=font, fill=(0, 0, 0, 255))
+            text_draw.text((x, y), line, font=font, fill=(255, 255, 255, 255))
+
+        tmp = f"{out}.{os.getpid()}-{threading.get_ident()}.tmp"
+        img.save(tmp, format='PNG', optimize=True)
+        os.replace(tmp, out)
+        return out
+
+    def build(self, segments: List[Dict], src: str, dst: str, first_input: int) -> Tuple[List[str], List[str]]:
+        inputs: List[str] = []
+        chains: List[str] = []
+        cur = src
+        for n, seg in enumerate(segments):
+            lines = [ln for ln in line_breaks(seg['text']).split('\n') if ln][:3]
+            if not lines:
+                continue
+            inputs += ['-i', self.png_for(lines)]
+            nxt = dst if n == len(segments) - 1 else f'{dst}_{n}'
+            enable = f"between(t\\,{seg['start']:.2f}\\,{seg['end']:.2f})"
+            chains.append(
+                f"[{cur}][{first_input + len(inputs) // 2 - 1}:v]"
+                f"overlay=x=0:y={SAFE_TOP - BOX_BORDER}:eof_action=repeat:enable='{enable}'[{nxt}]"
+            )
+            cur = nxt
+        if cur != dst:
+            chains.append(f"[{cur}]null[{dst}]")
+        return inputs, chains
+
+
+def _ass_time(t: float) -> str:
+    cs = int(round(max(0.0, t) * 100))
+    h, rem = divmod(cs, 360000)
+    m, rem = divmod(rem, 6000)
+    sec, cs = divmod(rem, 100)
+    return f"{h}:{m:02d}:{sec:02d}.{cs:02d}"
+
+
+def _ass_escape(text: str) -> str:
+    return text.replace('\\', '/').replace('{', '(').replace('}', ')')
+
+
+class AssCaptions(CaptionEngine):
+    """Render all segments through one ASS subtitle file and libass."""
+
+    name = 'ass'
+
+    def __init__(self, ass_path: str, font_name: str = 'DejaVu Sans', font_size: int = FONT_SIZE):
+        self.ass_path = ass_path
+        self.font_name = font_name
+        self.font_size = font_size
+
+    def write(self, segments: List[Dict]) -> str:
+        # BorderStyle=3 draws an opaque box in OutlineColour (black, ~30% opacity)
+        lines = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            "PlayResX: 1080",
+            "PlayResY: 1920",
+            "WrapStyle: 2",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, "
+            "Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, "
+            "MarginR, MarginV, Encoding",
+            f"Style: Caption,{self.font_name},{self.font_size},&H00FFFFFF,&H00FFFFFF,&HB3000000,&H80000000,-1,0,0,0,"
+            f"100,100,0,0,3,{BOX_BORDER},2,8,40,40,{SAFE_TOP},1",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        ]
+        for seg in segments:
+            text = '\\N'.join(_ass_escape(ln) for ln in line_breaks(seg['text']).split('\n') if ln)
+            lines.append(f"Dialogue: 0,{_ass_time(seg['start'])},{_ass_time(seg['end'])},Caption,,0,0,0,,{text}")
+        ensure_dir(os.path.dirname(self.ass_path) or '.')
+        with open(self.ass_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return self.ass_path
+
+    def build(self, segments: List[Dict], src: str, dst: str, first_input: int) -> Tuple[List[str], List[str]]:
+        path = self.write(segments).replace('\\', '/').replace("'", "\\'")
+        return [], [f"[{src}]ass=filename='{path}'[{dst}]"]
+
+
+def make_caption_engine(name: Optional[str], *, cache_dir: str, ass_path: str) -> CaptionEngine:
+    key = (name or 'drawtext').strip().lower()
+    if key == 'overlay':
+        if Image is None:
+            log("Pillow not installed; overlay captions fall back to drawtext.")
+            return DrawtextCaptions()
+        return OverlayCaptions(cache_dir)
+    if key == 'ass':
+        return AssCaptions(ass_path)
+    return DrawtextCaptions()
@@ -0,0 +1,71 @@
+import threading
+from typing import Dict, Optional
+
+from utils import log, read_json, write_json
+
+# Slowest (smallest files) first; 'default' matches DEFAULT_ENCODER
+PROFILES = {
+    'compact': {'preset': 'slow', 'crf': 20},
+    'balanced': {'preset': 'medium', 'crf': 19},
+    'default': {'preset': 'veryfast', 'crf': 18},
+    'rush': {'preset': 'ultrafast', 'crf': 20},
+}
+# Starting guesses for whole-short render speed (seconds of video per wall
+# second, per worker) until real renders have been measured
+PRIOR_SPEED = {'compact': 0.35, 'balanced': 0.6, 'default': 1.2, 'rush': 2.5}
+# Measured speed is an EWMA so one slow render doesn't flip the choice
+SPEED_ALPHA = 0.3
+# Only pick a profile whose estimate fits the budget with this much headroom
+SAFETY = 1.5
+
+
+class EncodeProfileSelector:
+    """Pick an x264 preset/CRF from the time left until the queue runs dry.
+
+    The budget per short is the time to the next unfilled schedule slot
+    times the number of render workers, divided by the shorts still needed.
+    The slowest profile whose calibrated speed fits that budget wins; with
+    no deficit the most compact profile is used. Measured speeds live in
+    ``data/encode_profiles.json``.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: str, fixed: Optional[str] = None):
+        self.path = path
+        self.fixed = fixed if fixed in PROFILES else None
+        data = read_json(path, default=None) or {}
+        self.speeds: Dict[str, Dict] = data.get('profiles') or {}
+
+    def speed(self, name: str) -> float:
+        entry = self.speeds.get(name) or {}
+        return float(entry.get('speed') or PRIOR_SPEED[name])
+
+    def choose(self, deficit: int, seconds_left: Optional[float], workers: int, duration: float) -> Dict:
+        if self.fixed:
+            name, reason = self.fixed, 'fixed'
+        elif deficit <= 0:
+            name, reason = 'compact', 'no deficit'
+        elif seconds_left is None:
+            name, reason = 'default', 'no deadline'
+        else:
+            budget = seconds_left * max(1, workers) / deficit
+            name = 'rush'
+            for candidate in PROFILES:
+                if duration / self.speed(candidate) * SAFETY <= budget:
+                    name = candidate
+                    break
+            reason = f'{budget:.0f}s/short budget'
+        return {'profile': name, **PROFILES[name], 'reason': reason}
+
+    def record(self, name: Optional[str], duration: float, render_sec: float) -> None:
+        if name not in PROFILES or not render_sec or render_sec <= 0:
+            return
+        measured = duration / render_sec
+        with self._lock:
+            entry = self.speeds.get(name) or {}
+            prev = entry.get('speed')
+            speed = measured if prev is None else prev + SPEED_ALPHA * (measured - prev)
+            self.speeds[name] = {'speed': round(speed, 4), 'samples': int(entry.get('samples', 0)) + 1}
+            write_json(self.path, {'profiles': self.speeds})
+        log(f"Encode profile {name}: {measured:.2f}x realtime this render, calibrated {speed:.2f}x.")
@@ -1,136 +1,132 @@
-import glob
+import hashlib
 import os
 import random
+import shutil
 import subprocess
-from typing import Dict, List, Optional
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from utils import ensure_dir, run_ffmpeg, synthesize_with_piper, synthesize_with_command, log
-from .broll import load_broll_library, pick_broll_sequence
+from utils import annotate_runs, ensure_dir, ffmpeg_job, log, run_ffmpeg, set_ffmpeg_job, synthesize_with_piper, synthesize_with_command
+from utils.scratch import ScratchDir, promote, scratch_root
+from utils.tts_cache import TtsCache, concat_wavs, get_tts_cache
+from .bg_bank import BackgroundBank
+from .broll import footage_pool, note_broll_used, pick_broll_sequence
+from .broll_index import load_library_index
+from .captions import CaptionEngine, DrawtextCaptions, FONT_PATH, escape_text, line_breaks, make_caption_engine
+from .manifest import file_signature, load_cached_render, render_key, save_render_manifest, seeded_rng
+from .music import MusicIndex, music_candidates
+from .proxy_cache import ProxyCache
+from .segments import SegmentCache, render_segmented
+from .stages import StageGraph
+from .thumbs import compose_thumbnail, thumb_ext
+from .render_graph import (
+    BROLL_VF,
+    DEFAULT_ENCODER,
+    DRAFT_ENCODER,
+    DRAFT_OUTPUT,
+    FOOTAGE_VF,
+    FRACTAL_VF,
+    KEN_BURNS_VF,
+    audio_filter,
+    batch_args,
+    loop_args,
+    music_input,
+    random_color_source,
+    random_fractal_source,
+    single_pass_args,
+    thread_args,
+    thumb_output,
+    thumb_tap,
+    x264_args,
+)
 
 
-def _escape_text(text: str) -> str:
-    return text.replace(':', '\\:').replace("'", "\\'").replace(',', '\\,').replace('\n', '\\n')
-
-
-def _line_breaks(text: str, max_chars: int = 28, max_lines: int = 3) -> str:
-    words = text.split()
-    lines: List[str] = []
-    cur = ''
-    for w in words:
-        if len(cur) + len(w) + 1 > max_chars:
-            lines.append(cur.strip())
-            cur = w
-            if len(lines) >= max_lines:
-                break
-        else:
-            cur = (cur + ' ' + w).strip()
-    if cur and len(lines) < max_lines:
-        lines.append(cur)
-    return '\n'.join(lines)
-
-
-def _segment_text_filters(segments: List[Dict], safe_top: int = 200) -> str:
-    # Draw each segment in safe area with enable between times; render up to 3 lines separately
-    font = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-    filters: List[str] = []
-    for seg in segments:
-        lines = _line_breaks(seg['text']).split('\n')
-        enable = f"between(t\,{seg['start']:.2f}\,{seg['end']:.2f})"
-        for idx, line in enumerate(lines[:3]):
-            esc = _escape_text(line)
-            y = safe_top + idx * 110
-            filters.append(
-                f"drawtext=fontfile={font}:text='{esc}':fontcolor=white:fontsize=58:x=(w-text_w)/2:y={y}:"
-                f"box=1:boxcolor=black@0.3:boxborderw=20:shadowcolor=black:shadowx=2:shadowy=2:enable='{enable}'"
-            )
-    return ','.join(filters)
-
-
-def _make_footage_bg(ffmpeg_bin: str, source_path: str, out_path: str, duration: float) -> int:
+def _make_footage_bg(ffmpeg_bin: str, source_path: str, out_path: str, duration: float, encoder: Optional[Dict] = None) -> int:
     # Loop and crop the footage into 9:16 with subtle motion filters
-    vf = (
-        "scale=1080:1920:force_original_aspect_ratio=cover,"
-        "crop=1080:1920,"
-        "setsar=1:1,"
-        "fps=30,"
-        "eq=saturation=1.25:contrast=1.05"
-    )
     args = [
         '-stream_loop', '-1',
         '-i', source_path,
-        '-vf', vf,
+        '-vf', FOOTAGE_VF,
         '-t', f'{duration:.2f}',
         '-an',
+        *thread_args(encoder),
         out_path,
     ]
-    return run_ffmpeg(ffmpeg_bin, args)
+    return run_ffmpeg(ffmpeg_bin, args, stage='bg')
 
 
-def _make_fractal_bg(ffmpeg_bin: str, out_path: str, duration: float) -> int:
+def _make_fractal_bg(
+    ffmpeg_bin: str,
+    out_path: str,
+    duration: float,
+    encoder: Optional[Dict] = None,
+    rng: Optional[random.Random] = None,
+) -> int:
     # Dynamic fractal fallback to avoid flat color screens
-    start_x = random.uniform(-1.0, 0.5)
-    start_y = random.uniform(-0.8, 0.8)
-    start_scale = random.uniform(1.2, 2.8)
-    end_scale = random.uniform(0.2, 0.6)
-    morph = random.uniform(0.003, 0.02)
-    mandelbrot = (
-        f"mandelbrot=s=480x854:rate=30:start_x={start_x}:start_y={start_y}:start_scale={start_scale}:"
-        f"end_scale={end_scale}:morphxf={morph}:morphyf={morph * 1.3}:outer=iteration_count"
-    )
-    vf = "scale=1080:1920,setsar=1:1,fps=30,hue=h='2*PI*t':s=1.4"
     args = [
         '-f', 'lavfi',
-        '-i', mandelbrot,
-        '-vf', vf,
+        '-i', random_fractal_source(rng),
+        '-vf', FRACTAL_VF,
         '-t', f'{duration:.2f}',
+        *thread_args(encoder),
         out_path,
     ]
-    return run_ffmpeg(ffmpeg_bin, args)
+    return run_ffmpeg(ffmpeg_bin, args, stage='bg')
 
 
-def _prep_broll_clip(ffmpeg_bin: str, source_path: str, out_path: str, duration: float) -> int:
-    vf = (
-        "scale=1080:1920:force_original_aspect_ratio=cover,"
-        "crop=1080:1920,"
-        "setsar=1:1,"
-        "fps=30,"
-        "eq=saturation=1.15:contrast=1.05"
-    )
+def _prep_broll_clip(
+    ffmpeg_bin: str,
+    source_path: str,
+    out_path: str,
+    duration: float,
+    encoder: Optional[Dict] = None,
+    source_duration: Optional[float] = None,
+) -> int:
     args = [
-        '-stream_loop', '-1',
+        *loop_args(source_duration, duration),
         '-i', source_path,
-        '-vf', vf,
+        '-vf', BROLL_VF,
         '-an',
         '-t', f'{duration:.2f}',
-        '-preset', 'veryfast',
-        '-crf', '18',
-        '-c:v', 'libx264',
+        *x264_args(encoder),
         '-pix_fmt', 'yuv420p',
         '-r', '30',
         out_path,
     ]
-    return run_ffmpeg(ffmpeg_bin, args)
+    return run_ffmpeg(ffmpeg_bin, args, stage='broll_prep')
 
 
 def _render_broll_sequence(
     ffmpeg_bin: str,
     selections: List[Dict],
     tmp_bg: str,
-    data_dir: str,
+    work_dir: str,
     base: str,
+    proxy_cache: Optional[ProxyCache] = None,
+    encoder: Optional[Dict] = None,
 ) -> int:
-    prepped: List[str] = []
+    # (clip path, outpoint) pairs; cached proxies are longer than needed and get
+    # trimmed by the concat demuxer while stream-copying.
+    prepped: List[Tuple[str, Optional[float]]] = []
     for idx, sel in enumerate(selections):
-        clip_out = os.path.join(data_dir, 'video', f'{base}_broll_{idx}.mp4')
-        rc = _prep_broll_clip(ffmpeg_bin, sel['path'], clip_out, sel['duration'])
+        proxy = proxy_cache.ensure(
+            ffmpeg_bin, sel['path'], BROLL_VF, sel['duration'], encoder, sel.get('source_duration'),
+        ) if proxy_cache else None
+        if proxy:
+            prepped.append((proxy, sel['duration']))
+            continue
+        clip_out = os.path.join(work_dir, f'{base}_broll_{idx}.mp4')
+        rc = _prep_broll_clip(ffmpeg_bin, sel['path'], clip_out, sel['duration'], encoder, sel.get('source_duration'))
         if rc != 0:
             return rc
-        prepped.append(clip_out)
+        prepped.append((clip_out, None))
 
-    concat_path = os.path.join(data_dir, 'video', f'{base}_broll_concat.txt')
+    concat_path = os.path.join(work_dir, f'{base}_broll_concat.txt')
     with open(concat_path, 'w', encoding='utf-8') as fh:
-        for clip in prepped:
+        for clip, outpoint in prepped:
             fh.write(f"file '{clip}'\n")
+            if outpoint is not None:
+                fh.write(f"outpoint {outpoint:.3f}\n")
 
     return run_ffmpeg(ffmpeg_bin, [
         '-f', 'concat',
@@ -138,53 +134,94 @@ def _render_broll_sequence(
         '-i', concat_path,
         '-c', 'copy',
         tmp_bg,
-    ])
+    ], stage='concat')
 
 
-def _make_bg_video(ffmpeg_bin: str, out_path: str, duration: float) -> int:
-    colors = ['#0ea5e9', '#ef4444', '#22c55e', '#a855f7', '#f59e0b']
-    color = random.choice(colors)
-    noise_seed = random.randint(0, 9999)
-    vf = (
-        f"noise=alls=1080x1920:all_seed={noise_seed}:all_strength=8:"
-        "all_flags=u+t,format=yuv420p"
-    )
+def _copy_banked_bg(ffmpeg_bin: str, clip_path: str, out_path: str, duration: float) -> int:
+    # Banked loops are already encoded at 1080x1920@30; trimming is a stream copy
+    return run_ffmpeg(ffmpeg_bin, ['-i', clip_path, '-t', f'{duration:.2f}', '-c', 'copy', '-an', out_path], stage='bg')
+
+
+def _make_bg_video(
+    ffmpeg_bin: str,
+    out_path: str,
+    duration: float,
+    encoder: Optional[Dict] = None,
+    rng: Optional[random.Random] = None,
+) -> int:
+    source, vf = random_color_source(duration, rng)
     args = [
         '-f', 'lavfi',
-        '-i', f"color=c={color}:s=1080x1920:d={duration:.2f}",
+        '-i', source,
         '-vf', vf,
         '-r', '30',
+        *thread_args(encoder),
         out_path,
     ]
-    return run_ffmpeg(ffmpeg_bin, args)
+    return run_ffmpeg(ffmpeg_bin, args, stage='bg')
 
 
-def _burn_segments(ffmpeg_bin: str, in_video: str, segments: List[Dict], out_video: str) -> int:
-    vf = _segment_text_filters(segments)
-    return run_ffmpeg(ffmpeg_bin, ['-i', in_video, '-vf', vf, '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18', out_video])
+def _burn_segments(
+    ffmpeg_bin: str,
+    in_video: str,
+    segments: List[Dict],
+    out_video: str,
+    encoder: Optional[Dict] = None,
+    captions: Optional[CaptionEngine] = None,
+    thumb_frame: Optional[str] = None,
+) -> int:
+    src, tap = '0:v', []
+    if thumb_frame:
+        tap, src = thumb_tap(src)
+    inputs, chains = (captions or DrawtextCaptions()).build(segments, src, 'v', first_input=1)
+    return run_ffmpeg(ffmpeg_bin, [
+        '-i', in_video, *inputs,
+        '-filter_complex', ';'.join(tap + chains),
+        '-map', '[v]',
+        *x264_args(encoder),
+        out_video,
+        *(thumb_output(thumb_frame) if thumb_frame else []),
+    ], stage='burn')
 
 
-def _burn_simple_text(ffmpeg_bin: str, in_video: str, text: str, out_video: str) -> int:
-    font = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-    esc = _escape_text(_line_breaks(text))
+def _burn_simple_text(ffmpeg_bin: str, in_video: str, text: str, out_video: str, encoder: Optional[Dict] = None) -> int:
+    esc = escape_text(line_breaks(text))
     vf = (
-        f"drawtext=fontfile={font}:text='{esc}':fontcolor=white:fontsize=58:x=(w-text_w)/2:y=200:"
+        f"drawtext=fontfile={FONT_PATH}:text='{esc}':fontcolor=white:fontsize=58:x=(w-text_w)/2:y=200:"
         f"box=1:boxcolor=black@0.3:boxborderw=20:shadowcolor=black:shadowx=2:shadowy=2"
     )
-    return run_ffmpeg(ffmpeg_bin, ['-i', in_video, '-vf', vf, '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18', out_video])
+    return run_ffmpeg(ffmpeg_bin, ['-i', in_video, '-vf', vf, *x264_args(encoder), out_video], stage='burn')
 
 
-def _find_music(music_dir: Optional[str], music_glob: Optional[str]) -> Optional[str]:
-    candidates: List[str] = []
-    if music_glob:
-        candidates.extend(glob.glob(os.path.expandvars(music_glob)))
-    if music_dir and os.path.isdir(music_dir):
-        for fn in os.listdir(music_dir):
-            if fn.lower().endswith(('.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg')):
-                candidates.append(os.path.join(music_dir, fn))
+def _find_music(music_dir: Optional[str], music_glob: Optional[str], rng: Optional[random.Random] = None) -> Optional[str]:
+    candidates = music_candidates(music_dir, music_glob)
     if not candidates:
         return None
-    return random.choice(candidates)
+    # Sorted so a seeded rng picks the same track for the same request
+    return (rng or random).choice(candidates)
+
+
+def _pick_music(
+    data_dir: str,
+    music_dir: Optional[str],
+    music_glob: Optional[str],
+    duration: float,
+    music_vol_db: float,
+    rng: Optional[random.Random] = None,
+) -> Optional[Dict]:
+    # Indexed tracks carry a precomputed gain and get a random start offset;
+    # unindexed libraries fall back to a plain pick normalized with loudnorm.
+    indexed = MusicIndex(os.path.join(data_dir, 'music_index.json')).pick(duration, music_vol_db, rng)
+    if indexed:
+        return indexed
+    path = _find_music(music_dir, music_glob, rng)
+    return {'path': path, 'gain': None, 'offset': 0.0} if path else None
+
+
+def _music_signature(music: Optional[Dict]) -> Optional[List]:
+    if not music:
+        return None
+    return [file_signature(music['path']), music.get('gain'), music.get('offset')]
 
 
 def _mux_audio(
@@ -192,41 +229,33 @@ def _mux_audio(
     in_video: str,
     voice_wav: str,
     out_video: str,
-    music_path: Optional[str],
+    music: Optional[Dict],
     music_vol_db: float,
     target_duration: float,
 ) -> int:
-    if music_path and os.path.exists(music_path):
-        filter_complex = (
-            "[1:a]loudnorm=I=-16:TP=-1.5:LRA=11:print_format=none[voice];"
-            "[2:a]loudnorm=I={mv}:TP=-2.0:LRA=9:print_format=none[music_norm];"
-            "[music_norm][voice]sidechaincompress=threshold=-30dB:ratio=8:attack=5:release=400:makeup=0[music_duck];"
-            "[voice][music_duck]amix=inputs=2:weights=1 0.35:duration=first:dropout_transition=2[mix];"
-            "[mix]volume=1.0,aresample=async=1,apad=pad_dur={dur}[a]"
-        )
-        filter_complex = filter_complex.format(mv=f"{music_vol_db}dB", dur=f"{target_duration:.2f}")
+    if music and os.path.exists(music['path']):
         return run_ffmpeg(ffmpeg_bin, [
             '-i', in_video,
             '-i', voice_wav,
-            '-i', music_path,
-            '-filter_complex', filter_complex,
+            *music_input(music),
+            '-filter_complex', audio_filter(1, 2, music_vol_db, target_duration, music_gain=music.get('gain')),
             '-map', '0:v', '-map', '[a]',
             '-c:v', 'copy', '-c:a', 'aac', '-shortest', out_video
-        ])
+        ], stage='mux')
     else:
         return run_ffmpeg(ffmpeg_bin, [
             '-i', in_video,
             '-i', voice_wav,
-            '-filter_complex', f"[1:a]loudnorm=I=-16:TP=-1.5:LRA=11:print_format=none,apad=pad_dur={target_duration:.2f}[a]",
+            '-filter_complex', audio_filter(1, None, music_vol_db, target_duration),
             '-map', '0:v', '-map', '[a]',
             '-c:v', 'copy', '-c:a', 'aac', '-shortest', out_video
-        ])
+        ], stage='mux')
 
 
 def _make_silence(ffmpeg_bin: str, out_wav: str, duration: float) -> int:
     return run_ffmpeg(ffmpeg_bin, [
         '-f', 'lavfi', '-i', f"anullsrc=r=48000:cl=stereo", '-t', f"{duration:.2f}", out_wav
-    ])
+    ], stage='silence')
 
 
 def _escape_filter_text(text: str) -> str:
@@ -244,13 +273,48 @@ def _make_flite_voice(ffmpeg_bin: str, text: str, out_wav: str, voice: Optional[
         '-c:a', 'pcm_s16le',
         '-ar', '44100',
         out_wav,
-    ])
+    ], stage='flite')
 
 
 def _extract_thumb(ffmpeg_bin: str, in_video: str, out_png: str) -> int:
     return run_ffmpeg(ffmpeg_bin, [
         '-ss', '00:00:01.000', '-i', in_video, '-vframes', '1', out_png
-    ])
+    ], stage='thumb')
+
+
+def _make_thumbnail(
+    ffmpeg_bin: str,
+    thumb_engine: str,
+    thumb_format: str,
+    sd_thumb_cmd: Optional[str],
+    script_text: str,
+    hook_text: str,
+    bg_image: Optional[str],
+    frame_png: str,
+    out_mp4: str,
+    out_base: str,
+) -> str:
+    """Write the thumbnail and return its path.
+
+    SDXL runs only for thumb_engine='sd'. Otherwise the hook is composited
+    over the SD background or the frame tapped during the render; without a
+    tapped frame one is grabbed from the finished MP4 (captions included, so
+    no text is added).
+    """
+    if thumb_engine == 'sd' and sd_thumb_cmd:
+        out_png = f'{out_base}.png'
+        if _sd_make_image(sd_thumb_cmd, prompt=script_text, out_path=out_png):
+            return out_png
+    out_thumb = f'{out_base}.{thumb_ext(thumb_format)}'
+    for image, text in ((bg_image, hook_text), (frame_png, hook_text)):
+        if image and os.path.exists(image) and compose_thumbnail(image, text, out_thumb, thumb_format):
+            return out_thumb
+    if _extract_thumb(ffmpeg_bin, out_mp4, frame_png) == 0 and compose_thumbnail(frame_png, None, out_thumb, thumb_format):
+        return out_thumb
+    out_png = f'{out_base}.png'
+    if os.path.exists(frame_png):
+        os.replace(frame_png, out_png)
+    return out_png
 
 
 def _sd_make_image(cmd: Optional[str], prompt: str, out_path: str) -> bool:
@@ -273,58 +337,200 @@ def _sd_make_image(cmd: Optional[str], prompt: str, out_path: str) -> bool:
         return False
 
 
-def _ken_burns(ffmpeg_bin: str, image_path: str, out_path: str, duration: float) -> int:
+def _ken_burns(ffmpeg_bin: str, image_path: str, out_path: str, duration: float, encoder: Optional[Dict] = None) -> int:
     return run_ffmpeg(ffmpeg_bin, [
-        '-loop', '1', '-i', image_path, '-t', f'{duration:.2f}', '-vf', "zoompan=z='min(zoom+0.0015,1.3)':d=1:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)',scale=1080:1920,setsar=1:1", '-r', '30', out_path
-    ])
+        '-loop', '1', '-i', image_path, '-t', f'{duration:.2f}', '-vf', KEN_BURNS_VF, '-r', '30', *thread_args(encoder), out_path
+    ], stage='ken_burns')
 
 
-def generate_short(
+def _synthesize_voice(
     ffmpeg_bin: str,
+    tts_cmd: Optional[str],
     piper_bin: str,
     tts_voice: str,
-    data_dir: str,
-    script_text: str,
-    duration_sec: float,
-    *,
-    topic: Optional[str] = None,
+    text: str,
+    out_wav: str,
+    fallback_tts_voice: Optional[str],
+    duration: float,
     segments: Optional[List[Dict]] = None,
-    tts_cmd: Optional[str] = None,
-    music_dir: Optional[str] = None,
-    music_glob: Optional[str] = None,
-    music_vol_db: float = -18.0,
-    sd_bg_cmd: Optional[str] = None,
-    sd_thumb_cmd: Optional[str] = None,
-    footage_dir: Optional[str] = None,
-    footage_glob: Optional[str] = None,
-    footage_index: Optional[str] = None,
-    fallback_tts_voice: Optional[str] = 'slt',
+    tts_cache: Optional[TtsCache] = None,
+) -> Tuple[bool, str]:
+    # TTS command → Piper → flite → silence
+    texts = [seg['text'] for seg in segments or [] if (seg.get('text') or '').strip()]
+    # Engines that already failed per segment are not retried on the whole text
+    tried: Set[str] = set()
+    if tts_cache and texts:
+        engines: List[Tuple[str, Optional[str], Callable[[str, str], bool]]] = []
+        if tts_cmd:
+            # The command itself is part of the voice: a different TTS_CMD must not reuse old segments
+            cmd_id = hashlib.sha256(tts_cmd.encode('utf-8')).hexdigest()[:12]
+            engines.append(('custom_cmd', f'{cmd_id}|{piper_bin}|{tts_voice}', lambda t, o: synthesize_with_command(
+                tts_cmd, t, o, piper_bin=piper_bin, piper_voice=tts_voice)))
+        if piper_bin and tts_voice:
+            engines.append(('piper', tts_voice, lambda t, o: synthesize_with_piper(piper_bin, tts_voice, t, o)))
+        engines.append(('flite', fallback_tts_voice, lambda t, o: _make_flite_voice(ffmpeg_bin, t, o, fallback_tts_voice) == 0))
+        for engine, voice_id, synth in engines:
+            if _synthesize_cached(texts, out_wav, engine, voice_id, synth, tts_cache):
+                return True, engine
+            tried.add(engine)
+    if 'custom_cmd' not in tried and synthesize_with_command(tts_cmd, text, out_wav, piper_bin=piper_bin, piper_voice=tts_voice):
+        return True, 'custom_cmd'
+    if 'piper' not in tried and synthesize_with_piper(piper_bin, tts_voice, text, out_wav):
+        return True, 'piper'
+    if 'flite' not in tried and _make_flite_voice(ffmpeg_bin, text, out_wav, fallback_tts_voice) == 0:
+        return True, 'flite'
+    _make_silence(ffmpeg_bin, out_wav, duration)
+    return False, 'silence'
+
+
+def _synthesize_cached(
+    texts: List[str],
+    out_wav: str,
+    engine: str,
+    voice_id: Optional[str],
+    synth: Callable[[str, str], bool],
+    tts_cache: TtsCache,
+) -> bool:
+    # Per-segment synthesis: only lines missing from the cache hit the engine
+    parts: List[str] = []
+    hits = 0
+    for idx, text in enumerate(texts):
+        cached = tts_cache.get(engine, voice_id, text)
+        if cached:
+            parts.append(cached)
+            hits += 1
+            continue
+        seg_wav = f'{os.path.splitext(out_wav)[0]}_seg{idx}.wav'
+        ok = synth(text, seg_wav) and os.path.exists(seg_wav)
+        if not ok:
+            return False
+        parts.append(tts_cache.put(engine, voice_id, text, seg_wav))
+        os.unlink(seg_wav)
+    if not parts or not concat_wavs(parts, out_wav):
+        return False
+    log(f"TTS cache ({engine}): {hits} hit(s), {len(parts) - hits} miss(es).")
+    return True
+
+
+def _plan_background(
+    fallback_clip: Optional[str],
+    selections: List[Dict],
+    sd_bg_cmd: Optional[str],
+    script_text: str,
+    sd_img: str,
+    rng: Optional[random.Random] = None,
+    bg_bank: Optional[BackgroundBank] = None,
+    duration: float = 15.0,
+    synthetic: str = 'fractal',
 ) -> Dict:
-    ensure_dir(os.path.join(data_dir, 'video'))
-    ensure_dir(os.path.join(data_dir, 'audio'))
-    ensure_dir(os.path.join(data_dir, 'thumbs'))
+    # Same preference order as the multi-step path, decided up front so the
+    # whole short can be described as one filter graph.
+    if selections:
+        return {'mode': 'broll', 'selections': selections}
+    if fallback_clip:
+        return {'mode': 'footage', 'path': fallback_clip}
+    if sd_bg_cmd and _sd_make_image(sd_bg_cmd, prompt=script_text, out_path=sd_img):
+        return {'mode': 'sd', 'image': sd_img}
+    banked = bg_bank.take(synthetic, duration, rng) if bg_bank else None
+    if banked:
+        return {'mode': 'clip', 'kind': synthetic, 'path': banked}
+    if synthetic == 'color':
+        source, vf = random_color_source(duration, rng)
+        return {'mode': 'color', 'source': source, 'vf': vf}
+    return {'mode': 'fractal', 'source': random_fractal_source(rng)}
 
-    base = str(abs(hash(script_text)))
-    tmp_bg = os.path.join(data_dir, 'video', f'{base}_bg.mp4')
-    tmp_txt = os.path.join(data_dir, 'video', f'{base}_txt.mp4')
-    out_mp4 = os.path.join(data_dir, 'video', f'{base}.mp4')
-    out_wav = os.path.join(data_dir, 'audio', f'{base}.wav')
-    out_png = os.path.join(data_dir, 'thumbs', f'{base}.png')
 
-    # Background preference: curated b-roll → SD → fractal → animated color
-    final_dur = max(7.0, min(15.0, duration_sec))
-    segs = segments or [{'text': script_text, 'start': 0.0, 'end': final_dur}]
-    sd_img = os.path.join(data_dir, 'video', f'{base}_bg.png')
+def _plan_files(plan: Dict) -> List[str]:
+    mode = plan.get('mode')
+    if mode == 'broll':
+        return [sel.get('path') for sel in plan.get('selections') or []]
+    if mode in ('footage', 'clip'):
+        return [plan.get('path')]
+    if mode == 'sd':
+        return [plan.get('image')]
+    return []
+
+
+def _reusable_plan(reuse: Optional[Dict]) -> Optional[Dict]:
+    # A draft's background is reused only while every file it points at still exists
+    plan = (reuse or {}).get('bg_plan')
+    if not plan or not all(p and os.path.exists(p) for p in _plan_files(plan)):
+        return None
+    return plan
+
+
+def _with_broll_proxies(ffmpeg_bin: str, bg: Dict, proxy_cache: ProxyCache, encoder: Optional[Dict] = None) -> Dict:
+    # Swap sources for pre-normalized proxies so the graph only trims and concats
+    swapped: List[Dict] = []
+    for sel in bg['selections']:
+        proxy = proxy_cache.ensure(ffmpeg_bin, sel['path'], BROLL_VF, sel['duration'], encoder, sel.get('source_duration'))
+        swapped.append({**sel, 'path': proxy, 'proxy': True, 'source_path': sel['path']} if proxy else sel)
+    return {**bg, 'selections': swapped}
+
+
+def _render_single_pass(
+    ffmpeg_bin: str,
+    bg: Dict,
+    segments: List[Dict],
+    voice_wav: str,
+    music: Optional[Dict],
+    music_vol_db: float,
+    target_duration: float,
+    out_mp4: str,
+    encoder: Optional[Dict] = None,
+    captions: Optional[CaptionEngine] = None,
+    thumb_frame: Optional[str] = None,
+    output: Optional[Dict] = None,
+) -> int:
+    if music and not os.path.exists(music['path']):
+        music = None
+    args = single_pass_args(
+        bg,
+        captions or DrawtextCaptions(),
+        segments,
+        voice_wav,
+        music,
+        music_vol_db,
+        target_duration,
+        out_mp4,
+        encoder,
+        thumb_frame,
+        output,
+    )
+    return run_ffmpeg(ffmpeg_bin, args, stage='single_pass')
+
+
+def _render_background(
+    ffmpeg_bin: str,
+    fallback_clip: Optional[str],
+    selections: List[Dict],
+    tmp_bg: str,
+    work_dir: str,
+    base: str,
+    duration: float,
+    sd_bg_cmd: Optional[str],
+    script_text: str,
+    sd_img: str,
+    sd_ready: bool = False,
+    proxy_cache: Optional[ProxyCache] = None,
+    encoder: Optional[Dict] = None,
+    rng: Optional[random.Random] = None,
+    bg_bank: Optional[BackgroundBank] = None,
+    synthetic: str = 'fractal',
+    banked_clip: Optional[str] = None,
+) -> Tuple[int, str, bool, bool]:
+    """Multi-step background render; returns (rc, bg_mode, used_broll, used_sd).
+
+    ``banked_clip`` pins the bank loop (a promoted draft's plan) instead of
+    taking one from ``bg_bank``.
+    """
     used_sd = False
+    used_broll = False
     bg_mode = 'color'
     rc = 1
 
-    broll_library = load_broll_library(footage_dir, footage_glob, footage_index)
-    selections = pick_broll_sequence(broll_library, topic, script_text, segs)
-    used_broll = False
-
     if selections:
-        rc = _render_broll_sequence(ffmpeg_bin, selections, tmp_bg, data_dir, base)
+        rc = _render_broll_sequence(ffmpeg_bin, selections, tmp_bg, work_dir, base, proxy_cache, encoder)
         if rc == 0:
             used_broll = True
             bg_mode = 'broll'
@@ -332,10 +538,8 @@ def generate_short(
             log(f"B-roll render failed (rc={rc}); falling back to synthetic backgrounds.")
 
     if not used_broll:
-        clip_pool = [clip['path'] for clip in (broll_library.get('clips') or [])]
-        if clip_pool:
-            fallback_clip = random.choice(clip_pool)
-            rc = _make_footage_bg(ffmpeg_bin, fallback_clip, tmp_bg, final_dur)
+        if fallback_clip:
+            rc = _make_footage_bg(ffmpeg_bin, fallback_clip, tmp_bg, duration, encoder)
             if rc == 0:
                 used_broll = True
                 bg_mode = 'footage'
@@ -344,68 +548,571 @@ def generate_short(
         else:
             rc = 1
 
-    if not used_broll and sd_bg_cmd and _sd_make_image(sd_bg_cmd, prompt=script_text, out_path=sd_img):
+    if not used_broll and sd_bg_cmd and (sd_ready or _sd_make_image(sd_bg_cmd, prompt=script_text, out_path=sd_img)):
         used_sd = True
-        rc = _ken_burns(ffmpeg_bin, sd_img, tmp_bg, final_dur)
+        rc = _ken_burns(ffmpeg_bin, sd_img, tmp_bg, duration, encoder)
         if rc == 0:
             bg_mode = 'sd'
-    if rc != 0 and not used_broll:
-        rc = _make_fractal_bg(ffmpeg_bin, tmp_bg, final_dur)
+    if rc != 0 and not used_broll and synthetic == 'fractal':
+        banked = banked_clip or (bg_bank.take('fractal', duration, rng) if bg_bank else None)
+        if banked:
+            rc = _copy_banked_bg(ffmpeg_bin, banked, tmp_bg, duration)
+        if rc != 0:
+            rc = _make_fractal_bg(ffmpeg_bin, tmp_bg, duration, encoder, rng)
         if rc == 0:
             bg_mode = 'fractal'
     if rc != 0:
-        rc = _make_bg_video(ffmpeg_bin, tmp_bg, final_dur)
+        banked = banked_clip or (bg_bank.take('color', duration, rng) if bg_bank else None)
+        if banked:
+            rc = _copy_banked_bg(ffmpeg_bin, banked, tmp_bg, duration)
+        if rc != 0:
+            rc = _make_bg_video(ffmpeg_bin, tmp_bg, duration, encoder, rng)
         if rc == 0:
             bg_mode = 'color'
+    return rc, bg_mode, used_broll, used_sd
+
+
+def _render_captioned_background(
+    ffmpeg_bin: str,
+    fallback_clip: Optional[str],
+    selections: List[Dict],
+    segments: List[Dict],
+    script_text: str,
+    tmp_bg: str,
+    tmp_txt: str,
+    work_dir: str,
+    base: str,
+    duration: float,
+    sd_bg_cmd: Optional[str],
+    sd_img: str,
+    sd_ready: bool,
+    proxy_cache: Optional[ProxyCache],
+    encoder: Optional[Dict],
+    captions: Optional[CaptionEngine] = None,
+    rng: Optional[random.Random] = None,
+    bg_bank: Optional[BackgroundBank] = None,
+    thumb_frame: Optional[str] = None,
+    synthetic: str = 'fractal',
+    banked_clip: Optional[str] = None,
+) -> Dict:
+    rc, bg_mode, used_broll, used_sd = _render_background(
+        ffmpeg_bin, fallback_clip, selections, tmp_bg, work_dir, base, duration,
+        sd_bg_cmd, script_text, sd_img, sd_ready, proxy_cache, encoder, rng, bg_bank, synthetic, banked_clip,
+    )
     if rc != 0:
         return {'ok': False, 'error': 'bg_video_failed'}
 
     # Text overlay video (segment-aware with safe area)
-    rc = _burn_segments(ffmpeg_bin, tmp_bg, segs, tmp_txt)
+    rc = _burn_segments(ffmpeg_bin, tmp_bg, segments, tmp_txt, encoder, captions, thumb_frame)
     if rc != 0:
         # Fallback to simple overlay if segmented captions fail
-        rc2 = _burn_simple_text(ffmpeg_bin, tmp_bg, script_text, tmp_txt)
+        rc2 = _burn_simple_text(ffmpeg_bin, tmp_bg, script_text, tmp_txt, encoder)
         if rc2 != 0:
             return {'ok': False, 'error': 'text_burn_failed'}
+    return {'ok': True, 'bg_mode': bg_mode, 'broll': used_broll, 'sd_bg': used_sd}
 
-    # TTS or silence
-    tts_source = None
-    did_tts = synthesize_with_command(tts_cmd, script_text, out_wav, piper_bin=piper_bin, piper_voice=tts_voice)
-    if did_tts:
-        tts_source = 'custom_cmd'
-    else:
-        did_tts = synthesize_with_piper(piper_bin, tts_voice, script_text, out_wav)
-        if did_tts:
-            tts_source = 'piper'
-    if not did_tts:
-        if _make_flite_voice(ffmpeg_bin, script_text, out_wav, fallback_tts_voice) == 0:
-            did_tts = True
-            tts_source = 'flite'
-        else:
-            _make_silence(ffmpeg_bin, out_wav, final_dur)
-            tts_source = 'silence'
 
-    # Mux
-    music = _find_music(music_dir, music_glob)
-    rc = _mux_audio(ffmpeg_bin, tmp_txt, out_wav, out_mp4, music, music_vol_db, final_dur)
-    if rc != 0:
-        return {'ok': False, 'error': 'mux_failed'}
+@ffmpeg_job
+def generate_short(
+    ffmpeg_bin: str,
+    piper_bin: str,
+    tts_voice: str,
+    data_dir: str,
+    script_text: str,
+    duration_sec: float,
+    *,
+    topic: Optional[str] = None,
+    segments: Optional[List[Dict]] = None,
+    tts_cmd: Optional[str] = None,
+    music_dir: Optional[str] = None,
+    music_glob: Optional[str] = None,
+    music_vol_db: float = -18.0,
+    sd_bg_cmd: Optional[str] = None,
+    sd_thumb_cmd: Optional[str] = None,
+    footage_dir: Optional[str] = None,
+    footage_glob: Optional[str] = None,
+    footage_index: Optional[str] = None,
+    fallback_tts_voice: Optional[str] = 'slt',
+    render_mode: str = 'multipass',
+    broll_cache_mb: int = 2048,
+    encoder: Optional[Dict] = None,
+    caption_engine: str = 'drawtext',
+    segment_cache_mb: int = 1024,
+    bg_bank_per_bucket: int = 0,
+    tts_cache_mb: int = 256,
+    thumb_engine: str = 'composite',
+    thumb_format: str = 'jpeg',
+    background: Optional[str] = None,
+    scratch_dir: Optional[str] = None,
+    draft: bool = False,
+    reuse: Optional[Dict] = None,
+) -> Dict:
+    """Render one short (MP4 + thumbnail) and return its result dict.
+
+    ``background`` pins the background to 'broll', 'footage', 'fractal' or
+    'color' instead of walking the usual preference order (used by the
+    benchmark to render a fixed matrix). ``scratch_dir`` is the root for
+    the job's intermediates (default: /dev/shm when it has room).
+
+    ``draft`` renders a review copy in one pass at DRAFT_OUTPUT with
+    DRAFT_ENCODER and records the planned background in the result; if
+    that pass fails the draft fails (no multi-step fallback).
+    ``reuse`` is such a draft result: its narration and background plan are
+    used instead of synthesizing/picking again (multipass requests render
+    through the single pass, and the bank is never drawn from), so the
+    promoted render matches what was reviewed.
+    """
+    started = time.monotonic()
+    ensure_dir(os.path.join(data_dir, 'video'))
+    ensure_dir(os.path.join(data_dir, 'audio'))
+    ensure_dir(os.path.join(data_dir, 'thumbs'))
 
-    # Thumb
-    if sd_thumb_cmd and _sd_make_image(sd_thumb_cmd, prompt=script_text, out_path=out_png):
-        pass
+    final_dur = max(7.0, min(15.0, duration_sec))
+    segs = segments or [{'text': script_text, 'start': 0.0, 'end': final_dur}]
+
+    # Every random choice is seeded from the request so an identical request
+    # resolves to the same sources, and therefore the same render key.
+    request = {'script': script_text, 'segments': segs, 'topic': topic, 'duration': final_dur}
+    seed = render_key(request)
+    plan = _reusable_plan(reuse)
+    if plan and render_mode == 'multipass':
+        # The multi-step path re-picks synthetic/banked backgrounds; the plan-driven
+        # paths render exactly the reviewed background
+        render_mode = 'single'
+    if draft:
+        render_mode = 'single'
+    # Segmented renders choose the background from the topic (b-roll: from each
+    # segment's own text) instead of the whole script, so hook variants share
+    # background slices and therefore cached chunks
+    segmented = render_mode == 'segmented'
+    bg_seed = render_key({'topic': topic, 'segmented': True}) if segmented else seed
+
+    # Background preference: curated b-roll → SD → fractal → animated color
+    broll_library = load_library_index(data_dir, ffmpeg_bin, footage_dir, footage_glob, footage_index)
+    if segmented:
+        selections = [
+            sel for seg in segs
+            for sel in pick_broll_sequence(
+                broll_library, topic, seg['text'], [seg], rng=seeded_rng(render_key({'topic': topic, 'segment': seg['text']}), 'broll'),
+            )
+        ]
     else:
-        _extract_thumb(ffmpeg_bin, out_mp4, out_png)
-
-    return {
-        'ok': True,
-        'video_path': out_mp4,
-        'thumb_path': out_png,
-        'audio_path': out_wav,
-        'duration_sec': final_dur,
-        'tts': did_tts,
-        'sd_bg': used_sd,
-        'broll': used_broll,
-        'bg_source': bg_mode,
-        'tts_source': tts_source,
+        selections = pick_broll_sequence(broll_library, topic, script_text, segs, rng=seeded_rng(seed, 'broll'))
+    clip_pool = footage_pool(broll_library)
+    fallback_clip = seeded_rng(bg_seed, 'footage').choice(clip_pool) if clip_pool else None
+    music = _pick_music(data_dir, music_dir, music_glob, final_dur, music_vol_db, seeded_rng(seed, 'music'))
+    enc = {**DEFAULT_ENCODER, **(encoder or {})}
+    synthetic = 'color' if background == 'color' else 'fractal'
+    if background and background != 'broll':
+        selections = []
+    if background in ('fractal', 'color'):
+        fallback_clip, sd_bg_cmd = None, None
+    if plan:
+        selections = plan['selections'] if plan['mode'] == 'broll' else []
+        if plan['mode'] == 'footage':
+            fallback_clip = plan['path']
+        elif plan['mode'] != 'broll':
+            fallback_clip = None
+        if plan['mode'] in ('clip', 'fractal', 'color'):
+            sd_bg_cmd = None
+            synthetic = plan.get('kind', plan['mode'])
+    if draft:
+        encoder = {**(encoder or {}), **DRAFT_ENCODER}
+        enc = {**enc, **DRAFT_ENCODER}
+
+    spec = {
+        **request,
+        **({'draft': True} if draft else {}),
+        **({'from_draft': reuse.get('render_key')} if reuse else {}),
+        'background': {
+            'selections': [[file_signature(sel['path']), round(sel['duration'], 2)] for sel in selections],
+            'fallback_clip': file_signature(fallback_clip),
+            'sd_bg_cmd': sd_bg_cmd,
+            **({'pinned': background} if background else {}),
+        },
+        'voice': {'tts_cmd': tts_cmd, 'piper_bin': piper_bin, 'voice': tts_voice, 'fallback': fallback_tts_voice},
+        'music': _music_signature(music),
+        'music_vol_db': music_vol_db,
+        # Thread count only changes scheduling, not the requested quality
+        'encoder': {'preset': enc['preset'], 'crf': enc['crf']},
+        'render_mode': render_mode,
+        'captions': caption_engine,
+        'thumb': [thumb_engine, thumb_format, sd_thumb_cmd if thumb_engine == 'sd' else None],
     }
+    key = render_key(spec)
+    cached = load_cached_render(data_dir, key)
+    if cached:
+        log(f"Render cache hit {key[:16]}; reusing {cached['video_path']}")
+        return cached
+    # The keyed pick ignores recency so identical requests keep hitting the cache;
+    # an actual render rotates away from footage of the last few shorts
+    # (segmented renders keep the keyed pick: rotating would defeat chunk reuse)
+    if selections and not plan and not background and not segmented:
+        rotated = pick_broll_sequence(broll_library, topic, script_text, segs, rng=seeded_rng(seed, 'broll'), avoid_recent=True)
+        if rotated != selections:
+            spec['background']['rendered_selections'] = [[sel['path'], round(sel['duration'], 2)] for sel in rotated]
+        selections = rotated
+    # ffmpeg runs from here on (including stage threads) are accounted to this render
+    set_ffmpeg_job(key)
+
+    base = key[:16]
+    # Intermediates live in a per-job scratch dir (tmpfs when it has room) that
+    # is removed when the job ends; only the finished MP4/WAV/thumbnail are
+    # promoted into data/.
+    with ScratchDir(scratch_root(scratch_dir), base) as work:
+        tmp_bg = work.file('bg.mp4')
+        tmp_txt = work.file('txt.mp4')
+        out_mp4 = work.file(f'{base}.mp4')
+        out_wav = work.file(f'{base}.wav')
+        thumb_base = work.file(base)
+        thumb_frame = work.file('frame.png')
+        sd_img = work.file('bg.png')
+
+        captions = make_caption_engine(
+            caption_engine,
+            cache_dir=os.path.join(data_dir, 'cache', 'captions'),
+            ass_path=work.file('captions.ass'),
+        )
+        proxy_cache = ProxyCache(os.path.join(data_dir, 'cache', 'broll'), broll_cache_mb) if broll_cache_mb > 0 else None
+        # A reused plan never takes from the bank (take() also counts a use); segmented
+        # renders skip it too, since take() rotates loops and that would change every chunk
+        bg_bank = BackgroundBank(os.path.join(data_dir, 'bg_bank'), bg_bank_per_bucket) if bg_bank_per_bucket > 0 and not (plan or segmented) else None
+        tts_cache = get_tts_cache(os.path.join(data_dir, 'cache', 'tts'), tts_cache_mb) if tts_cache_mb > 0 else None
+        synth_rng = seeded_rng(bg_seed, 'synthetic')
+        reuse_wav = (reuse or {}).get('audio_path')
+
+        def synth_voice() -> Tuple[bool, str]:
+            if reuse_wav and os.path.exists(reuse_wav):
+                shutil.copyfile(reuse_wav, out_wav)
+                return bool(reuse.get('tts')), reuse.get('tts_source') or 'draft'
+            voiced = _synthesize_voice(
+                ffmpeg_bin, tts_cmd, piper_bin, tts_voice, script_text, out_wav, fallback_tts_voice, final_dur,
+                segments, tts_cache,
+            )
+            if tts_cache:
+                tts_cache.flush_stats()
+            return voiced
+
+        # Stages run as a dependency graph: voice, SD image and background
+        # rendering overlap, and the mux waits for all of them. Music is picked
+        # up front because it is part of the render key.
+        done: Dict = {}
+        sd_ready = False
+        rendered = False
+        planned: Dict = {}
+        if plan and plan['mode'] == 'sd':
+            shutil.copyfile(plan['image'], sd_img)
+            sd_ready = True
+
+        if render_mode in ('single', 'segmented'):
+            # single: one ffmpeg process, background + captions + voice + music → final MP4
+            # segmented: per-segment cached chunks stitched with stream copy, then muxed
+            def plan_bg() -> Dict:
+                if plan:
+                    bg = {**plan, 'image': sd_img} if plan['mode'] == 'sd' else dict(plan)
+                else:
+                    bg = _plan_background(
+                        fallback_clip, selections, sd_bg_cmd, script_text, sd_img, synth_rng, bg_bank, final_dur, synthetic,
+                    )
+                # Kept before the proxy swap: proxies can be evicted before a draft is promoted
+                planned.update(bg)
+                if bg['mode'] == 'broll' and proxy_cache:
+                    bg = _with_broll_proxies(ffmpeg_bin, bg, proxy_cache, encoder)
+                return bg
+
+            graph = StageGraph()
+            graph.add('voice', synth_voice)
+            graph.add('background', plan_bg)
+            done = graph.run()
+            bg = done['background']
+            sd_ready = bg['mode'] == 'sd'
+            if render_mode == 'single':
+                rc = _render_single_pass(
+                    ffmpeg_bin, bg, segs, out_wav, music, music_vol_db, final_dur, out_mp4, encoder, captions, thumb_frame,
+                    DRAFT_OUTPUT if draft else None,
+                )
+            else:
+                seg_cache = SegmentCache(os.path.join(data_dir, 'cache', 'segments'), segment_cache_mb)
+                concat_path = work.file('segments.txt')
+                rc = render_segmented(ffmpeg_bin, bg, segs, captions, seg_cache, concat_path, tmp_txt, encoder)
+                if rc == 0:
+                    rc = _mux_audio(ffmpeg_bin, tmp_txt, out_wav, out_mp4, music, music_vol_db, final_dur)
+            if rc == 0:
+                rendered = True
+                bg_mode = bg.get('kind', bg['mode'])
+                used_broll = bg_mode in ('broll', 'footage')
+                used_sd = sd_ready
+            elif draft:
+                # The multi-step path renders full-size and re-plans the background,
+                # which would no longer match what promote reuses
+                annotate_runs(key, bg.get('kind', bg['mode']))
+                return {'ok': False, 'error': 'draft_render_failed', 'render_key': key}
+            else:
+                log(f"{render_mode.capitalize()} render failed (rc={rc}); falling back to multi-step render.")
+
+        if not rendered:
+            graph = StageGraph()
+            if 'voice' not in done:
+                graph.add('voice', synth_voice)
+            # SD only matters when there is no footage to fall back on, so it can
+            # start right away instead of after the b-roll attempts.
+            if not sd_ready and sd_bg_cmd and not (selections or fallback_clip):
+                graph.add('sd', lambda: _sd_make_image(sd_bg_cmd, prompt=script_text, out_path=sd_img))
+            else:
+                graph.add('sd', lambda: sd_ready)
+            graph.add('video', lambda sd_ok: _render_captioned_background(
+                ffmpeg_bin, fallback_clip, selections, segs, script_text, tmp_bg, tmp_txt, work.path, base,
+                final_dur, sd_bg_cmd, sd_img, sd_ok, proxy_cache, encoder, captions, synth_rng, bg_bank, thumb_frame,
+                synthetic, plan['path'] if plan and plan['mode'] == 'clip' else None,
+            ), 'sd')
+            done.update(graph.run())
+
+            video = done['video']
+            if not video['ok']:
+                return {'ok': False, 'error': video['error']}
+            bg_mode, used_broll, used_sd = video['bg_mode'], video['broll'], video['sd_bg']
+
+            # Mux
+            rc = _mux_audio(ffmpeg_bin, tmp_txt, out_wav, out_mp4, music, music_vol_db, final_dur)
+            if rc != 0:
+                annotate_runs(key, bg_mode)
+                return {'ok': False, 'error': 'mux_failed'}
+
+        did_tts, tts_source = done['voice']
+
+        # Thumb
+        out_thumb = _make_thumbnail(
+            ffmpeg_bin, thumb_engine, thumb_format, sd_thumb_cmd, script_text, segs[0]['text'],
+            sd_img if used_sd else None, thumb_frame, out_mp4, thumb_base,
+        )
+        bg_plan = None
+        if draft and rendered:
+            bg_plan = dict(planned)
+            if bg_plan['mode'] == 'sd':
+                bg_plan['image'] = promote(sd_img, os.path.join(data_dir, 'thumbs', f'{base}_sd.png'))
+
+        result = {
+            'ok': True,
+            # Video last: a manifest/DB row never points at a missing MP4
+            'audio_path': promote(out_wav, os.path.join(data_dir, 'audio', f'{base}.wav')),
+            'thumb_path': promote(out_thumb, os.path.join(data_dir, 'thumbs', os.path.basename(out_thumb))),
+            'video_path': promote(out_mp4, os.path.join(data_dir, 'video', f'{base}.mp4')),
+            'duration_sec': final_dur,
+            'tts': did_tts,
+            'sd_bg': used_sd,
+            'broll': used_broll,
+            'bg_source': bg_mode,
+            'tts_source': tts_source,
+            'render_mode': render_mode if rendered else 'multipass',
+            'render_key': key,
+            'encode_profile': (encoder or {}).get('profile'),
+            'render_sec': round(time.monotonic() - started, 2),
+            **({'draft': True, 'bg_plan': bg_plan} if draft else {}),
+        }
+        if bg_mode == 'broll':
+            note_broll_used(broll_library, selections)
+        annotate_runs(key, bg_mode)
+        save_render_manifest(data_dir, key, spec, result)
+        return result
+
+
+@ffmpeg_job
+def generate_shorts_batch(
+    ffmpeg_bin: str,
+    piper_bin: str,
+    tts_voice: str,
+    data_dir: str,
+    scripts: List[Dict],
+    *,
+    topic: Optional[str] = None,
+    tts_cmd: Optional[str] = None,
+    music_dir: Optional[str] = None,
+    music_glob: Optional[str] = None,
+    music_vol_db: float = -18.0,
+    sd_bg_cmd: Optional[str] = None,
+    sd_thumb_cmd: Optional[str] = None,
+    footage_dir: Optional[str] = None,
+    footage_glob: Optional[str] = None,
+    footage_index: Optional[str] = None,
+    fallback_tts_voice: Optional[str] = 'slt',
+    broll_cache_mb: int = 2048,
+    encoder: Optional[Dict] = None,
+    caption_engine: str = 'drawtext',
+    bg_bank_per_bucket: int = 0,
+    tts_cache_mb: int = 256,
+    thumb_engine: str = 'composite',
+    thumb_format: str = 'jpeg',
+    scratch_dir: Optional[str] = None,
+) -> Dict:
+    """Render several shorts for one topic over a single shared background.
+
+    ``scripts`` holds dicts with ``script_text``, ``duration_sec`` and
+    optional ``segments``. The background is planned once (b-roll for the
+    longest script, else footage/SD/fractal), decoded and scaled once, and
+    split into one caption branch per script in the same ffmpeg process.
+    Returns ``{'ok', 'results'}`` with one generate_short-style result per
+    script, in order; if the batch graph fails every short is rendered on
+    its own with the multi-step path.
+    """
+    for sub in ('video', 'audio', 'thumbs'):
+        ensure_dir(os.path.join(data_dir, sub))
+    if not scripts:
+        return {'ok': True, 'results': []}
+
+    items: List[Dict] = []
+    for sc in scripts:
+        final_dur = max(7.0, min(15.0, float(sc['duration_sec'])))
+        segs = sc.get('segments') or [{'text': sc['script_text'], 'start': 0.0, 'end': final_dur}]
+        items.append({
+            'script_text': sc['script_text'],
+            'duration': final_dur,
+            'segments': segs,
+            'tts_segments': sc.get('segments'),
+            'request': {'script': sc['script_text'], 'segments': segs, 'topic': topic, 'duration': final_dur},
+        })
+    seed = render_key({'batch': [it['request'] for it in items]})
+
+    # One background for the whole batch, picked for the longest script
+    lead = max(items, key=lambda it: it['duration'])
+    broll_library = load_library_index(data_dir, ffmpeg_bin, footage_dir, footage_glob, footage_index)
+    selections = pick_broll_sequence(broll_library, topic, lead['script_text'], lead['segments'], rng=seeded_rng(seed, 'broll'))
+    clip_pool = footage_pool(broll_library)
+    fallback_clip = seeded_rng(seed, 'footage').choice(clip_pool) if clip_pool else None
+    music = _pick_music(data_dir, music_dir, music_glob, lead['duration'], music_vol_db, seeded_rng(seed, 'music'))
+    enc = {**DEFAULT_ENCODER, **(encoder or {})}
+
+    results: List[Optional[Dict]] = [None] * len(items)
+    pending: List[int] = []
+    for i, it in enumerate(items):
+        it['spec'] = {
+            **it['request'],
+            'background': {
+                'batch': seed,
+                'selections': [[file_signature(sel['path']), round(sel['duration'], 2)] for sel in selections],
+                'fallback_clip': file_signature(fallback_clip),
+                'sd_bg_cmd': sd_bg_cmd,
+            },
+            'voice': {'tts_cmd': tts_cmd, 'piper_bin': piper_bin, 'voice': tts_voice, 'fallback': fallback_tts_voice},
+            'music': _music_signature(music),
+            'music_vol_db': music_vol_db,
+            'encoder': {'preset': enc['preset'], 'crf': enc['crf']},
+            'render_mode': 'batch',
+            'captions': caption_engine,
+            'thumb': [thumb_engine, thumb_format, sd_thumb_cmd if thumb_engine == 'sd' else None],
+        }
+        it['key'] = render_key(it['spec'])
+        cached = load_cached_render(data_dir, it['key'])
+        if cached:
+            results[i] = cached
+            continue
+        pending.append(i)
+    if not pending:
+        return {'ok': True, 'results': results}
+    if selections:
+        # As in generate_short: recency only applies once the cache has missed
+        selections = pick_broll_sequence(
+            broll_library, topic, lead['script_text'], lead['segments'], rng=seeded_rng(seed, 'broll'), avoid_recent=True,
+        )
+    # Shared-background runs are accounted to the batch as a whole
+    set_ffmpeg_job(seed)
+
+    with ScratchDir(scratch_root(scratch_dir), f'batch-{seed[:16]}') as work:
+        for i in pending:
+            it = items[i]
+            base = it['key'][:16]
+            it['out_mp4'] = work.file(f'{base}.mp4')
+            it['out_wav'] = work.file(f'{base}.wav')
+            it['thumb_base'] = work.file(base)
+            it['captions'] = make_caption_engine(
+                caption_engine,
+                cache_dir=os.path.join(data_dir, 'cache', 'captions'),
+                ass_path=work.file(f'{base}_captions.ass'),
+            )
+
+        sd_img = work.file('bg.png')
+        thumb_frame = work.file('frame.png')
+        proxy_cache = ProxyCache(os.path.join(data_dir, 'cache', 'broll'), broll_cache_mb) if broll_cache_mb > 0 else None
+        bg_bank = BackgroundBank(os.path.join(data_dir, 'bg_bank'), bg_bank_per_bucket) if bg_bank_per_bucket > 0 else None
+        tts_cache = get_tts_cache(os.path.join(data_dir, 'cache', 'tts'), tts_cache_mb) if tts_cache_mb > 0 else None
+
+        def plan_bg() -> Dict:
+            bg = _plan_background(
+                fallback_clip, selections, sd_bg_cmd, lead['script_text'], sd_img, seeded_rng(seed, 'synthetic'),
+                bg_bank, lead['duration'],
+            )
+            if bg['mode'] == 'broll' and proxy_cache:
+                bg = _with_broll_proxies(ffmpeg_bin, bg, proxy_cache, encoder)
+            return bg
+
+        graph = StageGraph(max_workers=min(8, len(pending) + 1))
+        graph.add('background', plan_bg)
+        for i in pending:
+            it = items[i]
+            graph.add(f'voice{i}', lambda it=it: _synthesize_voice(
+                ffmpeg_bin, tts_cmd, piper_bin, tts_voice, it['script_text'], it['out_wav'], fallback_tts_voice, it['duration'],
+                it['tts_segments'], tts_cache,
+            ))
+        done = graph.run()
+        if tts_cache:
+            tts_cache.flush_stats()
+        bg = done['background']
+        bg_mode = bg.get('kind', bg['mode'])
+
+        branches = [{
+            'captions': items[i]['captions'],
+            'segments': items[i]['segments'],
+            'voice_wav': items[i]['out_wav'],
+            'duration': items[i]['duration'],
+            'out_mp4': items[i]['out_mp4'],
+        } for i in pending]
+        music_track = music if music and os.path.exists(music['path']) else None
+        rc = run_ffmpeg(ffmpeg_bin, batch_args(bg, branches, music_track, music_vol_db, encoder, thumb_frame), stage='batch')
+        annotate_runs(seed, bg_mode)
+        if rc != 0:
+            log(f"Batch render failed (rc={rc}); rendering {len(pending)} short(s) individually.")
+            for i in pending:
+                results[i] = generate_short(
+                    ffmpeg_bin, piper_bin, tts_voice, data_dir, items[i]['script_text'], items[i]['duration'],
+                    topic=topic, segments=items[i]['segments'], tts_cmd=tts_cmd, music_dir=music_dir,
+                    music_glob=music_glob, music_vol_db=music_vol_db, sd_bg_cmd=sd_bg_cmd, sd_thumb_cmd=sd_thumb_cmd,
+                    footage_dir=footage_dir, footage_glob=footage_glob, footage_index=footage_index,
+                    fallback_tts_voice=fallback_tts_voice, render_mode='multipass', broll_cache_mb=broll_cache_mb,
+                    encoder=encoder, caption_engine=caption_engine, bg_bank_per_bucket=bg_bank_per_bucket,
+                    tts_cache_mb=tts_cache_mb, thumb_engine=thumb_engine, thumb_format=thumb_format,
+                    scratch_dir=scratch_dir,
+                )
+            return {'ok': all(r and r.get('ok') for r in results), 'results': results}
+
+        log(f"Batch render: {len(pending)} short(s) from one {bg_mode} background.")
+        for i in pending:
+            it = items[i]
+            did_tts, tts_source = done[f'voice{i}']
+            # Every branch shares the tapped frame; _make_thumbnail may overwrite or move
+            # the frame it is given, so each item works on its own copy
+            item_frame = work.file(f'frame{i}.png')
+            if os.path.exists(thumb_frame):
+                shutil.copyfile(thumb_frame, item_frame)
+            out_thumb = _make_thumbnail(
+                ffmpeg_bin, thumb_engine, thumb_format, sd_thumb_cmd, it['script_text'], it['segments'][0]['text'],
+                sd_img if bg_mode == 'sd' else None, item_frame, it['out_mp4'], it['thumb_base'],
+            )
+            base = it['key'][:16]
+            result = {
+                'ok': True,
+                'audio_path': promote(it['out_wav'], os.path.join(data_dir, 'audio', f'{base}.wav')),
+                'thumb_path': promote(out_thumb, os.path.join(data_dir, 'thumbs', os.path.basename(out_thumb))),
+                'video_path': promote(it['out_mp4'], os.path.join(data_dir, 'video', f'{base}.mp4')),
+                'duration_sec': it['duration'],
+                'tts': did_tts,
+                'sd_bg': bg_mode == 'sd',
+                'broll': bg_mode in ('broll', 'footage'),
+                'bg_source': bg_mode,
+                'tts_source': tts_source,
+                'render_mode': 'batch',
+                'render_key': it['key'],
+            }
+            save_render_manifest(data_dir, it['key'], it['spec'], result)
+            results[i] = result
+        if bg_mode == 'broll':
+            note_broll_used(broll_library, selections)
+        return {'ok': True, 'results': results}
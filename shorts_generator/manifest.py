@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from utils import read_json, write_json
+
+MANIFEST_VERSION = 1
+
+
+def render_key(spec: Dict[str, Any]) -> str:
+    """Stable digest over everything that affects a render (unlike the per-process salted hash())."""
+    raw = json.dumps({'v': MANIFEST_VERSION, **spec}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def seeded_rng(key: str, purpose: str) -> random.Random:
+    # One stream per purpose so concurrent stages don't perturb each other's picks
+    digest = hashlib.sha256(f'{key}:{purpose}'.encode('utf-8')).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def file_signature(path: Optional[str]) -> Optional[List[Any]]:
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return [os.path.abspath(path), None, None]
+    return [os.path.abspath(path), st.st_mtime_ns, st.st_size]
+
+
+def manifest_path(data_dir: str, key: str) -> str:
+    return os.path.join(data_dir, 'manifests', f'{key}.json')
+
+
+def load_cached_render(data_dir: str, key: str) -> Optional[Dict]:
+    """Return the stored result when the manifest exists and all of its artifacts are still on disk."""
+    manifest = read_json(manifest_path(data_dir, key), default=None)
+    if not manifest:
+        return None
+    result = manifest.get('result') or {}
+    for field in ('video_path', 'thumb_path', 'audio_path'):
+        p = result.get(field)
+        if not p or not os.path.exists(p):
+            return None
+    return {**result, 'cached': True, 'render_key': key}
+
+
+def save_render_manifest(data_dir: str, key: str, spec: Dict[str, Any], result: Dict) -> str:
+    path = manifest_path(data_dir, key)
+    write_json(path, {
+        'version': MANIFEST_VERSION,
+        'key': key,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'spec': spec,
+        'result': result,
+    })
+    return path
+
+
+def find_manifest(data_dir: str, video_path: str) -> Optional[Dict]:
+    """Manifest whose result produced ``video_path`` (outputs are named by the first 16 chars of the key)."""
+    base = os.path.splitext(os.path.basename(video_path))[0]
+    root = os.path.join(data_dir, 'manifests')
+    if not base or not os.path.isdir(root):
+        return None
+    for fn in sorted(os.listdir(root)):
+        if not (fn.startswith(base) and fn.endswith('.json')):
+            continue
+        manifest = read_json(os.path.join(root, fn), default=None) or {}
+        result = manifest.get('result') or {}
+        if result.get('video_path') and os.path.abspath(result['video_path']) == os.path.abspath(video_path):
+            return manifest
+    return None
@@ -0,0 +1,114 @@
+import glob
+import json
+import os
+import random
+import re
+import subprocess
+from typing import Dict, List, Optional
+
+from utils import log, read_json, warn, write_json
+
+MUSIC_EXTS = ('.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg')
+# Same true-peak ceiling the old per-render loudnorm pass used
+MUSIC_TP_CEILING = -2.0
+
+_duration_re = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+def music_candidates(music_dir: Optional[str], music_glob: Optional[str]) -> List[str]:
+    candidates: List[str] = []
+    if music_glob:
+        candidates.extend(glob.glob(os.path.expandvars(music_glob)))
+    if music_dir and os.path.isdir(music_dir):
+        for fn in os.listdir(music_dir):
+            if fn.lower().endswith(MUSIC_EXTS):
+                candidates.append(os.path.join(music_dir, fn))
+    return sorted(set(candidates))
+
+
+def linear_gain(lufs: float, true_peak: float, target_lufs: float) -> float:
+    gain_db = min(target_lufs - lufs, MUSIC_TP_CEILING - true_peak)
+    return round(10 ** (gain_db / 20.0), 5)
+
+
+def analyze_track(ffmpeg_bin: str, path: str) -> Optional[Dict]:
+    """Measure duration, integrated loudness and true peak with one loudnorm pass."""
+    cmd = [ffmpeg_bin, '-hide_banner', '-nostats', '-i', path, '-af', 'loudnorm=print_format=json', '-f', 'null', '-']
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except Exception as exc:
+        warn(f"Music analysis failed to start for {path}: {exc}")
+        return None
+    stderr = proc.stderr or ''
+    start, end = stderr.rfind('{'), stderr.rfind('}')
+    m = _duration_re.search(stderr)
+    if proc.returncode != 0 or start < 0 or end < start or not m:
+        warn(f"Music analysis failed for {path} (rc={proc.returncode}).")
+        return None
+    try:
+        stats = json.loads(stderr[start:end + 1])
+        lufs = float(stats['input_i'])
+        true_peak = float(stats['input_tp'])
+    except (ValueError, KeyError):
+        # Silent tracks report -inf loudness
+        warn(f"Music analysis returned no loudness for {path}.")
+        return None
+    h, mnt, sec = m.groups()
+    return {
+        'duration': int(h) * 3600 + int(mnt) * 60 + float(sec),
+        'lufs': lufs,
+        'true_peak': true_peak,
+    }
+
+
+class MusicIndex:
+    """Per-track duration/loudness stored in ``data/music_index.json``.
+
+    ``refresh`` re-analyzes only tracks whose mtime/size changed and drops
+    tracks that disappeared, so renders can pick a track, seek into it and
+    apply a fixed ``volume`` gain instead of running loudnorm every time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        data = read_json(path, default=None) or {}
+        self.tracks: Dict[str, Dict] = data.get('tracks') or {}
+
+    def refresh(self, ffmpeg_bin: str, music_dir: Optional[str], music_glob: Optional[str], target_lufs: float = -18.0) -> Dict:
+        candidates = music_candidates(music_dir, music_glob)
+        tracks: Dict[str, Dict] = {}
+        analyzed = 0
+        for path in candidates:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            prev = self.tracks.get(path)
+            if prev and prev.get('mtime_ns') == st.st_mtime_ns and prev.get('size') == st.st_size:
+                entry = prev
+            else:
+                stats = analyze_track(ffmpeg_bin, path)
+                if not stats:
+                    continue
+                entry = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, **stats}
+                analyzed += 1
+            tracks[path] = {**entry, 'gain': linear_gain(entry['lufs'], entry['true_peak'], target_lufs), 'target_lufs': target_lufs}
+        dropped = len(set(self.tracks) - set(tracks))
+        self.tracks = tracks
+        write_json(self.path, {'tracks': tracks})
+        if analyzed or dropped:
+            log(f"Music index: {len(tracks)} track(s), {analyzed} analyzed, {dropped} dropped.")
+        return {'tracks': len(tracks), 'analyzed': analyzed, 'dropped': dropped}
+
+    def pick(self, duration: float, target_lufs: float, rng: Optional[random.Random] = None) -> Optional[Dict]:
+        """Choose a track plus a random start offset that leaves ``duration`` seconds of music."""
+        r = rng or random
+        paths = [p for p in sorted(self.tracks) if os.path.exists(p)]
+        if not paths:
+            return None
+        path = r.choice(paths)
+        entry = self.tracks[path]
+        gain = entry['gain'] if entry.get('target_lufs') == target_lufs else linear_gain(entry['lufs'], entry['true_peak'], target_lufs)
+        headroom = float(entry.get('duration') or 0.0) - duration - 1.0
+        offset = round(r.uniform(0.0, headroom), 2) if headroom > 0 else 0.0
+        return {'path': path, 'gain': gain, 'offset': offset}
@@ -0,0 +1,85 @@
+import hashlib
+import math
+import os
+import threading
+from typing import Dict, Optional
+
+from utils import ensure_dir, run_ffmpeg
+from utils.cache import evict_lru
+from .render_graph import loop_args, x264_args
+
+BUCKET_SEC = 2.0
+
+
+def duration_bucket(duration: float) -> float:
+    return max(BUCKET_SEC, math.ceil(duration / BUCKET_SEC) * BUCKET_SEC)
+
+
+class ProxyCache:
+    """Pre-normalized 1080x1920@30 b-roll proxies keyed by source + filter chain.
+
+    Keys cover the source path, its mtime/size, the filter chain and a
+    duration bucket, so edited footage or a changed grade produces a new
+    proxy. Hits bump the file mtime; eviction drops the least recently used
+    proxies once the directory exceeds the disk budget.
+    """
+
+    def __init__(self, base_dir: str, budget_mb: int = 2048):
+        self.base_dir = base_dir
+        self.budget_bytes = max(0, int(budget_mb)) * 1024 * 1024
+        ensure_dir(base_dir)
+
+    def key_for(self, source_path: str, vf: str, bucket: float) -> Optional[str]:
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        raw = f"{os.path.abspath(source_path)}|{st.st_mtime_ns}|{st.st_size}|{vf}|{bucket:.1f}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:24]
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.base_dir, f'{key}.mp4')
+
+    def ensure(
+        self,
+        ffmpeg_bin: str,
+        source_path: str,
+        vf: str,
+        duration: float,
+        encoder: Optional[Dict] = None,
+        source_duration: Optional[float] = None,
+    ) -> Optional[str]:
+        """Return a proxy covering at least ``duration`` seconds, rendering it on a miss."""
+        bucket = duration_bucket(duration)
+        key = self.key_for(source_path, vf, bucket)
+        if not key:
+            return None
+        proxy = self.path_for(key)
+        if os.path.exists(proxy):
+            os.utime(proxy, None)
+            return proxy
+
+        # Unique temp name: concurrent render jobs may miss on the same proxy
+        tmp = os.path.join(self.base_dir, f'{key}.{os.getpid()}-{threading.get_ident()}.part.mp4')
+        rc = run_ffmpeg(ffmpeg_bin, [
+            *loop_args(source_duration, bucket),
+            '-i', source_path,
+            '-vf', vf,
+            '-an',
+            '-t', f'{bucket:.2f}',
+            *x264_args(encoder),
+            '-pix_fmt', 'yuv420p',
+            '-r', '30',
+            tmp,
+        ], stage='broll_proxy')
+        if rc != 0 or not os.path.exists(tmp):
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return None
+        os.replace(tmp, proxy)
+        self.evict()
+        return proxy
+
+    def evict(self) -> int:
+        return evict_lru(self.base_dir, self.budget_bytes, 'B-roll proxy cache')
+
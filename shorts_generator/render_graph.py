@@ -0,0 +1,274 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+from .captions import CaptionEngine
+
+# Shared source/filter definitions so the single-pass graph and the
+# multi-step fallback render identical backgrounds.
+FOOTAGE_VF = (
+    "scale=1080:1920:force_original_aspect_ratio=cover,"
+    "crop=1080:1920,"
+    "setsar=1:1,"
+    "fps=30,"
+    "eq=saturation=1.25:contrast=1.05"
+)
+BROLL_VF = (
+    "scale=1080:1920:force_original_aspect_ratio=cover,"
+    "crop=1080:1920,"
+    "setsar=1:1,"
+    "fps=30,"
+    "eq=saturation=1.15:contrast=1.05"
+)
+FRACTAL_VF = "scale=1080:1920,setsar=1:1,fps=30,hue=h='2*PI*t':s=1.4"
+KEN_BURNS_VF = "zoompan=z='min(zoom+0.0015,1.3)':d=1:x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)',scale=1080:1920,setsar=1:1"
+BG_COLORS = ['#0ea5e9', '#ef4444', '#22c55e', '#a855f7', '#f59e0b']
+
+DEFAULT_ENCODER = {'preset': 'veryfast', 'crf': 18, 'threads': 0}
+# Review drafts: quarter-size frames at half the frame rate, fastest x264 preset
+DRAFT_ENCODER = {'preset': 'ultrafast', 'crf': 26}
+DRAFT_OUTPUT = {'width': 540, 'height': 960, 'fps': 15}
+# Thumbnail frames are tapped from the caption-free background at this time
+THUMB_TAP_SEC = 1.0
+
+
+def loop_args(source_duration: Optional[float], duration: float) -> List[str]:
+    # Loop only clips that are shorter than needed (or of unknown length)
+    if source_duration and source_duration >= duration:
+        return []
+    return ['-stream_loop', '-1']
+
+
+def thread_args(encoder: Optional[Dict] = None) -> List[str]:
+    threads = int((encoder or {}).get('threads') or 0)
+    return ['-threads', str(threads)] if threads > 0 else []
+
+
+def x264_args(encoder: Optional[Dict] = None) -> List[str]:
+    enc = {**DEFAULT_ENCODER, **(encoder or {})}
+    return ['-c:v', 'libx264', '-preset', str(enc['preset']), '-crf', str(enc['crf'])] + thread_args(enc)
+
+
+def random_fractal_source(rng: Optional[random.Random] = None) -> str:
+    r = rng or random
+    start_x = r.uniform(-1.0, 0.5)
+    start_y = r.uniform(-0.8, 0.8)
+    start_scale = r.uniform(1.2, 2.8)
+    end_scale = r.uniform(0.2, 0.6)
+    morph = r.uniform(0.003, 0.02)
+    return (
+        f"mandelbrot=s=480x854:rate=30:start_x={start_x}:start_y={start_y}:start_scale={start_scale}:"
+        f"end_scale={end_scale}:morphxf={morph}:morphyf={morph * 1.3}:outer=iteration_count"
+    )
+
+
+def random_color_source(duration: float, rng: Optional[random.Random] = None) -> Tuple[str, str]:
+    r = rng or random
+    color = r.choice(BG_COLORS)
+    noise_seed = r.randint(0, 9999)
+    source = f"color=c={color}:s=1080x1920:d={duration:.2f}"
+    vf = (
+        f"noise=alls=1080x1920:all_seed={noise_seed}:all_strength=8:"
+        "all_flags=u+t,format=yuv420p"
+    )
+    return source, vf
+
+
+def music_input(music: Dict) -> List[str]:
+    """Input args for a picked track ({'path', 'gain', 'offset'}), seeking to its offset."""
+    offset = float(music.get('offset') or 0.0)
+    return (['-ss', f'{offset:.2f}'] if offset > 0 else []) + ['-i', music['path']]
+
+
+def audio_filter(
+    voice_idx: int,
+    music_idx: Optional[int],
+    music_vol_db: float,
+    target_duration: float,
+    tag: str = '',
+    music_gain: Optional[float] = None,
+) -> str:
+    """Loudnorm/duck/mix chain ending in the [a] label (``tag`` suffixes every label).
+
+    With ``music_gain`` (precomputed by the music index) the music is only
+    scaled by ``volume`` instead of being analyzed with loudnorm.
+    """
+    if music_idx is None:
+        return (
+            f"[{voice_idx}:a]loudnorm=I=-16:TP=-1.5:LRA=11:print_format=none,"
+            f"apad=pad_dur={target_duration:.2f}[a{tag}]"
+        )
+    if music_gain is not None:
+        music_norm = f"[{music_idx}:a]volume={music_gain:.5f}[music_norm{tag}]"
+    else:
+        music_norm = f"[{music_idx}:a]loudnorm=I={music_vol_db}dB:TP=-2.0:LRA=9:print_format=none[music_norm{tag}]"
+    return (
+        # A link label can only be consumed once: split the voice for the sidechain and the mix
+        f"[{voice_idx}:a]loudnorm=I=-16:TP=-1.5:LRA=11:print_format=none,asplit=2[voice_sc{tag}][voice_mix{tag}];"
+        f"{music_norm};"
+        f"[music_norm{tag}][voice_sc{tag}]sidechaincompress=threshold=-30dB:ratio=8:attack=5:release=400:makeup=0[music_duck{tag}];"
+        f"[voice_mix{tag}][music_duck{tag}]amix=inputs=2:weights=1 0.35:duration=first:dropout_transition=2[mix{tag}];"
+        f"[mix{tag}]volume=1.0,aresample=async=1,apad=pad_dur={target_duration:.2f}[a{tag}]"
+    )
+
+
+def thumb_tap(src: str) -> Tuple[List[str], str]:
+    """Split ``src`` so one copy feeds the [thumb] label; returns (chains, label for the main path)."""
+    return [
+        f"[{src}]split=2[vmain][thumb_src]",
+        f"[thumb_src]trim=start={THUMB_TAP_SEC:.2f},setpts=PTS-STARTPTS[thumb]",
+    ], 'vmain'
+
+
+def thumb_output(thumb_frame: str) -> List[str]:
+    # Second output of the same process: a single PNG frame
+    return ['-map', '[thumb]', '-frames:v', '1', '-update', '1', thumb_frame]
+
+
+def background_inputs(bg: Dict, duration: float, first_index: int = 0) -> Tuple[List[str], List[str]]:
+    """Return (input args, filter chains) that produce the [bg] label for a planned background."""
+    mode = bg.get('mode')
+    inputs: List[str] = []
+    chains: List[str] = []
+    idx = first_index
+
+    if mode == 'broll':
+        labels = []
+        for n, sel in enumerate(bg['selections']):
+            # Cached proxies are already 1080x1920@30 and graded
+            vf = 'null' if sel.get('proxy') else BROLL_VF
+            src_dur = None if sel.get('proxy') else sel.get('source_duration')
+            inputs += [*loop_args(src_dur, sel['duration']), '-t', f"{sel['duration']:.2f}", '-i', sel['path']]
+            chains.append(f"[{idx}:v]{vf},setpts=PTS-STARTPTS[b{n}]")
+            labels.append(f"[b{n}]")
+            idx += 1
+        chains.append(f"{''.join(labels)}concat=n={len(labels)}:v=1:a=0[bg]")
+    elif mode == 'footage':
+        inputs += ['-stream_loop', '-1', '-t', f'{duration:.2f}', '-i', bg['path']]
+        chains.append(f"[{idx}:v]{FOOTAGE_VF}[bg]")
+    elif mode == 'sd':
+        inputs += ['-loop', '1', '-t', f'{duration:.2f}', '-i', bg['image']]
+        chains.append(f"[{idx}:v]{KEN_BURNS_VF},fps=30[bg]")
+    elif mode == 'fractal':
+        inputs += ['-f', 'lavfi', '-t', f'{duration:.2f}', '-i', bg['source']]
+        chains.append(f"[{idx}:v]{FRACTAL_VF}[bg]")
+    elif mode == 'clip':
+        # Pre-rendered 1080x1920@30 loop (background bank); only needs trimming
+        # (looped so segment slices past the loop's end still get frames)
+        inputs += ['-stream_loop', '-1', '-t', f'{duration:.2f}', '-i', bg['path']]
+        chains.append(f"[{idx}:v]setpts=PTS-STARTPTS[bg]")
+    elif mode == 'color':
+        inputs += ['-f', 'lavfi', '-i', bg['source']]
+        chains.append(f"[{idx}:v]{bg['vf']},fps=30[bg]")
+    else:
+        raise ValueError(f"unknown background mode: {mode}")
+
+    return inputs, chains
+
+
+def single_pass_args(
+    bg: Dict,
+    captions: CaptionEngine,
+    segments: List[Dict],
+    voice_wav: str,
+    music: Optional[Dict],
+    music_vol_db: float,
+    target_duration: float,
+    out_mp4: str,
+    encoder: Optional[Dict] = None,
+    thumb_frame: Optional[str] = None,
+    output: Optional[Dict] = None,
+) -> List[str]:
+    """Build one ffmpeg invocation: background + captions + voice/music → final MP4 (+ thumbnail frame).
+
+    ``output`` ({'width', 'height', 'fps'}, e.g. DRAFT_OUTPUT) drops the
+    frame rate before captions and scales the captioned frames down, so
+    caption layout matches the full-size render.
+    """
+    inputs, chains = background_inputs(bg, target_duration)
+    src = 'bg'
+    fps = int((output or {}).get('fps') or 30)
+    scale = ''
+    if output:
+        chains.append(f"[bg]fps={fps}[bg_out]")
+        src = 'bg_out'
+        scale = f"scale={output['width']}:{output['height']},"
+    if thumb_frame:
+        tap_chains, src = thumb_tap(src)
+        chains += tap_chains
+    cap_inputs, cap_chains = captions.build(segments, src, 'cap', first_input=inputs.count('-i'))
+    inputs += cap_inputs
+    chains += cap_chains
+    voice_idx = inputs.count('-i')
+    inputs += ['-i', voice_wav]
+    music_idx: Optional[int] = None
+    if music:
+        music_idx = voice_idx + 1
+        inputs += music_input(music)
+
+    chains.append(f"[cap]{scale}format=yuv420p[v]")
+    chains.append(audio_filter(voice_idx, music_idx, music_vol_db, target_duration, music_gain=(music or {}).get('gain')))
+
+    return inputs + [
+        '-filter_complex', ';'.join(chains),
+        '-map', '[v]', '-map', '[a]',
+        *x264_args(encoder),
+        '-r', str(fps),
+        '-c:a', 'aac',
+        '-shortest',
+        out_mp4,
+    ] + (thumb_output(thumb_frame) if thumb_frame else [])
+
+
+def batch_args(
+    bg: Dict,
+    branches: List[Dict],
+    music: Optional[Dict],
+    music_vol_db: float,
+    encoder: Optional[Dict] = None,
+    thumb_frame: Optional[str] = None,
+) -> List[str]:
+    """One ffmpeg invocation that decodes/scales ``bg`` once and writes one MP4 per branch.
+
+    Each branch is a dict with ``captions`` (CaptionEngine), ``segments``,
+    ``voice_wav``, ``duration`` and ``out_mp4``. The background is split N
+    ways and every branch trims its copy to its own duration.
+    """
+    n = len(branches)
+    longest = max(float(b['duration']) for b in branches)
+    inputs, chains = background_inputs(bg, longest)
+    src = 'bg'
+    if thumb_frame:
+        # Branches share the background, so one tapped frame serves every thumbnail
+        tap_chains, src = thumb_tap(src)
+        chains += tap_chains
+    chains.append(f"[{src}]split={n}{''.join(f'[bg{i}]' for i in range(n))}")
+
+    music_idx: Optional[int] = None
+    if music:
+        # One music input; each branch's audio chain reads it independently
+        music_idx = inputs.count('-i')
+        inputs += music_input(music)
+
+    outputs: List[str] = []
+    for i, branch in enumerate(branches):
+        dur = float(branch['duration'])
+        chains.append(f"[bg{i}]trim=duration={dur:.3f},setpts=PTS-STARTPTS[bgt{i}]")
+        cap_inputs, cap_chains = branch['captions'].build(branch['segments'], f'bgt{i}', f'cap{i}', first_input=inputs.count('-i'))
+        inputs += cap_inputs
+        chains += cap_chains
+        chains.append(f"[cap{i}]format=yuv420p[v{i}]")
+        voice_idx = inputs.count('-i')
+        inputs += ['-i', branch['voice_wav']]
+        chains.append(audio_filter(voice_idx, music_idx, music_vol_db, dur, tag=str(i), music_gain=(music or {}).get('gain')))
+        outputs += [
+            '-map', f'[v{i}]', '-map', f'[a{i}]',
+            *x264_args(encoder),
+            '-r', '30',
+            '-c:a', 'aac',
+            '-shortest',
+            branch['out_mp4'],
+        ]
+
+    if thumb_frame:
+        outputs += thumb_output(thumb_frame)
+    return inputs + ['-filter_complex', ';'.join(chains)] + outputs
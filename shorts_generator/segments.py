@@ -0,0 +1,159 @@
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils import ensure_dir, log, run_ffmpeg
+from utils.cache import evict_lru
+from .captions import CaptionEngine
+from .manifest import file_signature, render_key
+from .render_graph import DEFAULT_ENCODER, background_inputs, x264_args
+
+FPS = 30
+# Shared timescale so independently encoded chunks concat cleanly with -c copy
+TIMESCALE = 15360
+# Non-b-roll slices start at segment index * this many seconds into the shared
+# source, independent of where the segment falls in the script
+SLICE_STRIDE = 3.0
+_COLOR_DURATION_RE = re.compile(r':d=[0-9.]+')
+
+
+def _slice_source(bg: Dict) -> object:
+    mode = bg['mode']
+    if mode == 'broll':
+        # Proxies are touched on every cache hit (LRU), so key on the clip they were made from
+        return [
+            [file_signature(sel.get('source_path') or sel['path']), bool(sel.get('proxy')), round(sel['duration'], 3)]
+            for sel in bg['selections']
+        ]
+    if mode in ('footage', 'clip'):
+        return file_signature(bg['path'])
+    if mode == 'sd':
+        return file_signature(bg['image'])
+    if mode == 'fractal':
+        return bg['source']
+    # The color source's own length (d=) follows the slice, not the look
+    return [_COLOR_DURATION_RE.sub('', bg.get('source') or ''), bg.get('vf')]
+
+
+def segment_slices(bg: Dict, segments: List[Dict]) -> List[Dict]:
+    """Split a planned background into one frame-exact slice per caption segment.
+
+    Slices depend only on the segment itself (its length and index), not on
+    what precedes it, so a template line keeps its chunk across hook
+    variants. B-roll already carries one clip per segment, so its slices
+    start at 0 of their own clip; other modes slice the shared source at
+    ``idx * SLICE_STRIDE``.
+    """
+    slices: List[Dict] = []
+    for idx, seg in enumerate(segments):
+        frames = max(1, int(round((float(seg['end']) - float(seg['start'])) * FPS)))
+        duration = frames / FPS
+        if bg['mode'] == 'broll':
+            sels = bg['selections']
+            sel = sels[idx % len(sels)]
+            sub_bg = {'mode': 'broll', 'selections': [{**sel, 'duration': duration}]}
+            offset = 0.0
+        else:
+            offset = idx * SLICE_STRIDE
+            sub_bg = bg
+            if bg['mode'] == 'color':
+                sub_bg = {**bg, 'source': _COLOR_DURATION_RE.sub(f':d={offset + duration:.2f}', bg['source'])}
+        slices.append({
+            'bg': sub_bg,
+            'offset': offset,
+            'frames': frames,
+            'segment': {'text': seg['text'], 'start': 0.0, 'end': duration},
+        })
+    return slices
+
+
+class SegmentCache:
+    """GOP-aligned caption+background chunks keyed by text, background slice and timing."""
+
+    def __init__(self, base_dir: str, budget_mb: int = 1024):
+        self.base_dir = base_dir
+        self.budget_bytes = max(0, int(budget_mb)) * 1024 * 1024
+        ensure_dir(base_dir)
+
+    def key_for(self, sl: Dict, captions: CaptionEngine, encoder: Optional[Dict]) -> str:
+        enc = {**DEFAULT_ENCODER, **(encoder or {})}
+        return render_key({
+            'chunk': _slice_source(sl['bg']),
+            'mode': sl['bg']['mode'],
+            'offset': round(sl['offset'], 3),
+            'frames': sl['frames'],
+            'caption': [captions.name, sl['segment']['text']],
+            'encoder': [enc['preset'], enc['crf']],
+        })[:24]
+
+    def ensure(self, ffmpeg_bin: str, sl: Dict, captions: CaptionEngine, encoder: Optional[Dict] = None) -> Tuple[Optional[str], bool]:
+        """Return (chunk path, was_cached)."""
+        key = self.key_for(sl, captions, encoder)
+        out = os.path.join(self.base_dir, f'{key}.mp4')
+        if os.path.exists(out):
+            os.utime(out, None)
+            return out, True
+
+        tmp = os.path.join(self.base_dir, f'{key}.{os.getpid()}-{threading.get_ident()}.part.mp4')
+        end = sl['offset'] + sl['frames'] / FPS
+        inputs, chains = background_inputs(sl['bg'], end)
+        if sl['offset'] > 0:
+            chains.append(f"[bg]trim=start={sl['offset']:.3f},setpts=PTS-STARTPTS[bgs]")
+        else:
+            chains.append("[bg]null[bgs]")
+        cap_inputs, cap_chains = captions.build([sl['segment']], 'bgs', 'cap', first_input=inputs.count('-i'))
+        chains += cap_chains
+        chains.append("[cap]format=yuv420p[v]")
+        rc = run_ffmpeg(ffmpeg_bin, inputs + cap_inputs + [
+            '-filter_complex', ';'.join(chains),
+            '-map', '[v]',
+            '-an',
+            *x264_args(encoder),
+            # Each chunk is a closed GOP starting on an IDR frame
+            '-force_key_frames', 'expr:eq(n,0)',
+            '-r', str(FPS),
+            '-frames:v', str(sl['frames']),
+            '-video_track_timescale', str(TIMESCALE),
+            tmp,
+        ], stage='segment')
+        if rc != 0 or not os.path.exists(tmp):
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return None, False
+        os.replace(tmp, out)
+        evict_lru(self.base_dir, self.budget_bytes, 'Segment chunk cache')
+        return out, False
+
+
+def render_segmented(
+    ffmpeg_bin: str,
+    bg: Dict,
+    segments: List[Dict],
+    captions: CaptionEngine,
+    cache: SegmentCache,
+    concat_path: str,
+    out_video: str,
+    encoder: Optional[Dict] = None,
+) -> int:
+    """Encode only uncached segment chunks, then stitch all chunks with stream copy."""
+    chunks: List[str] = []
+    reused = 0
+    for sl in segment_slices(bg, segments):
+        chunk, hit = cache.ensure(ffmpeg_bin, sl, captions, encoder)
+        if not chunk:
+            return 1
+        reused += int(hit)
+        chunks.append(chunk)
+    log(f"Segment chunks: {len(chunks)} total, {reused} reused from cache.")
+
+    with open(concat_path, 'w', encoding='utf-8') as fh:
+        for chunk in chunks:
+            fh.write(f"file '{os.path.abspath(chunk)}'\n")
+    return run_ffmpeg(ffmpeg_bin, [
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', concat_path,
+        '-c', 'copy',
+        out_video,
+    ], stage='segment_concat')
@@ -0,0 +1,38 @@
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class StageGraph:
+    """Tiny dependency graph for render stages.
+
+    Each stage runs on a thread pool as soon as its dependencies finish and
+    receives their results positionally. Stages mostly wait on ffmpeg/TTS
+    subprocesses, so threads give real overlap.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._stages: Dict[str, Tuple[Callable[..., Any], List[str]]] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], *deps: str) -> None:
+        self._stages[name] = (fn, list(deps))
+
+    def run(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        remaining = dict(self._stages)
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage') as pool:
+            while remaining or running:
+                for name, (fn, deps) in list(remaining.items()):
+                    if all(d in results for d in deps):
+                        # Each stage sees the caller's context (e.g. the ffmpeg job key)
+                        ctx = contextvars.copy_context()
+                        running[pool.submit(ctx.run, fn, *[results[d] for d in deps])] = name
+                        del remaining[name]
+                if not running:
+                    raise ValueError(f"unsatisfiable stage dependencies: {sorted(remaining)}")
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    results[running.pop(fut)] = fut.result()
+        return results
@@ -0,0 +1,80 @@
+import os
+import threading
+from typing import Optional
+
+from utils import warn
+from .captions import FONT_PATH, line_breaks
+
+try:  # optional dependency for in-process thumbnails
+    from PIL import Image, ImageDraw, ImageFont  # type: ignore
+except Exception:  # pragma: no cover
+    Image = None  # type: ignore
+
+THUMB_SIZE = (1080, 1920)
+THUMB_FONT_SIZE = 104
+THUMB_EXTS = {'jpeg': 'jpg', 'webp': 'webp', 'png': 'png'}
+
+_font_lock = threading.Lock()
+_fonts = {}
+
+
+def thumb_ext(fmt: Optional[str]) -> str:
+    return THUMB_EXTS.get((fmt or 'jpeg').strip().lower(), 'jpg')
+
+
+def _font(size: int):
+    with _font_lock:
+        font = _fonts.get(size)
+        if font is None:
+            try:
+                font = ImageFont.truetype(FONT_PATH, size)
+            except OSError:
+                font = ImageFont.load_default()
+            _fonts[size] = font
+    return font
+
+
+def _cover(img, size):
+    # Scale to fill, then center-crop (same framing as the video's cover crop)
+    w, h = img.size
+    scale = max(size[0] / w, size[1] / h)
+    img = img.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.LANCZOS)
+    left = (img.width - size[0]) // 2
+    top = (img.height - size[1]) // 2
+    return img.crop((left, top, left + size[0], top + size[1]))
+
+
+def compose_thumbnail(base_image: str, text: Optional[str], out_path: str, fmt: str = 'jpeg', quality: int = 82) -> bool:
+    """Overlay the hook on a video frame or SD background and save a compact JPEG/WebP."""
+    if Image is None:
+        return False
+    try:
+        img = _cover(Image.open(base_image).convert('RGB'), THUMB_SIZE)
+        if text:
+            font = _font(THUMB_FONT_SIZE)
+            lines = [ln for ln in line_breaks(text, max_chars=16, max_lines=4).split('\n') if ln]
+            # Darken the upper third so the text reads on any background
+            shade = Image.new('L', img.size, 0)
+            ImageDraw.Draw(shade).rectangle((0, 0, img.width, int(img.height * 0.45)), fill=110)
+            img = Image.composite(Image.new('RGB', img.size, (0, 0, 0)), img, shade)
+            draw = ImageDraw.Draw(img)
+            y = 260
+            for line in lines:
+                left, top, right, bottom = draw.textbbox((0, 0), line, font=font, stroke_width=6)
+                x = (img.width - (right - left)) // 2 - left
+                draw.text((x, y - top), line, font=font, fill=(255, 255, 255), stroke_width=6, stroke_fill=(0, 0, 0))
+                y += (bottom - top) + 28
+        kind = (fmt or 'jpeg').strip().lower()
+        tmp = f"{out_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        if kind == 'webp':
+            img.save(tmp, format='WEBP', quality=quality, method=6)
+        elif kind == 'png':
+            img.save(tmp, format='PNG', optimize=True)
+        else:
+            img.save(tmp, format='JPEG', quality=quality, optimize=True, progressive=True)
+        os.replace(tmp, out_path)
+        return True
+    except (OSError, ValueError) as exc:
+        warn(f"Thumbnail compose failed for {base_image}: {exc}")
+        return False
+
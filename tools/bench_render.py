@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Render throughput benchmark for shorts_generator.generate_short.
+
+Renders a fixed matrix offline — color / fractal / footage / broll
+backgrounds, each with and without music, flite narration — from synthetic
+inputs made with the local ffmpeg (testsrc2 clips, a sine "music" track).
+Every render starts from an empty data dir, so caches never hide work.
+
+Per case it reports the median over --repeat runs of:
+  sec_per_short  wall time of generate_short
+  encode_fps     output frames / wall time
+  cpu_sec        user+sys CPU of all ffmpeg children (from run_ffmpeg accounting)
+  peak_rss_mb    largest ffmpeg child RSS
+plus the per-stage wall split of the last run.
+
+Usage:
+  python tools/bench_render.py --out bench.json
+  python tools/bench_render.py --save-baseline data/bench_baseline.json
+  python tools/bench_render.py --baseline data/bench_baseline.json --threshold 0.15
+  python tools/bench_render.py --cases broll,color --render-mode single --repeat 3
+
+With --baseline the exit code is 1 when any case got slower (seconds or
+CPU-seconds) by more than --threshold.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shorts_generator import generate_short  # noqa: E402
+from shorts_generator.music import MusicIndex  # noqa: E402
+from utils import drain_ffmpeg_runs, run_ffmpeg  # noqa: E402
+
+BACKGROUNDS = ('color', 'fractal', 'footage', 'broll')
+FPS = 30
+TOPIC = 'space'
+SCRIPT = 'Space is not empty. A single rocket launch shakes the ground for miles. Watch what happens next.'
+SEGMENTS = [
+    {'text': 'Space is not empty.', 'start': 0.0, 'end': 3.5},
+    {'text': 'A single rocket launch shakes the ground for miles.', 'start': 3.5, 'end': 8.5},
+    {'text': 'Watch what happens next.', 'start': 8.5, 'end': 12.0},
+]
+DURATION = 12.0
+# Clip names double as b-roll tags (space/rocket/orbit match the topic)
+CLIPS = {
+    'space_rocket_launch.mp4': 'testsrc2=s=1280x720:r=30:d=8',
+    'space_orbit_earth.mp4': 'testsrc2=s=1920x1080:r=30:d=6',
+    'ocean_waves_calm.mp4': 'smptehdbars=s=1280x720:r=30:d=10',
+}
+METRICS = ('sec_per_short', 'cpu_sec')
+
+
+def make_inputs(ffmpeg_bin: str, root: str) -> Dict[str, str]:
+    footage = os.path.join(root, 'footage')
+    music = os.path.join(root, 'music')
+    os.makedirs(footage, exist_ok=True)
+    os.makedirs(music, exist_ok=True)
+    for name, src in CLIPS.items():
+        rc = run_ffmpeg(ffmpeg_bin, [
+            '-f', 'lavfi', '-i', src, '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+            os.path.join(footage, name),
+        ], stage='bench_input')
+        if rc != 0:
+            raise SystemExit(f'could not synthesize {name} (rc={rc}); is {ffmpeg_bin} a working ffmpeg?')
+    track = os.path.join(music, 'bench_tone.wav')
+    rc = run_ffmpeg(ffmpeg_bin, [
+        '-f', 'lavfi', '-i', 'sine=frequency=220:duration=40', '-af', 'volume=0.3', track,
+    ], stage='bench_input')
+    if rc != 0:
+        raise SystemExit(f'could not synthesize music (rc={rc})')
+    drain_ffmpeg_runs()
+    return {'footage_dir': footage, 'music_dir': music}
+
+
+def run_case(ffmpeg_bin: str, inputs: Dict[str, str], root: str, background: str, music: bool, render_mode: str, run: int) -> Dict:
+    data_dir = os.path.join(root, 'runs', f'{background}-{"music" if music else "nomusic"}-{run}')
+    os.makedirs(data_dir, exist_ok=True)
+    if music:
+        # The supervisor indexes music at startup; keep that out of the timing
+        MusicIndex(os.path.join(data_dir, 'music_index.json')).refresh(ffmpeg_bin, inputs['music_dir'], None)
+    drain_ffmpeg_runs()
+
+    start = time.monotonic()
+    res = generate_short(
+        ffmpeg_bin, None, None, data_dir, SCRIPT, DURATION,
+        topic=TOPIC,
+        segments=SEGMENTS,
+        music_dir=inputs['music_dir'] if music else None,
+        footage_dir=inputs['footage_dir'] if background in ('footage', 'broll') else None,
+        render_mode=render_mode,
+        broll_cache_mb=0,
+        segment_cache_mb=0,
+        tts_cache_mb=0,
+        background=background,
+    )
+    wall = time.monotonic() - start
+    runs = drain_ffmpeg_runs()
+
+    stages: Dict[str, float] = {}
+    for r in runs:
+        stages[r['stage']] = round(stages.get(r['stage'], 0.0) + r['wall_sec'], 3)
+    rss = [r['max_rss_kb'] for r in runs if r['max_rss_kb']]
+    return {
+        'ok': bool(res.get('ok')),
+        'error': res.get('error'),
+        'bg_source': res.get('bg_source'),
+        'tts_source': res.get('tts_source'),
+        'render_mode': res.get('render_mode'),
+        'sec_per_short': round(wall, 3),
+        'encode_fps': round(DURATION * FPS / wall, 2) if wall > 0 else None,
+        'cpu_sec': round(sum((r['user_sec'] or 0.0) + (r['sys_sec'] or 0.0) for r in runs), 3),
+        'peak_rss_mb': round(max(rss) / 1024.0, 1) if rss else None,
+        'ffmpeg_runs': len(runs),
+        'stages': stages,
+    }
+
+
+def _median(samples: List[Dict], field: str) -> Optional[float]:
+    vals = [s[field] for s in samples if s.get(field) is not None]
+    return round(statistics.median(vals), 3) if vals else None
+
+
+def run_matrix(ffmpeg_bin: str, backgrounds: List[str], render_mode: str, repeat: int, keep: bool) -> Dict:
+    root = tempfile.mkdtemp(prefix='bench_render_')
+    try:
+        inputs = make_inputs(ffmpeg_bin, root)
+        cases: Dict[str, Dict] = {}
+        for background in backgrounds:
+            for music in (False, True):
+                name = f'{background}{"+music" if music else ""}'
+                samples = [run_case(ffmpeg_bin, inputs, root, background, music, render_mode, n) for n in range(repeat)]
+                last = samples[-1]
+                cases[name] = {
+                    'ok': all(s['ok'] for s in samples),
+                    'error': next((s['error'] for s in samples if s['error']), None),
+                    'bg_source': last['bg_source'],
+                    'tts_source': last['tts_source'],
+                    'render_mode': last['render_mode'],
+                    'sec_per_short': _median(samples, 'sec_per_short'),
+                    'encode_fps': _median(samples, 'encode_fps'),
+                    'cpu_sec': _median(samples, 'cpu_sec'),
+                    'peak_rss_mb': max((s['peak_rss_mb'] or 0.0) for s in samples) or None,
+                    'ffmpeg_runs': last['ffmpeg_runs'],
+                    'stages': last['stages'],
+                }
+                print(f"{name:<16} {cases[name]['sec_per_short']}s/short  {cases[name]['encode_fps']} fps  "
+                      f"{cases[name]['cpu_sec']} cpu-s  ok={cases[name]['ok']}", file=sys.stderr)
+    finally:
+        if keep:
+            print(f"Kept bench data in {root}", file=sys.stderr)
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'ffmpeg': ffmpeg_bin,
+        'render_mode': render_mode,
+        'repeat': repeat,
+        'duration_sec': DURATION,
+        'cpu_count': os.cpu_count(),
+        'cases': cases,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Cases whose sec_per_short or cpu_sec grew by more than ``threshold`` (fraction)."""
+    regressions: List[Dict] = []
+    for name, cur in report['cases'].items():
+        base = (baseline.get('cases') or {}).get(name)
+        if not base:
+            continue
+        if base.get('ok') and not cur.get('ok'):
+            regressions.append({'case': name, 'metric': 'ok', 'baseline': True, 'current': False})
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), cur.get(metric)
+            if old and new is not None and new > old * (1.0 + threshold):
+                regressions.append({
+                    'case': name,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': round(new / old - 1.0, 3),
+                })
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Render throughput benchmark for generate_short')
+    parser.add_argument('--ffmpeg', default=os.getenv('FFMPEG_BIN') or 'ffmpeg')
+    parser.add_argument('--cases', default=','.join(BACKGROUNDS), help='Comma list of backgrounds to run')
+    parser.add_argument('--render-mode', default='multipass', choices=['multipass', 'single', 'segmented'])
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per case; medians are reported')
+    parser.add_argument('--out', help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--baseline', help='Compare against this report and exit 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed slowdown as a fraction (default 0.10)')
+    parser.add_argument('--save-baseline', help='Also write the report to this baseline path')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary renders for inspection')
+    args = parser.parse_args(argv)
+
+    backgrounds = [b.strip() for b in args.cases.split(',') if b.strip()]
+    unknown = sorted(set(backgrounds) - set(BACKGROUNDS))
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    report = run_matrix(args.ffmpeg, backgrounds, args.render_mode, max(1, args.repeat), args.keep)
+    status = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        report['regressions'] = compare(report, baseline, args.threshold)
+        for reg in report['regressions']:
+            print(f"REGRESSION {reg['case']} {reg['metric']}: {reg['baseline']} -> {reg['current']}", file=sys.stderr)
+        status = 1 if report['regressions'] else 0
+    if not all(c['ok'] for c in report['cases'].values()):
+        status = 1
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    else:
+        print(text)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w', encoding='utf-8') as fh:
+            fh.write(text + '\n')
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
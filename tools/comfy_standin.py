@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Local stand-in for the ComfyUI HTTP API, for exercising video_gen offline.
+
+Implements the endpoints video_gen.comfy uses:
+  POST /prompt            {"prompt": {...}, "client_id": "..."} -> {"prompt_id", "number", "node_errors"}
+  GET  /history/<id>      {} until the job has run, then {"<id>": {"outputs", "status"}}
+  GET  /view?filename=... the produced file
+  POST /queue             {"delete": [ids]} drops jobs that have not started
+  GET  /queue             {"queue_running": [...], "queue_pending": [...]}
+
+Jobs run one at a time in submission order, like ComfyUI. Each takes
+--delay seconds and produces a clip: a 3s testsrc2 MP4 when --ffmpeg works,
+otherwise a few placeholder bytes. Prompts containing --fail-marker end
+with status "error".
+
+Usage:
+  python tools/comfy_standin.py --port 8188 --delay 2
+  COMFYUI_API_BASE=http://127.0.0.1:8188 VID_ENGINE_ORDER=animatediff python3 pipeline_trend_to_video.py
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StandinState:
+    def __init__(self, out_dir: str, delay: float, ffmpeg_bin: str, fail_marker: str):
+        self.out_dir = out_dir
+        self.delay = delay
+        self.ffmpeg_bin = ffmpeg_bin
+        self.fail_marker = fail_marker
+        self.lock = threading.Lock()
+        self.jobs: queue.Queue = queue.Queue()
+        self.pending: list = []
+        self.running: list = []
+        self.history: dict = {}
+        self.number = 0
+
+    def submit(self, graph: dict) -> dict:
+        prompt_id = str(uuid.uuid4())
+        with self.lock:
+            self.number += 1
+            number = self.number
+            self.pending.append(prompt_id)
+        self.jobs.put((prompt_id, graph))
+        return {'prompt_id': prompt_id, 'number': number, 'node_errors': {}}
+
+    def delete(self, ids) -> None:
+        with self.lock:
+            self.pending = [p for p in self.pending if p not in set(ids)]
+
+    def _render(self, out_path: str) -> bool:
+        try:
+            proc = subprocess.run([
+                self.ffmpeg_bin, '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', 'testsrc2=s=512x512:r=8:d=3',
+                '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', out_path,
+            ], check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if proc.returncode == 0 and os.path.exists(out_path):
+                return True
+        except OSError:
+            pass
+        with open(out_path, 'wb') as fh:
+            fh.write(b'comfy-standin')
+        return True
+
+    def worker(self) -> None:
+        while True:
+            prompt_id, graph = self.jobs.get()
+            with self.lock:
+                if prompt_id not in self.pending:
+                    continue
+                self.pending.remove(prompt_id)
+                self.running.append(prompt_id)
+            time.sleep(self.delay)
+            failed = bool(self.fail_marker) and self.fail_marker in json.dumps(graph)
+            filename = f'{prompt_id}.mp4'
+            outputs = {}
+            if not failed:
+                self._render(os.path.join(self.out_dir, filename))
+                outputs = {'9': {'gifs': [{'filename': filename, 'subfolder': '', 'type': 'output'}]}}
+            with self.lock:
+                self.running.remove(prompt_id)
+                self.history[prompt_id] = {
+                    'prompt': [0, prompt_id, graph, {}, ['9']],
+                    'outputs': outputs,
+                    'status': {
+                        'status_str': 'error' if failed else 'success',
+                        'completed': not failed,
+                        'messages': [['execution_error', {'exception_message': 'stand-in failure'}]] if failed else [],
+                    },
+                }
+
+
+def make_handler(state: StandinState):
+    class Handler(BaseHTTPRequestHandler):
+        def _json(self, payload, code: int = 200) -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self) -> dict:
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            try:
+                body = self._body()
+            except ValueError as exc:
+                return self._json({'error': f'invalid json: {exc}'}, 400)
+            if path == '/prompt':
+                if not isinstance(body.get('prompt'), dict):
+                    return self._json({'error': 'no prompt', 'node_errors': {}}, 400)
+                return self._json(state.submit(body['prompt']))
+            if path == '/queue':
+                state.delete(body.get('delete') or [])
+                return self._json({})
+            self._json({'error': 'not found'}, 404)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.startswith('/history/'):
+                prompt_id = url.path[len('/history/'):]
+                with state.lock:
+                    entry = state.history.get(prompt_id)
+                return self._json({prompt_id: entry} if entry else {})
+            if url.path == '/queue':
+                with state.lock:
+                    return self._json({'queue_running': list(state.running), 'queue_pending': list(state.pending)})
+            if url.path == '/view':
+                name = os.path.basename((parse_qs(url.query).get('filename') or [''])[0])
+                path = os.path.join(state.out_dir, name)
+                if not name or not os.path.isfile(path):
+                    return self._json({'error': 'not found'}, 404)
+                with open(path, 'rb') as fh:
+                    data = fh.read()
+                self.send_response(200)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            self._json({'error': 'not found'}, 404)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Offline stand-in for the ComfyUI API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8188)
+    parser.add_argument('--delay', type=float, default=2.0, help='Seconds each job "runs"')
+    parser.add_argument('--ffmpeg', default=os.getenv('FFMPEG_BIN') or 'ffmpeg')
+    parser.add_argument('--out-dir', default=None, help='Where outputs are written (default: a temp dir)')
+    parser.add_argument('--fail-marker', default='__FAIL__', help='Prompts containing this fail')
+    args = parser.parse_args(argv)
+
+    out_dir = args.out_dir or tempfile.mkdtemp(prefix='comfy_standin_')
+    os.makedirs(out_dir, exist_ok=True)
+    state = StandinState(out_dir, args.delay, args.ffmpeg, args.fail_marker)
+    threading.Thread(target=state.worker, daemon=True).start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    print(f"ComfyUI stand-in on http://{args.host}:{args.port} (outputs in {out_dir})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
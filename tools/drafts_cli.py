@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Review workflow for draft renders (DRAFT_CANDIDATES > 0 in bot_main).
+
+Usage:
+  python tools/drafts_cli.py                  # list drafts waiting for review
+  python tools/drafts_cli.py promote 12 15    # full-quality render + schedule
+  python tools/drafts_cli.py reject 13 14
+
+Promotion re-renders the draft's request with the normal encoder settings,
+reusing the narration and background plan stored in the draft's manifest,
+then schedules the new video. The draft row is marked 'promoted' (or
+'rejected') and its files are removed by the next lifecycle pass.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import load_config, render_options  # noqa: E402
+from db import (  # noqa: E402
+    get_conn,
+    get_queue_size,
+    init_db,
+    insert_ffmpeg_runs,
+    insert_video,
+    label_ffmpeg_runs,
+    mark_video_status,
+)
+from schedule_manager import next_unfilled_slot, schedule_video  # noqa: E402
+from shorts_generator import generate_short  # noqa: E402
+from shorts_generator.manifest import find_manifest  # noqa: E402
+from utils import drain_ffmpeg_runs, log  # noqa: E402
+from utils.scratch import scratch_root  # noqa: E402
+
+
+def _drafts(conn, ids=None):
+    sql = """
+        SELECT v.id, v.script_id, v.video_path, v.duration_sec, v.status, v.created_at, s.text
+        FROM videos v LEFT JOIN scripts s ON s.id = v.script_id
+        WHERE v.status = 'draft'
+    """
+    params = list(ids or [])
+    if params:
+        sql += f" AND v.id IN ({','.join('?' * len(params))})"
+    return [dict(r) for r in conn.execute(sql + " ORDER BY v.id", params).fetchall()]
+
+
+def promote(cfg, conn, draft) -> bool:
+    manifest = find_manifest(cfg.data_dir, draft['video_path'])
+    if not manifest:
+        log(f"Draft {draft['id']}: no manifest for {draft['video_path']}; cannot promote.")
+        return False
+    req = manifest['spec']
+    gen = generate_short(
+        cfg.ffmpeg_bin,
+        cfg.piper_bin or '',
+        cfg.piper_voice or '',
+        cfg.data_dir,
+        req['script'],
+        req['duration'],
+        topic=req.get('topic'),
+        segments=req.get('segments'),
+        reuse=manifest['result'],
+        **render_options(cfg, scratch_root(cfg.scratch_dir, cfg.scratch_min_free_mb)),
+    )
+    insert_ffmpeg_runs(conn, drain_ffmpeg_runs())
+    if gen.get('render_key'):
+        label_ffmpeg_runs(conn, gen['render_key'], gen.get('bg_source'))
+    if not gen.get('ok'):
+        log(f"Draft {draft['id']}: promotion render failed: {gen.get('error')}")
+        return False
+
+    video_id = insert_video(conn, draft['script_id'], gen['video_path'], gen['thumb_path'], gen['duration_sec'], status='ready')
+    slot = next_unfilled_slot(conn, get_queue_size(conn) + 1)
+    if slot:
+        schedule_video(conn, video_id, slot[0])
+    mark_video_status(conn, draft['id'], 'promoted')
+    log(f"Draft {draft['id']} promoted to video {video_id}"
+        f"{f' at {slot[0]}' if slot else ''} ({gen.get('render_sec', 0):.1f}s render).")
+    return True
+
+
+def main(argv=None) -> int:
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description='List, promote or reject draft renders')
+    parser.add_argument('action', nargs='?', default='list', choices=['list', 'promote', 'reject'])
+    parser.add_argument('ids', nargs='*', type=int, help='Draft video ids')
+    args = parser.parse_args(argv)
+    if args.action != 'list' and not args.ids:
+        parser.error(f'{args.action} needs at least one draft id')
+
+    conn = get_conn(cfg.db_path)
+    init_db(conn)
+    drafts = _drafts(conn, args.ids)
+    missing = sorted(set(args.ids) - {d['id'] for d in drafts})
+    if missing:
+        print(f"Not drafts (or unknown): {', '.join(map(str, missing))}", file=sys.stderr)
+
+    if args.action == 'list':
+        for d in drafts:
+            text = ' '.join((d['text'] or '').split())
+            print(f"{d['id']:>6}  {d['duration_sec']:>5.1f}s  {d['created_at']}  {d['video_path']}\n        {text[:100]}")
+        print(f"{len(drafts)} draft(s) waiting for review")
+        return 0
+
+    ok = True
+    for d in drafts:
+        if args.action == 'reject':
+            mark_video_status(conn, d['id'], 'rejected')
+            log(f"Draft {d['id']} rejected.")
+        else:
+            ok = promote(cfg, conn, d) and ok
+    return 0 if ok and not missing else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Report (default) or apply artifact lifecycle actions for data/{video,audio,thumbs}.
+
+Usage:
+  python tools/lifecycle_cli.py                    # dry run: what would be freed
+  python tools/lifecycle_cli.py --verbose          # ...listing every file
+  python tools/lifecycle_cli.py --apply            # delete/compress for real
+  python tools/lifecycle_cli.py --quota-mb 20000 --retain-days 3 --json
+
+Defaults come from RETAIN_UPLOADED_DAYS / MEDIA_QUOTA_MB (see .env.example).
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import load_config  # noqa: E402
+from db import get_conn, init_db  # noqa: E402
+from lifecycle_manager import apply_lifecycle  # noqa: E402
+
+
+def _mb(n: int) -> str:
+    return f'{n / 1048576:.1f} MB'
+
+
+def main(argv=None) -> int:
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description='Artifact lifecycle manager')
+    parser.add_argument('--apply', action='store_true', help='Perform the actions (default is a dry run)')
+    parser.add_argument('--retain-days', type=float, default=cfg.retain_uploaded_days, help='Keep MP4s this long after upload')
+    parser.add_argument('--quota-mb', type=int, default=cfg.media_quota_mb, help='Total budget for video/audio/thumbs (0 = none)')
+    parser.add_argument('--verbose', action='store_true', help='List every affected file')
+    parser.add_argument('--json', action='store_true', help='Print the full report as JSON')
+    args = parser.parse_args(argv)
+
+    conn = get_conn(cfg.db_path)
+    init_db(conn)
+    report = apply_lifecycle(
+        conn, cfg.data_dir, cfg.ffmpeg_bin,
+        dry_run=not args.apply, retain_uploaded_days=args.retain_days, quota_mb=args.quota_mb,
+    )
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0 if report['ok'] else 1
+
+    groups = defaultdict(lambda: [0, 0])
+    for act in report['actions']:
+        groups[(act['action'], act['reason'])][0] += 1
+        groups[(act['action'], act['reason'])][1] += act['freed']
+    print(f"{'DRY RUN — ' if report['dry_run'] else ''}media: {_mb(report['total_bytes'])}, "
+          f"{'would free' if report['dry_run'] else 'freed'} {_mb(report['freed_bytes'])}, "
+          f"protected files: {report['protected_files']}")
+    if report['quota_bytes']:
+        print(f"quota: {_mb(report['quota_bytes'])}, after: {_mb(report['after_bytes'])}"
+              f"{' (still over quota)' if report['over_quota'] else ''}")
+    for (action, reason), (count, freed) in sorted(groups.items()):
+        print(f"  {action:<9}{reason:<16}{count:>6} file(s) {_mb(freed):>12}")
+    if args.verbose:
+        for act in report['actions']:
+            print(f"  {act['action']:<9}{act['reason']:<16}{_mb(act['bytes']):>12}  {act['path']}")
+    return 0 if report['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
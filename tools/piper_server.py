@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Long-lived Piper TTS server on a local unix socket.
+
+Keeps a pool of `piper --json-input` processes per voice model so the ONNX
+model is loaded once instead of per utterance. utils.tts talks to it
+automatically when the socket exists (PIPER_SOCKET).
+
+Protocol: one JSON line per connection,
+  {"text": "...", "voice": "/path/model.onnx", "out": "/path/out.wav"}
+answered with {"ok": true, "out": "..."} or {"ok": false, "error": "..."}.
+
+Usage:
+  python tools/piper_server.py --piper /usr/bin/piper --voice en_US-amy.onnx --pool 2
+  python tools/piper_server.py --fake          # stand-in: writes silent WAVs, no piper needed
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import signal
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import wave
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), 'piper_server.sock')
+
+
+class PiperWorker:
+    """One resident piper process reading JSON requests from stdin."""
+
+    def __init__(self, piper_bin: str, voice: str):
+        self.proc = subprocess.Popen(
+            [piper_bin, '--model', voice, '--json-input', '--output_dir', tempfile.gettempdir()],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def synthesize(self, text: str, out_wav: str) -> bool:
+        self.proc.stdin.write(json.dumps({'text': text, 'output_file': out_wav}) + '\n')
+        self.proc.stdin.flush()
+        # piper prints the written path once the utterance is done
+        line = self.proc.stdout.readline()
+        return bool(line) and os.path.exists(out_wav)
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+
+
+class FakeWorker:
+    """Stand-in worker for tests: 16-bit mono silence, ~60ms per character."""
+
+    def __init__(self, piper_bin: str, voice: str):
+        self.voice = voice
+
+    def alive(self) -> bool:
+        return True
+
+    def synthesize(self, text: str, out_wav: str) -> bool:
+        rate = 22050
+        frames = max(rate // 10, int(math.ceil(len(text) * 0.06 * rate)))
+        with wave.open(out_wav, 'wb') as dst:
+            dst.setnchannels(1)
+            dst.setsampwidth(2)
+            dst.setframerate(rate)
+            dst.writeframes(b'\x00\x00' * frames)
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class VoicePool:
+    """Up to ``size`` workers per voice; requests check one out, so N utterances run in parallel."""
+
+    def __init__(self, worker_cls, piper_bin: str, size: int):
+        self.worker_cls = worker_cls
+        self.piper_bin = piper_bin
+        self.size = max(1, size)
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._spawned = {}
+
+    def preload(self, voice: str) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(voice, queue.Queue())
+            self._spawned[voice] = self.size
+        for _ in range(self.size):
+            idle.put(self.worker_cls(self.piper_bin, voice))
+
+    def synthesize(self, voice: str, text: str, out_wav: str) -> bool:
+        with self._lock:
+            idle = self._idle.setdefault(voice, queue.Queue())
+            can_spawn = idle.empty() and self._spawned.get(voice, 0) < self.size
+            if can_spawn:
+                self._spawned[voice] = self._spawned.get(voice, 0) + 1
+        worker = self.worker_cls(self.piper_bin, voice) if can_spawn else idle.get()
+        try:
+            ok = worker.synthesize(text, out_wav)
+        except (OSError, ValueError):
+            ok = False
+        if worker.alive():
+            idle.put(worker)
+        else:
+            worker.close()
+            with self._lock:
+                self._spawned[voice] -= 1
+        return ok
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            while not idle.empty():
+                idle.get().close()
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            req = json.loads(self.rfile.readline().decode('utf-8'))
+            text, out = req['text'], req['out']
+            voice = req.get('voice') or self.server.default_voice
+            if not voice:
+                raise KeyError('voice')
+            os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+            ok = self.server.pool.synthesize(voice, text, out)
+            resp = {'ok': ok, 'out': out} if ok else {'ok': False, 'error': 'synthesis_failed'}
+        except (ValueError, KeyError) as exc:
+            resp = {'ok': False, 'error': f'bad_request: {exc}'}
+        self.wfile.write((json.dumps(resp) + '\n').encode('utf-8'))
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Persistent Piper TTS server')
+    parser.add_argument('--socket', default=os.getenv('PIPER_SOCKET') or DEFAULT_SOCKET)
+    parser.add_argument('--piper', default=os.getenv('PIPER_BIN') or 'piper', help='Piper binary path')
+    parser.add_argument('--voice', action='append', default=[], help='Voice model to preload (repeatable)')
+    parser.add_argument('--pool', type=int, default=int(os.getenv('PIPER_POOL') or 1), help='Workers per voice')
+    parser.add_argument('--fake', action='store_true', help='Stand-in worker that writes silent WAVs')
+    args = parser.parse_args()
+
+    voices = args.voice or [v for v in [os.getenv('PIPER_VOICE')] if v]
+    pool = VoicePool(FakeWorker if args.fake else PiperWorker, args.piper, args.pool)
+    for voice in voices:
+        pool.preload(voice)
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    server = Server(args.socket, Handler)
+    server.pool = pool
+    server.default_voice = voices[0] if voices else None
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"piper_server listening on {args.socket} ({'fake' if args.fake else args.piper}, pool={pool.size})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Summarize per-stage ffmpeg cost recorded in the ffmpeg_runs table.
+
+Usage:
+  python tools/render_report.py                 # data/bot.db (DATA_DIR), all rows
+  python tools/render_report.py --days 7 --json
+  python tools/render_report.py --db other.db
+
+Prints p50/p95 wall time, CPU (user+sys) and peak RSS per stage, then
+per-render totals (all stages of one render key) grouped by background mode.
+"""
+
+import argparse
+import json
+import math
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    vals = sorted(v for v in values if v is not None)
+    if not vals:
+        return None
+    # Nearest-rank on the sorted sample
+    idx = min(len(vals) - 1, max(0, math.ceil(pct / 100.0 * len(vals)) - 1))
+    return vals[idx]
+
+
+def _summary(rows: List[Dict]) -> Dict:
+    wall = [r['wall_sec'] for r in rows]
+    cpu = [(r['user_sec'] or 0.0) + (r['sys_sec'] or 0.0) for r in rows if r['user_sec'] is not None]
+    rss = [r['max_rss_kb'] / 1024.0 for r in rows if r['max_rss_kb']]
+    speed = [r['speed'] for r in rows if r['speed']]
+    return {
+        'runs': len(rows),
+        'failed': sum(1 for r in rows if r['rc'] != 0),
+        'wall_p50': percentile(wall, 50),
+        'wall_p95': percentile(wall, 95),
+        'cpu_p50': percentile(cpu, 50),
+        'cpu_p95': percentile(cpu, 95),
+        'rss_mb_p95': percentile(rss, 95),
+        'speed_p50': percentile(speed, 50),
+        'wall_total': sum(wall),
+    }
+
+
+def build_report(conn: sqlite3.Connection, days: Optional[float] = None) -> Dict:
+    sql = "SELECT * FROM ffmpeg_runs"
+    params: List = []
+    if days:
+        sql += " WHERE datetime(created_at) >= datetime('now', ?)"
+        params.append(f'-{float(days)} days')
+    rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+
+    by_stage: Dict[str, List[Dict]] = defaultdict(list)
+    by_render: Dict[str, List[Dict]] = defaultdict(list)
+    for r in rows:
+        by_stage[r['stage']].append(r)
+        if r['render_key']:
+            by_render[r['render_key']].append(r)
+
+    by_mode: Dict[str, List[Dict]] = defaultdict(list)
+    for key, runs in by_render.items():
+        mode = next((r['bg_mode'] for r in runs if r['bg_mode']), None) or 'unknown'
+        by_mode[mode].append({
+            'wall_sec': sum(r['wall_sec'] for r in runs),
+            'cpu_sec': sum((r['user_sec'] or 0.0) + (r['sys_sec'] or 0.0) for r in runs),
+            'runs': len(runs),
+        })
+
+    modes = {}
+    for mode, renders in by_mode.items():
+        wall = [x['wall_sec'] for x in renders]
+        cpu = [x['cpu_sec'] for x in renders]
+        modes[mode] = {
+            'renders': len(renders),
+            'wall_p50': percentile(wall, 50),
+            'wall_p95': percentile(wall, 95),
+            'cpu_p50': percentile(cpu, 50),
+            'cpu_p95': percentile(cpu, 95),
+        }
+    stages = {stage: _summary(runs) for stage, runs in by_stage.items()}
+    return {'runs': len(rows), 'stages': stages, 'bg_modes': modes}
+
+
+def _fmt(value: Optional[float], unit: str = 's') -> str:
+    return '-' if value is None else f'{value:.2f}{unit}'
+
+
+def print_report(report: Dict) -> None:
+    print(f"ffmpeg runs: {report['runs']}")
+    print()
+    print(f"{'stage':<16}{'runs':>6}{'fail':>6}{'wall p50':>11}{'wall p95':>11}{'cpu p50':>11}{'cpu p95':>11}{'rss p95':>11}{'speed':>8}{'total':>11}")
+    stages = sorted(report['stages'].items(), key=lambda kv: -kv[1]['wall_total'])
+    for stage, s in stages:
+        print(
+            f"{stage:<16}{s['runs']:>6}{s['failed']:>6}{_fmt(s['wall_p50']):>11}{_fmt(s['wall_p95']):>11}"
+            f"{_fmt(s['cpu_p50']):>11}{_fmt(s['cpu_p95']):>11}{_fmt(s['rss_mb_p95'], 'M'):>11}"
+            f"{_fmt(s['speed_p50'], 'x'):>8}{_fmt(s['wall_total']):>11}"
+        )
+    print()
+    print(f"{'bg mode':<16}{'renders':>8}{'wall p50':>11}{'wall p95':>11}{'cpu p50':>11}{'cpu p95':>11}")
+    for mode, m in sorted(report['bg_modes'].items()):
+        print(
+            f"{mode:<16}{m['renders']:>8}{_fmt(m['wall_p50']):>11}{_fmt(m['wall_p95']):>11}"
+            f"{_fmt(m['cpu_p50']):>11}{_fmt(m['cpu_p95']):>11}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Per-stage ffmpeg render cost report')
+    parser.add_argument('--db', default=os.path.join(os.getenv('DATA_DIR', 'data').strip(), 'bot.db'))
+    parser.add_argument('--days', type=float, default=None, help='Only runs from the last N days')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}", file=sys.stderr)
+        return 1
+    conn = sqlite3.connect(f'file:{args.db}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        report = build_report(conn, args.days)
+    except sqlite3.OperationalError as exc:
+        print(f"No ffmpeg run data ({exc}); run the bot once to create the table.", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,9 @@ import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.tts import synthesize_with_server  # noqa: E402
+
 parser = argparse.ArgumentParser(description="Piper CLI wrapper")
 parser.add_argument("--text", required=True, help="Path to input text file")
 parser.add_argument("--out", required=True, help="Output wav path")
@@ -13,6 +16,12 @@ parser.add_argument("--piper", required=True, help="Piper binary path")
 args = parser.parse_args()
 
 Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+
+# Prefer the resident server (tools/piper_server.py): the voice model is already loaded there
+served = synthesize_with_server(args.voice, Path(args.text).read_text(encoding="utf-8"), args.out)
+if served is not None:
+    sys.exit(0 if served else 1)
+
 cmd = f"{shlex.quote(args.piper)} -m {shlex.quote(args.voice)} -f {shlex.quote(args.text)} -o {shlex.quote(args.out)}"
 
 try:
@@ -1,5 +1,5 @@
 from .io import ensure_dir, read_json, write_json, slugify
 from .logs import log, warn, err
 from .text import word_count, truncate_words, estimate_duration_sec
-from .ffmpeg import run_ffmpeg
-from .tts import synthesize_with_piper, synthesize_with_command
+from .ffmpeg import run_ffmpeg, ffmpeg_job, set_ffmpeg_job, annotate_runs, drain_ffmpeg_runs
+from .tts import synthesize_with_piper, synthesize_with_command, synthesize_with_server
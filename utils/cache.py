@@ -2,7 +2,9 @@ import hashlib
 import json
 import os
 import time
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
+
+from .logs import log
 
 
 def _safe_key(s: str) -> str:
@@ -55,3 +57,37 @@ class RateLimiter:
             return True
         return False
 
+
+
+def _cache_entries(base_dir: str, suffix: str) -> List[Tuple[float, int, str]]:
+    out: List[Tuple[float, int, str]] = []
+    for fn in os.listdir(base_dir):
+        # Skip in-flight temp files (<key>.<pid>-<tid>.part<suffix>)
+        if not fn.endswith(suffix) or fn.endswith('.part' + suffix):
+            continue
+        p = os.path.join(base_dir, fn)
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        out.append((st.st_mtime, st.st_size, p))
+    return out
+
+
+def evict_lru(base_dir: str, budget_bytes: int, label: str, suffix: str = '.mp4') -> int:
+    """Delete the least recently used ``suffix`` files in base_dir until it fits the budget."""
+    entries = sorted(_cache_entries(base_dir, suffix))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, p in entries:
+        if total <= budget_bytes:
+            break
+        try:
+            os.unlink(p)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        log(f"{label} evicted {removed} file(s).")
+    return removed
@@ -1,14 +1,110 @@
+import contextvars
+import functools
+import os
 import subprocess
-from typing import List
+import threading
+import time
+from typing import Callable, Dict, List, Optional
 from .logs import log, err
 
+# Render key of the job issuing ffmpeg calls; StageGraph copies the context
+# into its worker threads so stage runs inherit it.
+_job_key: contextvars.ContextVar = contextvars.ContextVar('ffmpeg_job_key', default=None)
 
-def run_ffmpeg(ffmpeg_bin: str, args: List[str]) -> int:
-    cmd = [ffmpeg_bin, '-y'] + args
-    log(f"Running ffmpeg: {' '.join(cmd)}")
+# Rows wait here until the main thread persists them; the cap keeps callers
+# that never drain (CLI tools) from growing without bound.
+MAX_BUFFERED_RUNS = 5000
+
+_runs_lock = threading.Lock()
+_runs: List[Dict] = []
+
+
+def ffmpeg_job(fn: Callable) -> Callable:
+    """Run ``fn`` in its own context so ``set_ffmpeg_job`` doesn't leak to the caller."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return contextvars.copy_context().run(fn, *args, **kwargs)
+    return wrapper
+
+
+def set_ffmpeg_job(render_key: Optional[str]) -> None:
+    _job_key.set(render_key)
+
+
+def annotate_runs(render_key: str, bg_mode: Optional[str]) -> None:
+    # The background mode is only known once the render has resolved it
+    with _runs_lock:
+        for row in _runs:
+            if row['render_key'] == render_key and not row['bg_mode']:
+                row['bg_mode'] = bg_mode
+
+
+def drain_ffmpeg_runs() -> List[Dict]:
+    """Return and clear the buffered per-invocation rows (persisted by the caller)."""
+    with _runs_lock:
+        rows = list(_runs)
+        _runs.clear()
+    return rows
+
+
+def _parse_progress(stream, progress: Dict) -> None:
+    for line in stream:
+        key, _, value = line.strip().partition('=')
+        if key in ('fps', 'speed', 'out_time_us', 'out_time_ms') and value not in ('', 'N/A'):
+            progress[key] = value
+
+
+def _wait(proc: subprocess.Popen):
+    # wait4 gives this child's own rusage; RUSAGE_CHILDREN would mix in parallel stages
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return usage
+    proc.wait()
+    return None
+
+
+def _number(value: Optional[str]) -> Optional[float]:
     try:
-        return subprocess.run(cmd, check=False).returncode
+        return float((value or '').rstrip('x'))
+    except ValueError:
+        return None
+
+
+def run_ffmpeg(ffmpeg_bin: str, args: List[str], stage: Optional[str] = None) -> int:
+    cmd = [ffmpeg_bin, '-y', '-progress', 'pipe:1', '-nostats'] + args
+    log(f"Running ffmpeg{f' [{stage}]' if stage else ''}: {' '.join(cmd)}")
+    start = time.monotonic()
+    progress: Dict[str, str] = {}
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, errors='replace')
     except Exception as e:
         err(f"ffmpeg failed to start: {e}")
         return 1
+    try:
+        _parse_progress(proc.stdout, progress)
+    finally:
+        proc.stdout.close()
+        usage = _wait(proc)
+    wall = time.monotonic() - start
 
+    out_us = _number(progress.get('out_time_us') or progress.get('out_time_ms'))
+    row = {
+        'stage': stage or 'ffmpeg',
+        'render_key': _job_key.get(),
+        'bg_mode': None,
+        'rc': proc.returncode,
+        'wall_sec': round(wall, 3),
+        'user_sec': round(usage.ru_utime, 3) if usage else None,
+        'sys_sec': round(usage.ru_stime, 3) if usage else None,
+        # ru_maxrss is KiB on Linux
+        'max_rss_kb': int(usage.ru_maxrss) if usage else None,
+        'fps': _number(progress.get('fps')),
+        'speed': _number(progress.get('speed')),
+        'out_time_sec': round(out_us / 1e6, 3) if out_us is not None else None,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()),
+    }
+    with _runs_lock:
+        _runs.append(row)
+        del _runs[:-MAX_BUFFERED_RUNS]
+    return proc.returncode
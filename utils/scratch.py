@@ -0,0 +1,93 @@
+import errno
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from .io import ensure_dir
+from .logs import log, warn
+
+SHM_DIR = '/dev/shm'
+SCRATCH_SUBDIR = 'youtube-bot'
+
+
+def _free_mb(path: str) -> float:
+    st = os.statvfs(path)
+    return st.f_bavail * st.f_frsize / (1024 * 1024)
+
+
+def scratch_root(configured: Optional[str] = None, min_free_mb: int = 2048) -> str:
+    """Root for per-job scratch dirs.
+
+    An explicit SCRATCH_DIR wins; ``auto`` (or unset) uses tmpfs at /dev/shm
+    when it is writable and has ``min_free_mb`` free, else the system temp dir.
+    """
+    if configured and configured.strip().lower() != 'auto':
+        return configured
+    try:
+        if os.access(SHM_DIR, os.W_OK) and _free_mb(SHM_DIR) >= min_free_mb:
+            return os.path.join(SHM_DIR, SCRATCH_SUBDIR)
+    except (OSError, AttributeError):
+        pass
+    return os.path.join(tempfile.gettempdir(), SCRATCH_SUBDIR)
+
+
+class ScratchDir:
+    """Private directory for one render job's intermediates, removed on exit.
+
+    Finished outputs are moved out with ``promote`` before the block ends;
+    whatever is left (bg/caption passes, b-roll clips, concat lists) is
+    deleted with the directory, including when the job fails.
+    """
+
+    def __init__(self, root: str, label: str):
+        self.root = root
+        self.label = label
+        self.path = ''
+
+    def __enter__(self) -> 'ScratchDir':
+        ensure_dir(self.root)
+        self.path = tempfile.mkdtemp(prefix=f'{self.label}-', dir=self.root)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+
+def promote(src: str, dst: str) -> str:
+    """Move a finished file into ``dst`` atomically, copying across filesystems."""
+    ensure_dir(os.path.dirname(dst) or '.')
+    try:
+        os.replace(src, dst)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        # tmpfs → disk: copy next to the destination, then rename over it
+        tmp = f'{dst}.{os.getpid()}-{threading.get_ident()}.part'
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+        os.unlink(src)
+    return dst
+
+
+def sweep_scratch(root: str, max_age_hours: float = 6.0) -> int:
+    """Remove job dirs left behind by crashed runs (tmpfs holds them in RAM)."""
+    if not os.path.isdir(root):
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for de in os.scandir(root):
+        try:
+            if de.is_dir(follow_symlinks=False) and de.stat(follow_symlinks=False).st_mtime < cutoff:
+                shutil.rmtree(de.path, ignore_errors=True)
+                removed += 1
+        except OSError as exc:
+            warn(f"Scratch sweep skipped {de.path}: {exc}")
+    if removed:
+        log(f"Scratch sweep: removed {removed} stale job dir(s) from {root}.")
+    return removed
@@ -1,9 +1,14 @@
+import json
 import os
+import socket
 import subprocess
 import tempfile
 from typing import Optional
 
-from .logs import log, err
+from .logs import log, err, warn
+
+# Unix socket of tools/piper_server.py; used automatically when it is up
+PIPER_SOCKET = os.getenv('PIPER_SOCKET') or os.path.join(tempfile.gettempdir(), 'piper_server.sock')
 
 
 def synthesize_with_command(tts_cmd: Optional[str], text: str, out_wav: str, *, piper_bin: Optional[str] = None, piper_voice: Optional[str] = None) -> bool:
@@ -42,7 +47,36 @@ def synthesize_with_command(tts_cmd: Optional[str], text: str, out_wav: str, *,
             pass
 
 
+def synthesize_with_server(voice: Optional[str], text: str, out_wav: str, socket_path: Optional[str] = None, timeout: float = 120.0) -> Optional[bool]:
+    """Synthesize through the resident Piper server; None when no server is listening."""
+    path = socket_path or PIPER_SOCKET
+    if not os.path.exists(path):
+        return None
+    req = {'text': text, 'voice': voice, 'out': os.path.abspath(out_wav)}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall((json.dumps(req) + '\n').encode('utf-8'))
+            with sock.makefile('r', encoding='utf-8') as fh:
+                resp = json.loads(fh.readline() or '{}')
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Stale socket file from a server that is no longer running
+        return None
+    except (OSError, ValueError) as exc:
+        warn(f"Piper server error: {exc}")
+        return False
+    if not resp.get('ok'):
+        warn(f"Piper server failed: {resp.get('error')}")
+        return False
+    return os.path.exists(out_wav)
+
+
 def synthesize_with_piper(piper_bin: Optional[str], voice: Optional[str], text: str, out_wav: str) -> bool:
+    if voice:
+        served = synthesize_with_server(voice, text, out_wav)
+        if served is not None:
+            return served
     if not piper_bin or not voice:
         log("Piper not configured; skipping fallback TTS.")
         return False
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import shutil
+import threading
+import unicodedata
+import wave
+from typing import Dict, List, Optional, Tuple
+
+from .cache import evict_lru
+from .io import ensure_dir, read_json, write_json
+from .logs import warn
+
+
+def normalize_tts_text(text: str) -> str:
+    # Whitespace and Unicode form don't change what the engine says
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+class TtsCache:
+    """Synthesized WAVs keyed by (engine, voice, normalized text).
+
+    Entries are stored per sentence/segment, so repeated template lines
+    (curiosity/payoff/CTA) are synthesized once and concatenated from PCM
+    afterwards. Use ``get_tts_cache`` for the process-wide instance: its
+    hit/miss counters span every render of the process and are added to
+    ``stats.json`` by ``flush_stats`` (once per render, not per lookup);
+    eviction drops least recently used WAVs over the budget.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, base_dir: str, budget_mb: int = 256):
+        self.base_dir = base_dir
+        self.budget_bytes = max(0, int(budget_mb)) * 1024 * 1024
+        self.stats_path = os.path.join(base_dir, 'stats.json')
+        self.hits = 0
+        self.misses = 0
+        # Counted since the last flush_stats()
+        self._pending = {'hits': 0, 'misses': 0}
+        ensure_dir(base_dir)
+
+    def key_for(self, engine: str, voice: Optional[str], text: str) -> str:
+        raw = f"{engine}|{voice or ''}|{normalize_tts_text(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:24]
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.base_dir, f'{key}.wav')
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._pending['hits' if hit else 'misses'] += 1
+
+    def flush_stats(self) -> None:
+        """Add the counts since the last flush to ``stats.json``."""
+        with self._lock:
+            if not any(self._pending.values()):
+                return
+            totals = read_json(self.stats_path, default={}) or {}
+            for field, n in self._pending.items():
+                totals[field] = int(totals.get(field, 0)) + n
+            write_json(self.stats_path, totals)
+            self._pending = {'hits': 0, 'misses': 0}
+
+    def get(self, engine: str, voice: Optional[str], text: str) -> Optional[str]:
+        path = self.path_for(self.key_for(engine, voice, text))
+        if os.path.exists(path):
+            os.utime(path, None)
+            self._count(True)
+            return path
+        self._count(False)
+        return None
+
+    def put(self, engine: str, voice: Optional[str], text: str, wav_path: str) -> str:
+        path = self.path_for(self.key_for(engine, voice, text))
+        tmp = f'{path[:-4]}.{os.getpid()}-{threading.get_ident()}.part.wav'
+        shutil.copyfile(wav_path, tmp)
+        os.replace(tmp, path)
+        evict_lru(self.base_dir, self.budget_bytes, 'TTS cache', suffix='.wav')
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            totals = read_json(self.stats_path, default={}) or {}
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'total_hits': int(totals.get('hits', 0)) + self._pending['hits'],
+                'total_misses': int(totals.get('misses', 0)) + self._pending['misses'],
+            }
+
+
+_caches_lock = threading.Lock()
+_caches: Dict[Tuple[str, int], TtsCache] = {}
+
+
+def get_tts_cache(base_dir: str, budget_mb: int = 256) -> TtsCache:
+    """Process-wide TtsCache for ``base_dir``/``budget_mb``, shared by every render."""
+    key = (os.path.abspath(base_dir), int(budget_mb))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = TtsCache(base_dir, budget_mb)
+    return cache
+
+
+def concat_wavs(paths: List[str], out_wav: str) -> bool:
+    """Join PCM WAVs with identical formats; False if any format differs."""
+    if not paths:
+        return False
+    try:
+        params = None
+        frames: List[bytes] = []
+        for p in paths:
+            with wave.open(p, 'rb') as src:
+                cur = (src.getnchannels(), src.getsampwidth(), src.getframerate())
+                if params is None:
+                    params = cur
+                elif cur != params:
+                    warn(f"TTS segments differ in format ({cur} vs {params}); not concatenating.")
+                    return False
+                frames.append(src.readframes(src.getnframes()))
+        with wave.open(out_wav, 'wb') as dst:
+            dst.setnchannels(params[0])
+            dst.setsampwidth(params[1])
+            dst.setframerate(params[2])
+            for chunk in frames:
+                dst.writeframes(chunk)
+        return True
+    except (wave.Error, EOFError, OSError) as exc:
+        warn(f"TTS segment concat failed: {exc}")
+        return False
@@ -1,3 +1,3 @@
-from .pipeline import generate_hook_clip
+from .pipeline import generate_hook_clip, generate_hook_clips
 
-__all__ = ["generate_hook_clip"]
+__all__ = ["generate_hook_clip", "generate_hook_clips"]
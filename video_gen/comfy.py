@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils import log, warn
+
+DEFAULT_BASE = "http://127.0.0.1:8188"
+# History output keys that carry files, most specific first (VHS video nodes report "gifs")
+OUTPUT_KEYS = ("videos", "gifs", "images")
+
+_graph_lock = threading.Lock()
+_graph_cache: Dict[str, Tuple[int, Any]] = {}
+
+
+def load_graph(path: str) -> Any:
+    """Parsed API-format graph, re-read only when the file's mtime changes."""
+    mtime = os.stat(path).st_mtime_ns
+    with _graph_lock:
+        cached = _graph_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    with open(path, "r", encoding="utf-8") as fh:
+        graph = json.load(fh)
+    with _graph_lock:
+        _graph_cache[path] = (mtime, graph)
+    return graph
+
+
+def fill_graph(node: Any, values: Dict[str, str]) -> Any:
+    """Copy of ``node`` with placeholders (``__PROMPT__``, ``__OUT__``) replaced inside string values.
+
+    Substituting after parsing keeps quotes/backslashes in the prompt from
+    breaking the JSON, and leaves the cached template untouched.
+    """
+    if isinstance(node, str):
+        for key, value in values.items():
+            node = node.replace(key, value)
+        return node
+    if isinstance(node, dict):
+        return {k: fill_graph(v, values) for k, v in node.items()}
+    if isinstance(node, list):
+        return [fill_graph(v, values) for v in node]
+    return node
+
+
+class ComfyClient:
+    """Queue prompts on a ComfyUI server and wait for them by prompt_id.
+
+    ComfyUI executes ``/prompt`` submissions asynchronously, so a job is
+    only done once ``/history/<prompt_id>`` reports it. ``run`` keeps at
+    most ``max_in_flight`` prompts queued on the server, polls their history
+    every ``poll_sec`` and removes jobs that exceed ``timeout_sec`` from the
+    server queue. Finished outputs are used in place when the graph wrote
+    straight to the requested path, otherwise downloaded through ``/view``.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_in_flight: int = 2,
+        poll_sec: float = 1.0,
+        timeout_sec: float = 600.0,
+        session=None,
+    ):
+        import requests
+
+        self.base_url = (base_url or os.getenv("COMFYUI_API_BASE") or DEFAULT_BASE).rstrip("/")
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.poll_sec = max(0.05, float(poll_sec))
+        self.timeout_sec = float(timeout_sec)
+        self.session = session or requests.Session()
+        self.client_id = uuid.uuid4().hex
+
+    @classmethod
+    def from_env(cls) -> "ComfyClient":
+        return cls(
+            max_in_flight=int(os.getenv("COMFYUI_MAX_IN_FLIGHT") or 2),
+            poll_sec=float(os.getenv("COMFYUI_POLL_SEC") or 1.0),
+            timeout_sec=float(os.getenv("COMFYUI_TIMEOUT_SEC") or 600),
+        )
+
+    def queue_prompt(self, graph: Dict) -> str:
+        # Saved API graphs are either the bare node map or already wrapped in {"prompt": ...}
+        body = dict(graph) if isinstance(graph.get("prompt"), dict) else {"prompt": graph}
+        body["client_id"] = self.client_id
+        r = self.session.post(f"{self.base_url}/prompt", json=body, timeout=30)
+        r.raise_for_status()
+        payload = r.json()
+        if payload.get("node_errors"):
+            raise RuntimeError(f"ComfyUI rejected the graph: {payload['node_errors']}")
+        return payload["prompt_id"]
+
+    def history(self, prompt_id: str) -> Optional[Dict]:
+        r = self.session.get(f"{self.base_url}/history/{prompt_id}", timeout=30)
+        r.raise_for_status()
+        return (r.json() or {}).get(prompt_id)
+
+    def cancel(self, prompt_id: str) -> None:
+        try:
+            self.session.post(f"{self.base_url}/queue", json={"delete": [prompt_id]}, timeout=10)
+        except Exception as exc:
+            warn(f"ComfyUI cancel {prompt_id} failed: {exc}")
+
+    def fetch_output(self, entry: Dict, out_path: Path) -> bool:
+        if out_path.exists() and out_path.stat().st_size > 0:
+            return True
+        for node_out in (entry.get("outputs") or {}).values():
+            for key in OUTPUT_KEYS:
+                for item in node_out.get(key) or []:
+                    params = {k: item.get(k, "") for k in ("filename", "subfolder", "type")}
+                    r = self.session.get(f"{self.base_url}/view", params=params, timeout=120, stream=True)
+                    r.raise_for_status()
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = out_path.with_name(f"{out_path.name}.part")
+                    with open(tmp, "wb") as fh:
+                        for chunk in r.iter_content(chunk_size=1 << 20):
+                            fh.write(chunk)
+                    os.replace(tmp, out_path)
+                    return True
+        return False
+
+    def run(self, jobs: Sequence[Tuple[Dict, Path]]) -> List[bool]:
+        """Execute (graph, out_path) jobs; returns per-job success in input order."""
+        results = [False] * len(jobs)
+        waiting = list(range(len(jobs)))
+        in_flight: Dict[str, Tuple[int, float]] = {}
+        while waiting or in_flight:
+            while waiting and len(in_flight) < self.max_in_flight:
+                idx = waiting.pop(0)
+                try:
+                    in_flight[self.queue_prompt(jobs[idx][0])] = (idx, time.monotonic())
+                except Exception as exc:
+                    warn(f"ComfyUI queue failed for {jobs[idx][1]}: {exc}")
+            if not in_flight:
+                continue
+            time.sleep(self.poll_sec)
+            for prompt_id, (idx, started) in list(in_flight.items()):
+                try:
+                    entry = self.history(prompt_id)
+                except Exception as exc:
+                    warn(f"ComfyUI history {prompt_id} failed: {exc}")
+                    entry = None
+                status = (entry or {}).get("status") or {}
+                if entry and (status.get("completed") or status.get("status_str") in ("success", "error")):
+                    del in_flight[prompt_id]
+                    if status.get("status_str", "success") != "success":
+                        warn(f"ComfyUI job {prompt_id} failed: {status.get('messages')}")
+                        continue
+                    try:
+                        results[idx] = self.fetch_output(entry, jobs[idx][1])
+                    except Exception as exc:
+                        warn(f"ComfyUI output fetch {prompt_id} failed: {exc}")
+                    log(f"ComfyUI job {prompt_id} done in {time.monotonic() - started:.1f}s (ok={results[idx]})")
+                elif time.monotonic() - started > self.timeout_sec:
+                    del in_flight[prompt_id]
+                    warn(f"ComfyUI job {prompt_id} timed out after {self.timeout_sec:.0f}s; removing it from the queue.")
+                    self.cancel(prompt_id)
+        return results
@@ -1,52 +1,105 @@
-import os, json, subprocess, shlex
+import hashlib, os, shutil
 from pathlib import Path
+from typing import Optional
 
-COMFY = os.getenv("COMFYUI_API_BASE","http://127.0.0.1:8188")
+from config import load_config, render_options
+from shorts_generator import generate_short
+from utils.scratch import scratch_root
+from .comfy import ComfyClient, fill_graph, load_graph
+
+_client = None
+
+def comfy_client() -> ComfyClient:
+    global _client
+    if _client is None:
+        _client = ComfyClient.from_env()
+    return _client
+
+# ComfyUI REST — assumes a saved API graph with __PROMPT__ and __OUT__ placeholders.
+# Jobs run asynchronously on the server; the client waits for each prompt_id in /history.
+
+def comfy_txt2vid_many(items, graph_path: str):
+    """Queue every (prompt, out_mp4) at once (in-flight capped by COMFYUI_MAX_IN_FLIGHT); returns per-item success."""
+    template = load_graph(graph_path)
+    jobs = [(fill_graph(template, {"__PROMPT__": prompt, "__OUT__": str(out_mp4)}), Path(out_mp4)) for prompt, out_mp4 in items]
+    return comfy_client().run(jobs)
 
-# ComfyUI REST — assumes a saved graph with __PROMPT__ and __OUT__ placeholders
 
 def comfy_txt2vid(prompt: str, out_mp4: Path, graph_path: str):
-    import requests
-    with open(graph_path,"r") as f: graph=f.read()
-    graph = graph.replace("__PROMPT__", prompt).replace("__OUT__", str(out_mp4))
-    r = requests.post(f"{COMFY}/prompt", data=graph.encode("utf-8"), timeout=180)
-    r.raise_for_status()
-    return out_mp4.exists()
-
-# Fallback: stock+FX (ffmpeg solid bg + animated text + optional music)
-
-def stockfx_compose(hook_text: str, music_glob: str, out_mp4: Path):
-    out_mp4.parent.mkdir(parents=True, exist_ok=True)
-    tmp = out_mp4.with_suffix('.hook.mp4')
-    cmd = f"ffmpeg -y -f lavfi -i color=c=black:s=720x1280:d=5 -vf \"drawtext=text='{hook_text}':fontcolor=white:fontsize=64:x=(w-tw)/2:y=h/3:enable='between(t,0,4)',fade=t=in:st=0:d=0.5\" -c:v libx264 -pix_fmt yuv420p {shlex.quote(str(tmp))}"
-    subprocess.run(cmd, shell=True, check=True)
-    import glob
-    tracks = glob.glob(music_glob)
-    if tracks:
-        cmd2=f"ffmpeg -y -i {shlex.quote(str(tmp))} -stream_loop -1 -i {shlex.quote(tracks[0])} -shortest -c:v copy -c:a aac {shlex.quote(str(out_mp4))}"
-    else:
-        cmd2=f"ffmpeg -y -i {shlex.quote(str(tmp))} -c:v copy {shlex.quote(str(out_mp4))}"
-    subprocess.run(cmd2, shell=True, check=True)
-    return True
-
-
-def generate_hook_clip(prompt: str, out_mp4: Path, mode_order=None):
+    return comfy_txt2vid_many([(prompt, out_mp4)], graph_path)[0]
+
+# Fallback: stock+FX, rendered by shorts_generator.generate_short (single pass, render cache,
+# ffmpeg accounting, indexed music pick) with the bot's own background/TTS settings
+
+def stockfx_compose(hook_text: str, music_glob: Optional[str] = None, out_mp4: Optional[Path] = None, seconds: float = 7.0):
+    cfg = load_config()
+    opts = render_options(cfg, scratch_root(cfg.scratch_dir, cfg.scratch_min_free_mb))
+    # One caption segment: nothing for the segment cache to reuse, so one ffmpeg pass is cheapest
+    opts["render_mode"] = "single"
+    if music_glob:
+        opts["music_glob"] = music_glob
+    res = generate_short(cfg.ffmpeg_bin, cfg.piper_bin or "", cfg.piper_voice or "", cfg.data_dir, hook_text, seconds, **opts)
+    if not res.get("ok"):
+        raise RuntimeError(f"render failed: {res.get('error')}")
+    clip = Path(res["video_path"])
+    if out_mp4 is None or Path(out_mp4).resolve() == clip.resolve():
+        return clip
+    # Copy rather than move: the render manifest keeps pointing at the cached MP4
+    Path(out_mp4).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(clip, out_mp4)
+    return Path(out_mp4)
+
+
+def hook_clip_path(prompt: str, out_dir=None) -> Path:
+    """Per-prompt output name (data/video/hook_<digest>.mp4) so clips never overwrite each other."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    return Path(out_dir or os.path.join(os.getenv("DATA_DIR", "data").strip(), "video")) / f"hook_{digest}.mp4"
+
+
+def _engine_order(mode_order):
     if mode_order is None:
         raw = os.getenv("VID_ENGINE_ORDER")
         if raw:
             mode_order = [m.strip() for m in raw.split(",") if m.strip()]
         else:
             mode_order = ("animatediff", "stockfx")
+    return mode_order
+
+
+def generate_hook_clips(items, mode_order=None):
+    """Batch version of generate_hook_clip: (prompt, out_mp4) pairs, ComfyUI jobs queued together.
+
+    out_mp4 may be None for a per-prompt name (hook_clip_path). Each engine only gets the items the
+    previous ones failed; returns the clip paths (None where every engine failed).
+    """
     graph = os.getenv("COMFYUI_GRAPH_HOOK","graphs/hook_3s_api.json")
-    for mode in mode_order:
+    items = [(prompt, Path(out) if out else None) for prompt, out in items]
+    done = [None] * len(items)
+    for mode in _engine_order(mode_order):
+        todo = [i for i, out in enumerate(done) if out is None]
+        if not todo:
+            break
         try:
             if mode=="animatediff":
-                if comfy_txt2vid(prompt, out_mp4, graph):
-                    return out_mp4
+                outs = [items[i][1] or hook_clip_path(items[i][0]) for i in todo]
+                oks = comfy_txt2vid_many([(items[i][0], out) for i, out in zip(todo, outs)], graph)
+                for i, out, ok in zip(todo, outs, oks):
+                    if ok:
+                        done[i] = out
             elif mode=="stockfx":
-                if stockfx_compose(prompt, os.getenv("BG_MUSIC_GLOB","assets/music/*.mp3"), out_mp4):
-                    return out_mp4
+                for i in todo:
+                    try:
+                        done[i] = stockfx_compose(items[i][0], None, items[i][1])
+                    except Exception as e:
+                        print(f"[{mode}] failed for {items[i][0]!r}: {e}")
         except Exception as e:
             print(f"[{mode}] failed: {e}")
             continue
-    raise RuntimeError("All video engines failed")
+    return done
+
+
+def generate_hook_clip(prompt: str, out_mp4: Optional[Path] = None, mode_order=None):
+    clip = generate_hook_clips([(prompt, out_mp4)], mode_order)[0]
+    if clip is None:
+        raise RuntimeError("All video engines failed")
+    return clip